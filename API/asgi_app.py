@@ -0,0 +1,330 @@
+"""
+Asynchronous (ASGI) serving mode for the RenderCV API.
+
+Exposes the same routes as app.py, but requests are handled on an asyncio event
+loop. Rendering runs on dedicated thread pools and is gated by the render
+scheduler's RENDER_CONCURRENCY slots (defaults to the number of cores), so
+theme listing is never stuck behind slow compiles. CV renders are parsed,
+fixed and looked up in the render cache first, and only a cache miss waits for
+a slot, as a coroutine, so cache hits and documents that fail before compiling
+answer without queueing behind compiles and no thread is held while waiting.
+
+Run with an ASGI server, e.g.:
+    hypercorn asgi_app:app --bind 0.0.0.0:8000
+or for development:
+    python asgi_app.py
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from quart import Quart, Response, request, jsonify, abort, render_template_string
+from quart_cors import cors
+
+import theme_manager
+import render_pipeline
+import render_cache
+import render_cancellation
+import render_scheduler
+import render_metrics
+import request_body
+import cv_validation
+import typst_compiler
+from render_cancellation import RenderCancelled
+from render_scheduler import scheduler
+from single_flight import AsyncSingleFlight
+from web_shared import DEFAULT_YAML_CONTENT, HTML_TEMPLATE, validation_reply
+from generation_pool import generation_pool
+
+app = Quart(__name__)
+app = cors(app, allow_origin="*")  # Enable CORS for all routes and origins
+# Refuse oversized bodies from Content-Length or while streaming them, before they are buffered
+app.config['MAX_CONTENT_LENGTH'] = request_body.MAX_REQUEST_BODY_BYTES
+
+# Threads parsing and fixing CV render requests before the cache lookup; they
+# never wait for a render slot
+ASGI_RENDER_REQUEST_THREADS = int(os.environ.get('ASGI_RENDER_REQUEST_THREADS', str(os.cpu_count() or 1)))
+
+_render_executor = ThreadPoolExecutor(max_workers=scheduler.slots, thread_name_prefix='render')
+_render_request_executor = ThreadPoolExecutor(max_workers=ASGI_RENDER_REQUEST_THREADS,
+                                              thread_name_prefix='render-request')
+
+# Identical documents arriving together (retries, several tabs) share one
+# render before taking a slot; equivalent but differently formatted documents
+# are coalesced further down by the render cache. If the leader's render is
+# cancelled by a newer revision, the others render on their own.
+_render_flights = AsyncSingleFlight(retry_on=(RenderCancelled,))
+
+
+@app.errorhandler(413)
+async def request_too_large(error):
+    return jsonify({"error": f"Request body exceeds {request_body.MAX_REQUEST_BODY_BYTES} bytes."}), 413
+
+
+@app.before_serving
+async def warm_up():
+    # Fork the RenderCV workers and build the font bundle before the first request arrives
+    await asyncio.to_thread(generation_pool.start)
+    await asyncio.to_thread(typst_compiler.get_compiler)
+
+
+async def run_render(func, *args, priority=render_scheduler.INTERACTIVE, client_id='', cancel_token=None):
+    """
+    Runs a blocking render function on the render pool once the scheduler
+    grants a slot. Renders cancelled while waiting for a slot never start.
+    """
+    start = time.perf_counter()
+    async with scheduler.async_slot(priority, client_id, cancel_token):
+        waited = time.perf_counter() - start
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(_render_executor, functools.partial(func, *args))
+    render_metrics.add_stage(result.timings, 'queue', waited)
+    return result
+
+
+def _run_in_context(executor, func, *args):
+    # Like asyncio.to_thread, so the render's timings follow it to the thread
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(executor, functools.partial(contextvars.copy_context().run, func, *args))
+
+
+async def run_cv_render(prepare, cv_input, session_id, cancel_token, priority, client_id):
+    """
+    Renders a CV like `render_pipeline.render_yaml` without holding a thread
+    while it waits: the CV is prepared on the request pool and looked up in the
+    render cache, and only a miss waits for a render slot before rendering on
+    the render pool.
+
+    Args:
+        prepare: `render_pipeline.prepare_yaml` or `render_pipeline.prepare_document`
+        cv_input: The YAML content or the document to render
+    """
+    with render_metrics.track() as timings:
+        try:
+            prepared = await _run_in_context(_render_request_executor, prepare, cv_input, session_id, cancel_token)
+            result = prepared.cached()
+            if result is None:
+                start = time.perf_counter()
+                async with scheduler.async_slot(priority, client_id, cancel_token):
+                    render_metrics.add_stage(timings, 'queue', time.perf_counter() - start)
+                    result = await _run_in_context(_render_executor, prepared.render)
+        except render_pipeline.RenderError as e:
+            render_pipeline.record_cv_error(e)
+            raise
+    return render_pipeline.record_cv_render(result, timings)
+
+
+# Serve the main HTML page
+@app.route('/')
+async def index():
+    themes = await asyncio.to_thread(theme_manager.get_available_themes)
+    default_yaml = await asyncio.to_thread(theme_manager.get_default_theme_content)
+    return await render_template_string(HTML_TEMPLATE, default_yaml=default_yaml, themes=themes)
+
+# API endpoint to list available themes
+@app.route('/themes', methods=['GET'])
+async def list_themes():
+    themes = await asyncio.to_thread(theme_manager.get_available_themes)
+    return jsonify({"themes": themes})
+
+# API endpoint to get a specific theme
+@app.route('/themes/<theme_name>', methods=['GET'])
+async def get_theme(theme_name):
+    theme_content = await asyncio.to_thread(theme_manager.get_theme_content, theme_name)
+    if theme_content:
+        return jsonify({"theme": theme_name, "content": theme_content})
+    else:
+        return jsonify({"error": f"Theme '{theme_name}' not found"}), 404
+
+# API endpoint to save a custom theme
+@app.route('/themes/save', methods=['POST'])
+async def save_theme():
+    if not request.is_json:
+        abort(415, description="Request must be JSON.")
+
+    data = await request.get_json()
+    theme_name = data.get('theme_name')
+    yaml_content = data.get('yaml_content')
+
+    if not theme_name or not yaml_content:
+        return jsonify({"error": "Missing 'theme_name' or 'yaml_content' in request."}), 400
+
+    if not theme_manager.is_valid_theme_name(theme_name):
+        return jsonify({"error": "Theme name can only contain letters, numbers, and underscores."}), 400
+
+    success = await asyncio.to_thread(theme_manager.save_theme, theme_name, yaml_content)
+    if success:
+        return jsonify({"message": f"Theme '{theme_name}' saved successfully."})
+    else:
+        return jsonify({"error": f"Failed to save theme '{theme_name}'."}), 500
+
+# API endpoint to render YAML to PDF
+@app.route('/render_live', methods=['POST'])
+async def render_live():
+    if not render_pipeline.RENDERCV_AVAILABLE:
+        return jsonify({"error": "RenderCV API function not available."}), 500
+
+    # JSON envelope, or the YAML itself (application/yaml) with options in the query string
+    try:
+        data = await _read_render_request()
+    except request_body.RequestBodyError as e:
+        return jsonify({"error": e.message}), e.status_code
+    yaml_content = data.get('yaml_content')
+
+    if not yaml_content:
+        return jsonify({"error": "Missing 'yaml_content' in request."}), 400
+
+    return await _render_cv_response(
+        render_pipeline.prepare_yaml, yaml_content, render_cache.hash_text(yaml_content), data)
+
+# API endpoint to render a CV sent as a JSON document ({"document": {"cv": ..., "design": ...}})
+@app.route('/render_document', methods=['POST'])
+async def render_document():
+    if not render_pipeline.RENDERCV_AVAILABLE:
+        return jsonify({"error": "RenderCV API function not available."}), 500
+
+    try:
+        data = await _read_render_request(allow_yaml=False)
+    except request_body.RequestBodyError as e:
+        return jsonify({"error": e.message}), e.status_code
+    document = data.get('document')
+
+    if not document:
+        return jsonify({"error": "Missing 'document' in request."}), 400
+    if not isinstance(document, dict):
+        return jsonify({"error": "'document' must be a JSON object."}), 400
+
+    flight_key = 'document:' + render_cache.hash_document(document)
+    return await _render_cv_response(render_pipeline.prepare_document, document, flight_key, data)
+
+# API endpoint to validate YAML without rendering, for inline diagnostics while typing
+@app.route('/validate', methods=['POST'])
+async def validate():
+    if not cv_validation.VALIDATION_AVAILABLE:
+        return jsonify({"error": "RenderCV API function not available."}), 500
+
+    try:
+        data = await _read_render_request()
+    except request_body.RequestBodyError as e:
+        return jsonify({"error": e.message}), e.status_code
+    yaml_content = data.get('yaml_content')
+
+    if not yaml_content:
+        return jsonify({"error": "Missing 'yaml_content' in request."}), 400
+
+    # Skips the render slots; an uncached validation waits on a generation worker
+    start = time.perf_counter()
+    result = await asyncio.to_thread(cv_validation.validator.validate_yaml, yaml_content)
+    payload, headers = validation_reply(result, time.perf_counter() - start)
+    return jsonify(payload), 200, headers
+
+async def _read_render_request(allow_yaml=True):
+    """Decodes the body of a render request, which may be gzip-encoded."""
+    return request_body.parse_render_request(
+        await request.get_data(), request.mimetype, request.headers.get('Content-Encoding', ''),
+        request.args, allow_yaml=allow_yaml,
+    )
+
+async def _render_cv_response(prepare, cv_input, flight_key, data):
+    """
+    Renders a CV from a /render_live or /render_document request and builds the
+    PDF response. Identical requests in flight from one session share one
+    render, so a render is only ever handed to requests of the session whose
+    revisions can supersede it.
+
+    Args:
+        prepare: `render_pipeline.prepare_yaml` or `render_pipeline.prepare_document`
+        cv_input: The YAML content or the document to render
+        flight_key (str): Identifies identical content
+        data (dict): The request body, read for the session, revision and priority
+
+    Returns:
+        Response: The PDF, or a JSON error
+    """
+    session_id = render_pipeline.normalize_session_id(data.get('session_id'))
+    revision = render_cancellation.normalize_revision(data.get('revision'))
+    priority = render_scheduler.normalize_priority(data.get('priority'))
+    client_id = session_id or request.remote_addr or ''
+
+    with render_cancellation.revisions.track(session_id, revision) as cancel_token:
+        try:
+            # Requests for an older revision than the session has seen are refused outright
+            cancel_token.raise_if_cancelled()
+            result, shared = await _render_flights.do(
+                f'{session_id or ""}:{flight_key}',
+                lambda: run_cv_render(prepare, cv_input, session_id, cancel_token, priority, client_id),
+                # Once every client waiting on the render has disconnected, stop it
+                abandon=cancel_token.cancel,
+            )
+            # A follower superseded while it waited gets no render its session has moved past
+            cancel_token.raise_if_cancelled()
+        except RenderCancelled:
+            return jsonify({"error": "Render superseded by a newer revision."}), 409
+        except render_pipeline.RenderError as e:
+            return jsonify(e.to_payload()), e.status_code
+
+    response = Response(result.pdf_data, mimetype='application/pdf')
+    cache_outcome = 'hit' if result.cache_hit or shared else 'miss'
+    response.headers['X-Render-Cache'] = cache_outcome
+    response.headers['Server-Timing'] = render_metrics.server_timing(result.timings, cache_outcome)
+    response.headers['Timing-Allow-Origin'] = '*'
+    if result.icon_warning:
+        response.headers['X-Icon-Warning'] = 'true'
+    return response
+
+# API endpoint to report render cache statistics
+@app.route('/render_cache/stats', methods=['GET'])
+async def render_cache_stats():
+    return jsonify(render_pipeline.cache_stats())
+
+# API endpoint exposing render metrics for Prometheus
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    return Response(render_metrics.expose(), content_type=render_metrics.CONTENT_TYPE)
+
+# API endpoint to get a specific theme preview
+@app.route('/themes/<theme_name>/preview', methods=['GET'])
+async def preview_theme(theme_name):
+    theme_content = await asyncio.to_thread(theme_manager.get_theme_content, theme_name)
+    if not theme_content:
+        return jsonify({"error": f"Theme '{theme_name}' not found"}), 404
+
+    try:
+        result = await run_render(render_pipeline.render_theme_preview, theme_name, DEFAULT_YAML_CONTENT,
+                                    priority=render_scheduler.EXPORT, client_id=request.remote_addr or '')
+    except render_pipeline.RenderError as e:
+        return jsonify(e.to_payload()), e.status_code
+
+    response = Response(result.pdf_data, mimetype='application/pdf')
+    response.headers['Server-Timing'] = render_metrics.server_timing(result.timings)
+    response.headers['Timing-Allow-Origin'] = '*'
+    return response
+
+# API endpoint to delete a theme
+@app.route('/themes/<theme_name>', methods=['DELETE'])
+async def delete_theme(theme_name):
+    theme_content = await asyncio.to_thread(theme_manager.get_theme_content, theme_name)
+    if not theme_content:
+        return jsonify({"error": f"Theme '{theme_name}' not found"}), 404
+
+    if theme_name in theme_manager.BUILTIN_THEMES:
+        return jsonify({"error": f"Cannot delete built-in theme '{theme_name}'"}), 403
+
+    try:
+        if await asyncio.to_thread(theme_manager.delete_theme, theme_name):
+            return jsonify({"message": f"Theme '{theme_name}' deleted successfully"})
+        else:
+            return jsonify({"error": f"Theme file not found or is not accessible"}), 404
+    except Exception as e:
+        print(f"Error deleting theme {theme_name}: {e}")
+        return jsonify({"error": f"Failed to delete theme: {str(e)}"}), 500
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    app.run(host='0.0.0.0', port=8000)
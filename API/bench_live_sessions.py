@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Load generator that replays live-editing sessions against a running server.
+
+Each simulated editor behaves like the editor pages: it loads a theme, then
+edits its YAML every ~1.5 s (typing or deleting a character in a quoted value,
+now and then adding a bullet) and posts every revision to `/render_live` with
+its session id and revision counter, without waiting for the previous render.
+A render still in flight when the next edit is posted is superseded; the server
+answers it with 409, which is counted separately and not as an error.
+Editors occasionally switch to another theme (listing the themes, loading one
+and sometimes fetching its preview) and occasionally save their YAML as a
+custom theme. Saved themes are deleted when the run ends.
+
+Reports p50/p95/p99 latency, error rates and throughput per endpoint, so
+serving modes (Flask vs ASGI) and cache settings can be compared on one box.
+
+Usage:
+    python bench_live_sessions.py [--url http://localhost:8000] [--sessions N]
+        [--duration SECONDS] [--interval 1.5] [--ramp-up SECONDS] [--switch-rate 0.05]
+        [--preview-rate 0.5] [--save-rate 0.01] [--body yaml|json] [--gzip] [--seed N]
+        [--label NAME] [--json] [--output FILE]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_typst_backends import percentile
+
+DEFAULT_URL = "http://localhost:8000"
+
+# A double-quoted scalar on one line, e.g. `- "Led a team"` or `company: "Acme"`
+_QUOTED_VALUE = re.compile(r'^(\s*(?:- |([A-Za-z_]+): ))"([^"\\]*)"\s*$')
+# Free-text fields; dates, emails and the like would fail validation when edited
+EDITABLE_KEYS = {"name", "position", "company", "institution", "area", "degree", "title", "label", "details"}
+_TYPED = "abcdefghijklmnopqrstuvwxyz     "
+
+
+def edit_yaml(yaml_content, rng):
+    """
+    Applies one small edit to the `cv` part of a YAML document: types or
+    deletes a character inside a quoted value, or duplicates a list item as if
+    a new bullet had been written. The document stays valid YAML.
+
+    Args:
+        yaml_content (str): The current document
+        rng (random.Random): Source of randomness
+
+    Returns:
+        str: The edited document, unchanged if nothing editable was found
+    """
+    lines = yaml_content.split("\n")
+    candidates = []
+    for index, line in enumerate(lines):
+        if index > 0 and line and not line[0].isspace() and not line.startswith("cv:"):
+            break  # only the cv section is edited, design and settings stay intact
+        match = _QUOTED_VALUE.match(line)
+        if match and (match.group(2) is None or match.group(2) in EDITABLE_KEYS):
+            candidates.append(index)
+    if not candidates:
+        return yaml_content
+
+    index = rng.choice(candidates)
+    prefix, _, value = _QUOTED_VALUE.match(lines[index]).groups()
+    action = rng.random()
+    if action < 0.1 and prefix.strip() == "-":
+        lines.insert(index + 1, lines[index])
+    elif action < 0.3 and len(value) > 3:
+        position = rng.randrange(len(value))
+        lines[index] = f'{prefix}"{value[:position]}{value[position + 1:]}"'
+    else:
+        position = rng.randrange(len(value) + 1)
+        lines[index] = f'{prefix}"{value[:position]}{rng.choice(_TYPED)}{value[position:]}"'
+    return "\n".join(lines)
+
+
+class Recorder:
+    """Collects request outcomes per endpoint from every session thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, endpoint, status, seconds, cache=None):
+        with self._lock:
+            entry = self.samples.setdefault(endpoint, {"latencies": [], "statuses": {}, "cache": {}})
+            entry["latencies"].append(seconds)
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            if cache:
+                entry["cache"][cache] = entry["cache"].get(cache, 0) + 1
+
+    def report(self, elapsed):
+        """
+        Summarizes the collected samples.
+
+        Args:
+            elapsed (float): Wall time of the run in seconds
+
+        Returns:
+            dict: Endpoint -> requests, errors, error rate, superseded, throughput,
+                latency percentiles and cache outcomes
+        """
+        endpoints = {}
+        with self._lock:
+            for endpoint, entry in sorted(self.samples.items()):
+                latencies = entry["latencies"]
+                statuses = entry["statuses"]
+                superseded = statuses.get("409", 0)
+                errors = sum(count for status, count in statuses.items()
+                             if status != "409" and not status.startswith("2"))
+                summary = {
+                    "requests": len(latencies),
+                    "errors": errors,
+                    "error_rate": round(errors / len(latencies), 4),
+                    "superseded": superseded,
+                    "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed > 0 else None,
+                    "statuses": dict(sorted(statuses.items())),
+                }
+                for label, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+                    summary[f"{label}_ms"] = round(percentile(latencies, fraction) * 1000, 2)
+                summary["max_ms"] = round(max(latencies) * 1000, 2)
+                if entry["cache"]:
+                    summary["cache"] = dict(sorted(entry["cache"].items()))
+                endpoints[endpoint] = summary
+        return endpoints
+
+
+class Client:
+    """Minimal JSON-over-HTTP client built on urllib."""
+
+    def __init__(self, base_url, recorder, timeout=60.0):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+
+    def request(self, endpoint, method, path, payload=None, body=None, headers=None):
+        """
+        Sends one request and records its outcome under `endpoint`.
+
+        Args:
+            payload: Object to send as JSON
+            body (bytes): Raw body to send instead, with its `headers`
+
+        Returns:
+            tuple: (status as a string, response body or None); the status is
+                "exception" if the request did not complete
+        """
+        data = json.dumps(payload).encode("utf-8") if payload is not None else body
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers or {})
+        if payload is not None:
+            req.add_header("Content-Type", "application/json")
+        start = time.perf_counter()
+        cache = None
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                body = response.read()
+                status = str(response.status)
+                cache = response.headers.get("X-Render-Cache")
+        except urllib.error.HTTPError as e:
+            e.read()
+            body, status = None, str(e.code)
+        except (urllib.error.URLError, OSError) as e:
+            body, status = None, "exception"
+            print(f"{method} {path} failed: {e}", file=sys.stderr)
+        self.recorder.record(endpoint, status, time.perf_counter() - start, cache)
+        return status, body
+
+
+class EditingSession:
+    """One simulated editor, run on its own thread until the deadline."""
+
+    def __init__(self, client, sender, args, rng, deadline):
+        self.client = client
+        self.sender = sender
+        self.args = args
+        self.rng = rng
+        self.deadline = deadline
+        self.session_id = uuid.uuid4().hex
+        self.revision = 0
+        self.yaml_content = None
+        self.saved_themes = []
+
+    def _load_theme(self, theme_name):
+        status, body = self.client.request("theme_get", "GET", f"/themes/{theme_name}")
+        if status == "200":
+            self.yaml_content = json.loads(body)["content"]
+        if self.rng.random() < self.args.preview_rate:
+            self.client.request("theme_preview", "GET", f"/themes/{theme_name}/preview")
+
+    def _switch_theme(self):
+        status, body = self.client.request("theme_list", "GET", "/themes")
+        themes = json.loads(body)["themes"] if status == "200" else []
+        # Themes saved by other simulated sessions are left out
+        themes = [t for t in themes if not t.startswith("loadtest_")]
+        if themes:
+            self._load_theme(self.rng.choice(themes))
+
+    def _save_theme(self):
+        theme_name = f"loadtest_{self.session_id[:12]}_{len(self.saved_themes)}"
+        status, _ = self.client.request("theme_save", "POST", "/themes/save",
+                                        {"theme_name": theme_name, "yaml_content": self.yaml_content})
+        if status == "200":
+            self.saved_themes.append(theme_name)
+
+    def _post_render(self):
+        self.revision += 1
+        if self.args.body == "yaml":
+            # The YAML as the body, options in the query string, like the bundled editors
+            query = urllib.parse.urlencode({"session_id": self.session_id, "revision": self.revision})
+            body = self.yaml_content.encode("utf-8")
+            headers = {"Content-Type": "application/yaml"}
+            if self.args.gzip:
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+            request = ("render_live", "POST", f"/render_live?{query}", None, body, headers)
+        else:
+            payload = {"yaml_content": self.yaml_content, "session_id": self.session_id, "revision": self.revision}
+            request = ("render_live", "POST", "/render_live", payload)
+        # Like the editors, the next edit does not wait for this render
+        self.sender.submit(self.client.request, *request)
+
+    def run(self):
+        self._load_theme(self.args.initial_theme)
+        while self.yaml_content is not None and time.monotonic() < self.deadline:
+            roll = self.rng.random()
+            if roll < self.args.save_rate:
+                self._save_theme()
+            else:
+                if roll < self.args.save_rate + self.args.switch_rate:
+                    self._switch_theme()
+                else:
+                    self.yaml_content = edit_yaml(self.yaml_content, self.rng)
+                self._post_render()
+            jitter = self.rng.uniform(0.7, 1.3)
+            time.sleep(max(0.0, min(self.args.interval * jitter, self.deadline - time.monotonic())))
+
+    def cleanup(self):
+        for theme_name in self.saved_themes:
+            self.client.request("theme_delete", "DELETE", f"/themes/{theme_name}")
+
+
+def run_load(args):
+    """
+    Runs the simulated sessions and returns the report.
+
+    Returns:
+        dict: Settings, per-endpoint results and totals
+    """
+    recorder = Recorder()
+    client = Client(args.url, recorder, args.timeout)
+    start = time.monotonic()
+    deadline = start + args.ramp_up + args.duration
+    rng = random.Random(args.seed)
+
+    # Renders in flight per session are bounded by how long one takes / interval
+    with ThreadPoolExecutor(max_workers=args.sessions * 4) as sender:
+        sessions = [
+            EditingSession(client, sender, args, random.Random(rng.random()), deadline)
+            for _ in range(args.sessions)
+        ]
+        threads = []
+        for session in sessions:
+            thread = threading.Thread(target=session.run, daemon=True)
+            threads.append(thread)
+            thread.start()
+            time.sleep(args.ramp_up / args.sessions)
+        for thread in threads:
+            thread.join()
+    elapsed = time.monotonic() - start
+
+    for session in sessions:
+        session.cleanup()
+
+    endpoints = recorder.report(elapsed)
+    endpoints.pop("theme_delete", None)
+    requests = sum(e["requests"] for e in endpoints.values())
+    errors = sum(e["errors"] for e in endpoints.values())
+    return {
+        "label": args.label,
+        "url": args.url,
+        "settings": {
+            "sessions": args.sessions,
+            "duration": args.duration,
+            "interval": args.interval,
+            "ramp_up": args.ramp_up,
+            "switch_rate": args.switch_rate,
+            "preview_rate": args.preview_rate,
+            "save_rate": args.save_rate,
+            "seed": args.seed,
+            "body": args.body + ("+gzip" if args.gzip else ""),
+        },
+        "elapsed_s": round(elapsed, 2),
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else None,
+        "throughput_rps": round(requests / elapsed, 3) if elapsed > 0 else None,
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report):
+    print(f"{report['label'] or report['url']}: {report['settings']['sessions']} sessions for {report['elapsed_s']}s")
+    print(f"{'endpoint':<14} {'requests':>8} {'rps':>7} {'errors':>7} {'409':>5} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, e in report["endpoints"].items():
+        print(
+            f"{name:<14} {e['requests']:>8} {e['throughput_rps']:>7.2f} {e['error_rate']:>6.1%} {e['superseded']:>5} "
+            f"{e['p50_ms']:>7.1f}ms {e['p95_ms']:>7.1f}ms {e['p99_ms']:>7.1f}ms"
+        )
+    print(f"\ntotal {report['requests']} requests, {report['throughput_rps']} req/s, "
+          f"error rate {report['error_rate'] or 0:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL, help="base URL of the API server")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent editing sessions")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run after ramp-up")
+    parser.add_argument("--interval", type=float, default=1.5, help="mean seconds between edits")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which sessions start")
+    parser.add_argument("--switch-rate", type=float, default=0.05, help="chance a step switches theme instead of editing")
+    parser.add_argument("--preview-rate", type=float, default=0.5, help="chance a theme load fetches its preview")
+    parser.add_argument("--save-rate", type=float, default=0.01, help="chance a step saves a theme instead of editing")
+    parser.add_argument("--initial-theme", default="classic", help="theme every session starts from")
+    parser.add_argument("--body", choices=("yaml", "json"), default="yaml",
+                        help="post raw YAML bodies or the JSON envelope to /render_live")
+    parser.add_argument("--gzip", action="store_true", help="gzip raw YAML bodies")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible sessions")
+    parser.add_argument("--label", default="", help="name of the setup under test, stored in the report")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_load(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
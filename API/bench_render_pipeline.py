@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the YAML -> PDF render pipeline in-process.
+
+Renders a generated corpus through `render_pipeline.render_yaml`, the same
+fix, parse, generate and compile steps `/render_live` runs, without an HTTP
+server. The corpus holds every theme in templates/themes at several sizes,
+from a single entry to hundreds of entries. The render caches are cleared
+before every run unless --cache is given, so each run renders from scratch.
+
+Reports per-stage latency percentiles, throughput and peak RSS. With --json
+or --output the report is written as JSON; --save-baseline stores it, and
+--baseline compares the run against a stored report and exits with status 1
+if any case got slower than the tolerance allows.
+
+Usage:
+    python bench_render_pipeline.py [--sizes tiny,small,...] [--themes a,b] [--runs N]
+        [--warmup N] [--concurrency N] [--session] [--cache] [--json] [--output FILE]
+        [--save-baseline FILE] [--baseline FILE] [--tolerance 0.15] [--min-delta-ms 5]
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import render_cache
+import render_pipeline
+import typst_compiler
+import yaml_codec
+from bench_typst_backends import percentile
+from generation_pool import generation_pool
+from render_scheduler import INTERACTIVE
+from theme_manager import THEMES_DIR
+from typst_sessions import session_pool
+
+# Corpus sizes: total number of section entries in the generated CV
+CORPUS_SIZES = {
+    "tiny": 1,
+    "small": 8,
+    "medium": 30,
+    "large": 100,
+    "huge": 300,
+}
+
+PERCENTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))
+
+REPORT_VERSION = 1
+
+
+def load_theme_templates(themes_dir=THEMES_DIR):
+    """
+    Loads every theme template.
+
+    Returns:
+        dict: Theme name -> parsed template document
+    """
+    templates = {}
+    for name in sorted(os.listdir(themes_dir)):
+        if name.endswith(".yaml"):
+            with open(os.path.join(themes_dir, name), "r", encoding="utf-8") as f:
+                templates[name[:-len(".yaml")]] = yaml_codec.load(f)
+    return templates
+
+
+def _vary(entry, index):
+    """Returns a copy of a section entry made distinct by its index."""
+    if isinstance(entry, str):
+        return f"{entry} ({index})"
+    entry = copy.deepcopy(entry)
+    for field in ("company", "institution", "name", "label", "title", "bullet", "number"):
+        if isinstance(entry.get(field), str):
+            entry[field] = f"{entry[field]} {index}"
+            break
+    if isinstance(entry.get("highlights"), list):
+        entry["highlights"] = entry["highlights"] + [f"Delivered milestone {index} ahead of schedule"]
+    return entry
+
+
+def build_cv(template, entries):
+    """
+    Builds a CV document from a theme template with the given number of
+    section entries, spread round-robin over the template's sections and
+    cycling through each section's sample entries.
+
+    Args:
+        template (dict): Parsed theme template
+        entries (int): Total number of section entries
+
+    Returns:
+        dict: The CV document, with the template's design and settings
+    """
+    document = copy.deepcopy(template)
+    samples = {name: items for name, items in template["cv"]["sections"].items() if items}
+    names = list(samples)
+    sections = {}
+    for index in range(entries):
+        name = names[index % len(names)]
+        section = sections.setdefault(name, [])
+        prototype = samples[name][len(section) % len(samples[name])]
+        section.append(prototype if len(section) < len(samples[name]) else _vary(prototype, index))
+    document["cv"]["sections"] = sections
+    return document
+
+
+def build_corpus(sizes, themes=None, themes_dir=THEMES_DIR):
+    """
+    Builds the benchmark corpus.
+
+    Args:
+        sizes (list): Names from CORPUS_SIZES
+        themes (list): Theme names to include, or None for every theme template
+
+    Returns:
+        list: Cases as dicts with "case", "theme", "size", "entries" and "yaml"
+    """
+    templates = load_theme_templates(themes_dir)
+    corpus = []
+    for theme, template in templates.items():
+        if themes and theme not in themes:
+            continue
+        for size in sizes:
+            entries = CORPUS_SIZES[size]
+            corpus.append({
+                "case": f"{theme}/{size}",
+                "theme": theme,
+                "size": size,
+                "entries": entries,
+                "yaml": yaml_codec.dump(build_cv(template, entries), sort_keys=False, allow_unicode=True),
+            })
+    return corpus
+
+
+def summarize(samples):
+    """Returns mean and percentiles in milliseconds of a list of seconds."""
+    if not samples:
+        return {}
+    summary = {"mean_ms": round(statistics.mean(samples) * 1000, 2)}
+    for label, fraction in PERCENTILES:
+        summary[f"{label}_ms"] = round(percentile(samples, fraction) * 1000, 2)
+    summary["max_ms"] = round(max(samples) * 1000, 2)
+    return summary
+
+
+def _render_once(yaml_content, session_id, keep_cache):
+    if not keep_cache:
+        render_cache.pdf_cache.clear()
+        render_cache.typst_pdf_cache.clear()
+    result = render_pipeline.render_yaml(
+        yaml_content, session_id=session_id, priority=INTERACTIVE, client_id="bench"
+    )
+    return result.timings
+
+
+def benchmark_case(case, runs, warmup=1, concurrency=1, use_session=False, keep_cache=False):
+    """
+    Renders one corpus case `warmup + runs` times and summarizes the timed runs.
+
+    Returns:
+        dict: Total and per-stage latency summaries, throughput and error count
+    """
+    session_id = f"bench-{case['case']}" if use_session else None
+    errors = []
+
+    def run(_):
+        try:
+            return _render_once(case["yaml"], session_id, keep_cache)
+        except render_pipeline.RenderError as e:
+            errors.append(f"{e.status_code}: {e.message}")
+            return None
+
+    for i in range(warmup):
+        run(i)
+    errors.clear()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = [t for t in executor.map(run, range(runs)) if t is not None]
+    elapsed = time.perf_counter() - start
+
+    stages = {}
+    for t in timings:
+        for stage_name, seconds in t.stages.items():
+            stages.setdefault(stage_name, []).append(seconds)
+
+    return {
+        "case": case["case"],
+        "theme": case["theme"],
+        "size": case["size"],
+        "entries": case["entries"],
+        "yaml_bytes": len(case["yaml"].encode("utf-8")),
+        "runs": runs,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput_rps": round(len(timings) / elapsed, 3) if elapsed > 0 else None,
+        "total": summarize([t.total for t in timings]),
+        "stages": {name: summarize(samples) for name, samples in stages.items()},
+    }
+
+
+def _maxrss_mb(who):
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(who).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(maxrss / divisor, 1)
+
+
+def compare_reports(current, baseline, tolerance=0.15, min_delta_ms=5.0):
+    """
+    Compares a report against a baseline report.
+
+    A metric regresses when it is more than `tolerance` (a fraction) and more
+    than `min_delta_ms` slower than in the baseline; the absolute floor keeps
+    sub-millisecond stages from flagging noise. Checked are the p50 and p95 of
+    the total and the p50 of every stage, for cases present in both reports.
+
+    Returns:
+        list: Regressions as dicts with "case", "metric", "baseline_ms" and "current_ms"
+    """
+    baseline_cases = {case["case"]: case for case in baseline.get("cases", [])}
+    regressions = []
+
+    def check(case_name, metric, old, new):
+        if old is None or new is None:
+            return
+        if new > old * (1 + tolerance) and new - old > min_delta_ms:
+            regressions.append({"case": case_name, "metric": metric, "baseline_ms": old, "current_ms": new})
+
+    for case in current.get("cases", []):
+        old = baseline_cases.get(case["case"])
+        if old is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            check(case["case"], f"total.{key}", old["total"].get(key), case["total"].get(key))
+        for stage_name, summary in case["stages"].items():
+            old_stage = old["stages"].get(stage_name)
+            if old_stage is not None:
+                check(case["case"], f"{stage_name}.p50_ms", old_stage.get("p50_ms"), summary.get("p50_ms"))
+    return regressions
+
+
+def run_benchmark(corpus, runs, warmup=1, concurrency=1, use_session=False, keep_cache=False):
+    """
+    Benchmarks every corpus case and returns the full report.
+
+    Returns:
+        dict: Environment, settings, per-case results, overall throughput and peak RSS
+    """
+    generation_pool.start()
+    compiler = typst_compiler.get_compiler()
+
+    cases = []
+    start = time.perf_counter()
+    for case in corpus:
+        result = benchmark_case(case, runs, warmup, concurrency, use_session, keep_cache)
+        cases.append(result)
+        print(f"{result['case']:<28} p50 {result['total'].get('p50_ms', float('nan')):>8.1f}ms "
+              f"errors {result['errors']}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    # Worker processes count towards RUSAGE_CHILDREN only once they have exited
+    session_pool.close_all()
+    generation_pool.shutdown()
+
+    renders = sum(case["runs"] - case["errors"] for case in cases)
+    return {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "typst_backend": compiler.name,
+            "generation_workers": generation_pool.workers,
+            "sessions": use_session,
+        },
+        "settings": {"runs": runs, "warmup": warmup, "concurrency": concurrency, "cache": keep_cache},
+        "cases": cases,
+        "throughput_rps": round(renders / elapsed, 3) if elapsed > 0 else None,
+        "peak_rss_mb": _maxrss_mb(resource.RUSAGE_SELF),
+        "peak_child_rss_mb": _maxrss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def print_report(report):
+    print(f"{'case':<28} {'entries':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>7} {'errors':>6}  slowest stages")
+    for case in report["cases"]:
+        total = case["total"]
+        stages = sorted(case["stages"].items(), key=lambda item: item[1]["p50_ms"], reverse=True)[:3]
+        slowest = ", ".join(f"{name} {summary['p50_ms']:.1f}ms" for name, summary in stages)
+        print(
+            f"{case['case']:<28} {case['entries']:>7} {total.get('p50_ms', float('nan')):>7.1f}ms "
+            f"{total.get('p95_ms', float('nan')):>7.1f}ms {total.get('p99_ms', float('nan')):>7.1f}ms "
+            f"{case['throughput_rps'] or 0:>7.2f} {case['errors']:>6}  {slowest}"
+        )
+    print(f"\nthroughput {report['throughput_rps']} renders/s, peak RSS {report['peak_rss_mb']} MB "
+          f"(largest child process {report['peak_child_rss_mb']} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(CORPUS_SIZES), help="comma-separated corpus sizes")
+    parser.add_argument("--themes", default="", help="comma-separated themes (default: all templates)")
+    parser.add_argument("--runs", type=int, default=10, help="timed renders per case")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed renders per case")
+    parser.add_argument("--concurrency", type=int, default=1, help="renders in flight per case")
+    parser.add_argument("--session", action="store_true", help="compile in a pinned Typst session per case")
+    parser.add_argument("--cache", action="store_true", help="keep the render caches between runs")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--save-baseline", help="store the JSON report as a baseline")
+    parser.add_argument("--baseline", help="compare against a stored baseline report")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown as a fraction")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    sizes = [size for size in args.sizes.split(",") if size]
+    unknown = [size for size in sizes if size not in CORPUS_SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)} (choose from {', '.join(CORPUS_SIZES)})")
+    themes = [theme for theme in args.themes.split(",") if theme] or None
+
+    if not render_pipeline.RENDERCV_AVAILABLE:
+        print("RenderCV is not installed, nothing to benchmark.", file=sys.stderr)
+        sys.exit(2)
+
+    corpus = build_corpus(sizes, themes)
+    report = run_benchmark(corpus, args.runs, args.warmup, args.concurrency, args.session, args.cache)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance, args.min_delta_ms)
+        report["regressions"] = regressions
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+        if args.baseline:
+            for r in regressions:
+                print(f"REGRESSION {r['case']} {r['metric']}: {r['baseline_ms']:.1f}ms -> {r['current_ms']:.1f}ms")
+            if not regressions:
+                print(f"No regressions against {args.baseline}.")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
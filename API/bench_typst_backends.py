@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Compares compile latency of the Typst backends in typst_compiler.py.
+
+Compiles the same Typst file repeatedly with the CLI backend (one typst process
+per compile) and the in-process python backend, and prints the cold first
+compile plus latency percentiles for the warm runs.
+
+With --fonts, each backend is run twice: once searching every font directory
+and the system fonts, and once with only the consolidated font bundle, to
+measure what font discovery costs.
+
+Usage:
+    python bench_typst_backends.py [file.typ] [--runs N] [--fonts] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import typst_compiler
+from font_bundle import font_bundle
+from font_registry import font_registry
+
+DEFAULT_TYPST_FILE = "john_doe_moderncv_api_test.typ"
+
+
+def percentile(samples, fraction):
+    """Returns the nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def benchmark_backend(backend, typst_content, runs, fonts="all", font_paths=None, ignore_system_fonts=False):
+    """
+    Times `runs` compiles of the same source with one backend.
+
+    Returns:
+        dict: Timings in milliseconds, or None if the backend is unavailable
+    """
+    setup_start = time.perf_counter()
+    compiler = typst_compiler.create_compiler(backend, font_paths, ignore_system_fonts)
+    setup_ms = (time.perf_counter() - setup_start) * 1000
+    if compiler.name != backend:
+        print(f"Backend '{backend}' is not available, skipping.", file=sys.stderr)
+        return None
+
+    samples = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        compiler.compile(typst_content)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    cold_ms, warm = samples[0], samples[1:]
+    return {
+        "backend": backend,
+        "fonts": fonts,
+        "runs": runs,
+        "setup_ms": round(setup_ms, 2),
+        "cold_ms": round(cold_ms, 2),
+        "mean_ms": round(statistics.mean(warm), 2),
+        "p50_ms": round(percentile(warm, 0.50), 2),
+        "p95_ms": round(percentile(warm, 0.95), 2),
+        "min_ms": round(min(warm), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("typst_file", nargs="?", default=DEFAULT_TYPST_FILE)
+    parser.add_argument("--runs", type=int, default=20, help="warm compiles per backend")
+    parser.add_argument("--fonts", action="store_true", help="compare all fonts against the font bundle")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with open(args.typst_file, "r", encoding="utf-8") as f:
+        typst_content = f.read()
+
+    registry_fonts = font_registry.get()
+    font_setups = [("all", registry_fonts.font_paths, False)]
+    if args.fonts:
+        bundle = font_bundle.get(registry_fonts)
+        if bundle is None:
+            print("Font bundle is disabled or could not be built.", file=sys.stderr)
+        else:
+            if not bundle.covers(typst_content):
+                print("Warning: the source uses fonts missing from the bundle.", file=sys.stderr)
+            font_setups.append(("bundle", [bundle.path], True))
+
+    results = [
+        result
+        for result in (
+            benchmark_backend(backend, typst_content, args.runs, label, font_paths, ignore_system_fonts)
+            for backend in ("cli", "python")
+            for label, font_paths, ignore_system_fonts in font_setups
+        )
+        if result is not None
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'backend':<8} {'fonts':<7} {'setup':>9} {'cold':>9} {'mean':>9} {'p50':>9} {'p95':>9} {'min':>9}")
+    for r in results:
+        print(
+            f"{r['backend']:<8} {r['fonts']:<7} {r['setup_ms']:>7.1f}ms {r['cold_ms']:>7.1f}ms {r['mean_ms']:>7.1f}ms "
+            f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['min_ms']:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
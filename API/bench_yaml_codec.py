@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Compares YAML parse and dump throughput of the pure-Python safe loader and
+dumper against libyaml's C ones, which yaml_codec uses when available.
+
+Runs on every theme file in templates/themes, plus a CV with hundreds of
+entries generated from the classic theme (as in bench_render_pipeline.py),
+and prints documents per second, MB/s and the speedup for each.
+
+Usage:
+    python bench_yaml_codec.py [--runs N] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import yaml
+
+import yaml_codec
+from bench_render_pipeline import CORPUS_SIZES, build_cv, load_theme_templates
+from theme_manager import THEMES_DIR
+
+CODECS = {"python": (yaml.SafeLoader, yaml.SafeDumper)}
+if getattr(yaml, "__with_libyaml__", False):
+    CODECS["libyaml"] = (yaml.CSafeLoader, yaml.CSafeDumper)
+
+
+def load_documents():
+    """
+    Returns the benchmark inputs.
+
+    Returns:
+        list: (name, YAML text) pairs
+    """
+    documents = []
+    for name in sorted(os.listdir(THEMES_DIR)):
+        if name.endswith(".yaml"):
+            with open(os.path.join(THEMES_DIR, name), "r", encoding="utf-8") as f:
+                documents.append((name, f.read()))
+    huge = build_cv(load_theme_templates()["classic"], CORPUS_SIZES["huge"])
+    documents.append(("classic/huge (generated)", yaml_codec.dump(huge, sort_keys=False, allow_unicode=True)))
+    return documents
+
+
+def _rate(runs, seconds, size):
+    return {
+        "docs_per_s": round(runs / seconds, 1),
+        "mb_per_s": round(runs * size / seconds / 1e6, 2),
+    }
+
+
+def benchmark_document(yaml_text, runs):
+    """
+    Times `runs` loads and dumps of one document with every codec.
+
+    Returns:
+        dict: Codec -> {"load": rate, "dump": rate}
+    """
+    size = len(yaml_text.encode("utf-8"))
+    document = yaml.load(yaml_text, Loader=yaml.SafeLoader)
+    results = {}
+    for codec, (loader, dumper) in CODECS.items():
+        start = time.perf_counter()
+        for _ in range(runs):
+            yaml.load(yaml_text, Loader=loader)
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            dumped = yaml.dump(document, Dumper=dumper, default_flow_style=False, sort_keys=False, allow_unicode=True)
+        dump_seconds = time.perf_counter() - start
+
+        results[codec] = {
+            "load": _rate(runs, load_seconds, size),
+            "dump": _rate(runs, dump_seconds, len(dumped.encode("utf-8"))),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200, help="loads and dumps per document and codec")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if "libyaml" not in CODECS:
+        print("PyYAML was built without libyaml; only the pure-Python codec is measured.", file=sys.stderr)
+
+    results = []
+    for name, yaml_text in load_documents():
+        codecs = benchmark_document(yaml_text, args.runs)
+        result = {"document": name, "bytes": len(yaml_text.encode("utf-8")), "codecs": codecs}
+        if "libyaml" in codecs:
+            result["load_speedup"] = round(
+                codecs["libyaml"]["load"]["docs_per_s"] / codecs["python"]["load"]["docs_per_s"], 2)
+            result["dump_speedup"] = round(
+                codecs["libyaml"]["dump"]["docs_per_s"] / codecs["python"]["dump"]["docs_per_s"], 2)
+        results.append(result)
+
+    if args.json:
+        print(json.dumps({"service_codec": "libyaml" if yaml_codec.LIBYAML else "python", "results": results}, indent=2))
+        return
+
+    print(f"{'document':<26} {'bytes':>7} {'codec':<8} {'load docs/s':>12} {'load MB/s':>10} "
+          f"{'dump docs/s':>12} {'dump MB/s':>10}")
+    for r in results:
+        for codec, rates in r["codecs"].items():
+            print(
+                f"{r['document']:<26} {r['bytes']:>7} {codec:<8} {rates['load']['docs_per_s']:>12.1f} "
+                f"{rates['load']['mb_per_s']:>10.2f} {rates['dump']['docs_per_s']:>12.1f} {rates['dump']['mb_per_s']:>10.2f}"
+            )
+        if "load_speedup" in r:
+            print(f"{'':<26} {'':>7} speedup  load x{r['load_speedup']}, dump x{r['dump_speedup']}")
+    print(f"\nThe service uses the {'libyaml' if yaml_codec.LIBYAML else 'pure-Python'} codec.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Pathological-input benchmark for the YAML text fixer.
+
+The fixer runs on text that did not parse, which is whatever the editor
+happened to contain. This benchmark times `fix_yaml_text` on inputs shaped to
+hurt backtracking regexes, doubling the size up to several megabytes, and
+checks the cost per byte stays flat. For comparison it also times the
+`re.sub` chain the fixer replaced, on the smaller sizes only, since that one
+is quadratic on some of these inputs.
+
+Inputs:
+    whitespace  Blank and indented-but-empty lines: one long whitespace run
+    indented    Deeply nested mappings, one key per line
+    long_line   Megabyte-long scalar lines, such as an inlined image
+    broken_cv   A generated CV with every fixable field and an unclosed quote
+
+Usage:
+    python bench_yaml_text_repair.py [--sizes-kb 16,64,256,1024,4096] [--legacy-max-kb 16] [--json]
+
+Exits with status 1 if the cost per byte on the largest size exceeds
+--max-growth times that on the smallest.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+import yaml_codec
+from bench_render_pipeline import CORPUS_SIZES, build_cv, load_theme_templates
+from yaml_validator_fixer import fix_yaml_text
+
+SIZES_KB = (16, 64, 256, 1024, 4096)
+
+# The fixer before the rule table drove it, kept to show what was replaced
+LEGACY_PASSES = (
+    (re.compile(r'(\s+)small_caps_for_name:\s*[^\n]+\n'), r'\1'),
+    (re.compile(r'(\s+)use_urls_as_placeholders_for_connections:\s*[^\n]+\n'), r'\1'),
+    (re.compile(r'(\s+)make_connections_links:\s*[^\n]+\n'), r'\1'),
+    (re.compile(r'(\s+type:\s*)[\'"](?!with-partial-line|with-full-line|without-line|moderncv)[^\'"]+[\'"]'),
+     r'\1"with-partial-line"'),
+    (re.compile(r'(\s+)nested_bullet:\s*[^\n]+\n'), r'\1'),
+)
+
+BROKEN_DESIGN = """design:
+  theme: classic
+  header:
+    small_caps_for_name: true
+    use_urls_as_placeholders_for_connections: true
+    make_connections_links: true
+  section_titles:
+    type: 'invalid-type'
+  highlights:
+    nested_bullet: '>'
+"""
+
+
+def legacy_fix(yaml_content):
+    for pattern, replacement in LEGACY_PASSES:
+        yaml_content = pattern.sub(replacement, yaml_content)
+    return yaml_content
+
+
+def _repeat_to(unit, size):
+    return unit * max(1, size // len(unit))
+
+
+def make_whitespace(size):
+    return "cv:\n  name: x\n" + _repeat_to(" " * 62 + "\n", size) + "design:\n  theme: classic\n"
+
+
+def make_indented(size):
+    depth, lines = 40, []
+    for level in range(depth):
+        lines.append("  " * level + f"level_{level}:\n")
+    unit = "".join(lines) + "  " * depth + "type: 'invalid-type'\n"
+    return _repeat_to(unit, size)
+
+
+def make_long_line(size):
+    return "cv:\n  photo: " + "A" * size + "\n  name: x\n" + BROKEN_DESIGN
+
+
+def make_broken_cv(size):
+    template = load_theme_templates()["classic"]
+    block = yaml_codec.dump(build_cv(template, CORPUS_SIZES["huge"])["cv"], sort_keys=False, allow_unicode=True)
+    block = "cv:\n" + "".join("  " + line + "\n" for line in block.splitlines())
+    # The unclosed quote is what makes the document fail to parse
+    broken = BROKEN_DESIGN + "  locale: 'unclosed\n"
+    return _repeat_to(block, size - len(broken)) + broken
+
+
+INPUTS = {
+    "whitespace": make_whitespace,
+    "indented": make_indented,
+    "long_line": make_long_line,
+    "broken_cv": make_broken_cv,
+}
+
+
+def _best_seconds(fix, text, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fix(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_input(name, sizes_kb, runs, legacy_max_kb):
+    """
+    Times both fixers on one input shape at every size.
+
+    Returns:
+        list: One dict per size with bytes, seconds and ns per byte
+    """
+    rows = []
+    for size_kb in sizes_kb:
+        text = INPUTS[name](size_kb * 1024)
+        seconds = _best_seconds(fix_yaml_text, text, runs)
+        row = {"input": name, "kb": size_kb, "bytes": len(text), "seconds": round(seconds, 6),
+               "ns_per_byte": round(seconds * 1e9 / len(text), 2)}
+        if size_kb <= legacy_max_kb:
+            legacy = _best_seconds(legacy_fix, text, 1)
+            row["legacy_seconds"] = round(legacy, 6)
+            row["legacy_ns_per_byte"] = round(legacy * 1e9 / len(text), 2)
+        rows.append(row)
+    return rows
+
+
+def check_linear(rows, max_growth):
+    """
+    Returns the inputs whose cost per byte grew more than `max_growth` times
+    from the smallest to the largest size.
+    """
+    failures = []
+    by_input = {}
+    for row in rows:
+        by_input.setdefault(row["input"], []).append(row)
+    for name, input_rows in by_input.items():
+        input_rows = sorted(input_rows, key=lambda r: r["bytes"])
+        growth = input_rows[-1]["ns_per_byte"] / max(input_rows[0]["ns_per_byte"], 1e-9)
+        if growth > max_growth:
+            failures.append({"input": name, "growth": round(growth, 2)})
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-kb", default=",".join(map(str, SIZES_KB)), help="comma-separated input sizes in KiB")
+    parser.add_argument("--inputs", default=",".join(INPUTS), help="comma-separated input shapes")
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per size (the best is kept)")
+    parser.add_argument("--legacy-max-kb", type=int, default=16, help="largest size to time the regex chain on")
+    parser.add_argument("--max-growth", type=float, default=3.0, help="allowed growth of the cost per byte")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    sizes_kb = sorted(int(s) for s in args.sizes_kb.split(",") if s)
+    rows = []
+    for name in [n for n in args.inputs.split(",") if n]:
+        rows.extend(benchmark_input(name, sizes_kb, args.runs, args.legacy_max_kb))
+    failures = check_linear(rows, args.max_growth)
+
+    if args.json:
+        print(json.dumps({"results": rows, "failures": failures}, indent=2))
+    else:
+        print(f"{'input':<11} {'KiB':>6} {'ms':>9} {'ns/B':>7} {'legacy ms':>11} {'legacy ns/B':>12}")
+        for r in rows:
+            legacy = (f"{r['legacy_seconds'] * 1000:>11.1f} {r['legacy_ns_per_byte']:>12.1f}"
+                      if "legacy_seconds" in r else f"{'-':>11} {'-':>12}")
+            print(f"{r['input']:<11} {r['kb']:>6} {r['seconds'] * 1000:>9.1f} {r['ns_per_byte']:>7.1f} {legacy}")
+        for f in failures:
+            print(f"NOT LINEAR: {f['input']} cost per byte grew x{f['growth']}", file=sys.stderr)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Validation-only checks of CVs, for editors that lint on every keystroke.
+
+`CvValidator.validate_yaml` parses the YAML once into both the document and
+its node tree and applies the fixes a render would (the fix rules and the
+field repairs of `validation_repair`). It then runs RenderCV's model
+validation (through `rendercv_models`, so unchanged designs are not
+validated again) without generating Typst and maps every remaining error
+onto a line and column of the text. RenderCV's validation runs on the
+generation pool's worker processes, like the rest of RenderCV, so it does not
+hold the web process's GIL.
+
+Validation outcomes are cached by document hash, both before and after the
+field repairs RenderCV's errors led to. A document the editor has already
+sent, possibly formatted differently, only costs the parse; positions always
+come from the text as sent.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import render_cache
+import validation_repair
+import yaml_codec
+from generation_pool import generation_pool
+from yaml_validator_fixer import fix_document, fix_yaml_text, load_yaml_document
+
+try:
+    import rendercv.api  # noqa: F401
+    VALIDATION_AVAILABLE = True
+except ImportError:
+    VALIDATION_AVAILABLE = False
+
+# Validation outcomes kept, by document hash
+VALIDATION_CACHE_MAX_ENTRIES = int(os.environ.get('VALIDATION_CACHE_MAX_ENTRIES', '512'))
+
+
+def locate(root: Any, loc: Sequence[Any]) -> Tuple[int, int]:
+    """
+    Returns the 1-based line and column of the field an error location names.
+
+    Segments that are not keys or indices of the document (model names) are
+    skipped. For a missing field this is the position of its parent.
+
+    Args:
+        root: Root node from `yaml_codec.compose_and_load`
+        loc: Error location, or a document path
+    """
+    mark = root.start_mark
+    node = root
+    for segment in loc:
+        segment = str(segment)
+        if node.id == 'mapping':
+            for key_node, value_node in node.value:
+                if key_node.id == 'scalar' and key_node.value == segment:
+                    mark, node = key_node.start_mark, value_node
+                    break
+        elif node.id == 'sequence' and segment.isdigit() and int(segment) < len(node.value):
+            node = node.value[int(segment)]
+            mark = node.start_mark
+    return mark.line + 1, mark.column + 1
+
+
+def _diagnostic(message, line=None, column=None, path='', **fields):
+    return dict(path=path, message=message, line=line, column=column, **fields)
+
+
+def _text_repair_parses(yaml_content: str) -> bool:
+    """Whether `fix_yaml_text` turns YAML that does not parse into a CV a render accepts."""
+    fixed, fired = fix_yaml_text(yaml_content)
+    return bool(fired) and load_yaml_document(fixed) is not None
+
+
+class ValidationResult:
+    """
+    Outcome of validating one CV.
+
+    Attributes:
+        errors (list): Diagnostics (`path`, `message`, `line`, `column`, `input`)
+            for the problems a render would fail on; a YAML syntax error is
+            `repairable` when a render would still go ahead on the text as the
+            fix rules repair it
+        fixes (list): The fixes a render would apply silently, as `rule` ids or
+            repaired fields with their position
+        cached (bool): Whether RenderCV's validation was skipped because the
+            same document was validated before
+    """
+
+    def __init__(self, errors, fixes=None, cached=False):
+        self.errors = errors
+        self.fixes = fixes or []
+        self.cached = cached
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def to_payload(self):
+        return {"valid": self.valid, "errors": self.errors, "fixes": self.fixes, "cached": self.cached}
+
+
+class CvValidator:
+    """
+    Validates CVs and caches the outcome by document hash.
+
+    Args:
+        validate: Returns RenderCV's errors for a document
+        max_entries: Number of outcomes kept
+    """
+
+    def __init__(self, validate: Callable[[Dict[str, Any]], List[Dict[str, Any]]] = generation_pool.validation_errors,
+                 max_entries: int = VALIDATION_CACHE_MAX_ENTRIES):
+        self._validate = validate
+        self.max_entries = max_entries
+        # Document hash -> (errors, repairs) with locations as document paths
+        self._entries: 'OrderedDict[str, Tuple[list, list]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def validate_yaml(self, yaml_content: str) -> ValidationResult:
+        """
+        Validates a CV given as YAML text.
+
+        Args:
+            yaml_content: The YAML text as the editor holds it
+
+        Returns:
+            ValidationResult: Errors and fixes with their positions in the text
+        """
+        try:
+            root, document = yaml_codec.compose_and_load(yaml_content)
+        except yaml_codec.YAMLError as e:
+            mark = getattr(e, 'problem_mark', None)
+            problem = getattr(e, 'problem', None) or str(e)
+            # A render parses the text again once the fix rules repaired it
+            repairable = _text_repair_parses(yaml_content)
+            if mark is None:
+                return ValidationResult([_diagnostic(f"YAML syntax error: {problem}", repairable=repairable)])
+            return ValidationResult([_diagnostic(f"YAML syntax error: {problem}", mark.line + 1, mark.column + 1,
+                                                 repairable=repairable)])
+        if not isinstance(document, dict):
+            return ValidationResult([_diagnostic("The CV must be a YAML mapping with a 'cv' section.", 1, 1)])
+
+        document, fired = fix_document(document)
+        repairs = validation_repair.apply_known_repairs(document)
+        key = render_cache.hash_document(document)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        cached = entry is not None
+        if entry is None:
+            entry = self._validate_document(document)
+            # The repairs are remembered, so the next request for this text
+            # arrives already repaired; its document is cached as well
+            repaired_key = render_cache.hash_document(document)
+            with self._lock:
+                self._entries[key] = entry
+                if repaired_key != key:
+                    self._entries[repaired_key] = (entry[0], [])
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        errors, later_repairs = entry
+        fixes = [{"rule": rule_id} for rule_id in fired]
+        for repair in repairs + later_repairs:
+            line, column = locate(root, repair.path)
+            fixes.append({"path": '.'.join(map(str, repair.path)), "action": repair.action[0],
+                          "line": line, "column": column})
+        diagnostics = []
+        for error in errors:
+            loc = error.get('loc') or ()
+            line, column = locate(root, loc)
+            diagnostics.append(_diagnostic(error.get('msg', 'Unknown validation error'), line, column,
+                                           path='.'.join(map(str, loc)), input=error.get('input', '')))
+        return ValidationResult(diagnostics, fixes, cached)
+
+    def _validate_document(self, document: Dict[str, Any]) -> Tuple[list, list]:
+        # Repair what a render would repair, within the same number of retries
+        repairs: List[validation_repair.Repair] = []
+        errors = self._validate(document)
+        for _ in range(validation_repair.MAX_REPAIR_ATTEMPTS):
+            if not errors:
+                break
+            repaired, unrepaired = validation_repair.repair_document(document, errors)
+            repairs.extend(repaired)
+            if unrepaired or not repaired:
+                errors = unrepaired or errors
+                break
+            errors = self._validate(document)
+        return errors, repairs
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+validator = CvValidator()
@@ -0,0 +1,243 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import Iterable, Optional, Set
+
+import yaml_codec
+from font_registry import FontSnapshot
+from theme_manager import THEMES_DIR
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to compile with every font directory and the system fonts
+FONT_BUNDLE = os.environ.get('FONT_BUNDLE', '1') != '0'
+
+# Where the consolidated font directories are built
+FONT_BUNDLE_DIR = os.environ.get('FONT_BUNDLE_DIR', os.path.join(tempfile.gettempdir(), 'rendercv-font-bundle'))
+
+# Fonts RenderCV's built-in themes use when a CV does not set a font family
+RENDERCV_THEME_FONTS = {
+    'classic': 'Source Sans 3',
+    'sb2nov': 'New Computer Modern',
+    'engineeringresumes': 'XCharter',
+    'engineeringclassic': 'Raleway',
+    'moderncv': 'Fontin',
+}
+
+_MARKER = '.complete'
+_QUOTED = re.compile(r'"([^"\\\n]{1,100})"')
+# Font families a Typst source asks for: RenderCV's `#let design-...-font-family = "X"`
+# and `font: "X"` / `font: ("X", "Y")` arguments
+_FONT_FAMILY = re.compile(r'font(?:-family)?\s*[:=]\s*\(?\s*((?:"[^"\\\n]{1,100}"\s*,?\s*)+)')
+
+
+def _collect_font_families(node, families: Set[str]) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(key, str) and key.endswith('font_family') and isinstance(value, str):
+                families.add(value)
+            else:
+                _collect_font_families(value, families)
+    elif isinstance(node, list):
+        for item in node:
+            _collect_font_families(item, families)
+
+
+def theme_font_families(themes_dir: str = THEMES_DIR) -> Set[str]:
+    """
+    Returns the font families the installed theme templates use: every
+    `*font_family` value in their `design` section, plus the default font of
+    each RenderCV theme they are based on.
+    """
+    families = set()
+    if not os.path.isdir(themes_dir):
+        return families
+    for name in sorted(os.listdir(themes_dir)):
+        if not name.endswith('.yaml'):
+            continue
+        try:
+            with open(os.path.join(themes_dir, name), 'r', encoding='utf-8') as f:
+                design = (yaml_codec.load(f) or {}).get('design') or {}
+        except (OSError, yaml_codec.YAMLError, AttributeError) as e:
+            logger.warning(f"Could not read fonts of theme {name}: {e}")
+            continue
+        _collect_font_families(design, families)
+        default_font = RENDERCV_THEME_FONTS.get(design.get('theme', 'classic'))
+        if default_font:
+            families.add(default_font)
+    return families
+
+
+def requested_font_families(typst_content: str) -> Set[str]:
+    """Returns the font families a Typst source sets, by name."""
+    families = set()
+    for group in _FONT_FAMILY.findall(typst_content):
+        families.update(_QUOTED.findall(group))
+    return families
+
+
+def is_icon_font(font) -> bool:
+    name = os.path.basename(font.path).lower()
+    return (
+        name.startswith('fa-') or 'icon' in name or 'awesome' in name
+        or any('Font Awesome' in family for family in font.families)
+    )
+
+
+class FontBundle:
+    """
+    A directory holding one copy of each font a render normally needs.
+
+    Attributes:
+        path (str): The directory, passed to Typst as its only font path
+        families (set): Families available in the bundle
+        files (int): Number of font files in the bundle
+        size (int): Total size of those files in bytes
+        source_files (int): Number of font files in the source directories
+        source_size (int): Total size of the source font files in bytes
+    """
+
+    def __init__(self, path, families, files, size, source_files, source_size):
+        self.path = path
+        self.families = families
+        self.files = files
+        self.size = size
+        self.source_files = source_files
+        self.source_size = source_size
+
+    def covers(self, typst_content: str) -> bool:
+        """
+        Returns True if every font family the Typst source asks for is in the
+        bundle, so compiling against the bundle alone changes nothing. A family
+        outside the bundle may be a system font, which the bundle's compiler
+        does not search, so it is never covered.
+        """
+        return not requested_font_families(typst_content) - self.families
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "families": sorted(self.families),
+            "files": self.files,
+            "bytes": self.size,
+            "source_files": self.source_files,
+            "source_bytes": self.source_size,
+        }
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_font_bundle(fonts: FontSnapshot, families: Iterable[str], parent_dir: str = FONT_BUNDLE_DIR) -> FontBundle:
+    """
+    Builds (or reuses) a directory with the fonts of the given families and all
+    icon fonts, keeping a single copy of files that appear in several source
+    directories. Files are hard-linked where possible.
+
+    Args:
+        fonts: Current font registry snapshot
+        families: Font families to include
+        parent_dir: Directory the bundle is created in
+
+    Returns:
+        FontBundle: The bundle
+    """
+    wanted = set(families)
+    selected = []
+    seen_digests = set()
+    for font in fonts.fonts:
+        if not (wanted & set(font.families)) and not is_icon_font(font):
+            continue
+        digest = _file_digest(font.path)
+        if digest in seen_digests:
+            continue
+        seen_digests.add(digest)
+        selected.append((font, digest))
+
+    bundle_id = hashlib.sha256('\0'.join(sorted(d for _, d in selected)).encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(parent_dir, bundle_id)
+    if not os.path.exists(os.path.join(path, _MARKER)):
+        os.makedirs(parent_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.build-', dir=parent_dir)
+        used_names = set()
+        for font, digest in selected:
+            name = os.path.basename(font.path)
+            if name in used_names:
+                name = f"{digest[:8]}-{name}"
+            used_names.add(name)
+            target = os.path.join(staging, name)
+            try:
+                os.link(font.path, target)
+            except OSError:
+                shutil.copyfile(font.path, target)
+        open(os.path.join(staging, _MARKER), 'w').close()
+        try:
+            os.rename(staging, path)
+        except OSError:
+            # Another process finished the same bundle first
+            shutil.rmtree(staging, ignore_errors=True)
+
+    bundle_families = {family for font, _ in selected for family in font.families}
+    return FontBundle(
+        path=path,
+        families=bundle_families,
+        files=len(selected),
+        size=sum(font.size for font, _ in selected),
+        source_files=len(fonts.fonts),
+        source_size=sum(font.size for font in fonts.fonts),
+    )
+
+
+class FontBundleManager:
+    """
+    Keeps the font bundle in step with the font registry, rebuilding it when
+    the registry reports new fonts.
+    """
+
+    def __init__(self, enabled: bool = FONT_BUNDLE, themes_dir: str = THEMES_DIR,
+                 parent_dir: str = FONT_BUNDLE_DIR):
+        self.enabled = enabled
+        self.themes_dir = themes_dir
+        self.parent_dir = parent_dir
+        self._lock = threading.Lock()
+        self._bundle: Optional[FontBundle] = None
+        self._version = None
+
+    def get(self, fonts: FontSnapshot) -> Optional[FontBundle]:
+        """
+        Returns the bundle for the given font snapshot, or None if bundling is
+        disabled or failed.
+        """
+        if not self.enabled:
+            return None
+        if self._version == fonts.version:
+            return self._bundle
+        with self._lock:
+            if self._version != fonts.version:
+                try:
+                    self._bundle = build_font_bundle(fonts, theme_font_families(self.themes_dir), self.parent_dir)
+                    logger.info(
+                        f"Font bundle {self._bundle.path}: {self._bundle.files} of {self._bundle.source_files} "
+                        f"font files, families: {', '.join(sorted(self._bundle.families))}"
+                    )
+                except OSError as e:
+                    logger.warning(f"Could not build the font bundle, using all font directories: {e}")
+                    self._bundle = None
+                self._version = fonts.version
+            return self._bundle
+
+    def stats(self, fonts: FontSnapshot) -> Optional[dict]:
+        bundle = self.get(fonts)
+        return bundle.stats() if bundle is not None else None
+
+
+font_bundle = FontBundleManager()
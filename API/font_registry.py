@@ -0,0 +1,260 @@
+import hashlib
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the font directories for changes; the check only
+# stats the directories already known, it does not walk them
+FONT_REGISTRY_CHECK_INTERVAL = float(os.environ.get('FONT_REGISTRY_CHECK_INTERVAL', '5'))
+
+# Font formats Typst can load
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc', '.otc')
+
+# OpenType name IDs for the typographic and the legacy family name
+_TYPOGRAPHIC_FAMILY = 16
+_FAMILY = 1
+
+
+def source_font_dirs() -> List[Tuple[str, bool]]:
+    """
+    Returns the directories fonts are read from: RenderCV's bundled fonts and
+    the optional RENDERCV_FONT_PATH directory holding Font Awesome.
+
+    Returns:
+        list: (directory, True if it is the custom font path) pairs; the
+            directories may not exist
+    """
+    directories = []
+    try:
+        from rendercv.constants import ASSETS_DIR
+        directories.append((os.path.join(ASSETS_DIR, "fonts"), False))
+    except ImportError:
+        logger.warning("Could not import ASSETS_DIR from rendercv.constants. Icons may not render correctly.")
+
+    custom_font_path = os.environ.get('RENDERCV_FONT_PATH')
+    if custom_font_path:
+        directories.append((custom_font_path, True))
+    return directories
+
+
+def _decode_name(platform_id: int, raw: bytes) -> str:
+    if platform_id in (0, 3):
+        return raw.decode('utf-16-be', errors='replace')
+    return raw.decode('mac_roman', errors='replace')
+
+
+def _read_name_table(data: bytes, offset: int) -> List[str]:
+    # Offset table of a single font: sfnt version, numTables, ...
+    num_tables = struct.unpack_from('>H', data, offset + 4)[0]
+    for i in range(num_tables):
+        tag, _, table_offset, _ = struct.unpack_from('>4sIII', data, offset + 12 + 16 * i)
+        if tag != b'name':
+            continue
+        _, count, string_offset = struct.unpack_from('>HHH', data, table_offset)
+        names: Dict[int, str] = {}
+        for j in range(count):
+            platform_id, _, language_id, name_id, length, name_offset = struct.unpack_from(
+                '>HHHHHH', data, table_offset + 6 + 12 * j
+            )
+            if name_id not in (_TYPOGRAPHIC_FAMILY, _FAMILY) or name_id in names:
+                continue
+            # English names only: Windows en-US or Mac English
+            if (platform_id, language_id) not in ((3, 0x409), (1, 0)):
+                continue
+            start = table_offset + string_offset + name_offset
+            names[name_id] = _decode_name(platform_id, data[start:start + length])
+        family = names.get(_TYPOGRAPHIC_FAMILY) or names.get(_FAMILY)
+        return [family] if family else []
+    return []
+
+
+def read_font_families(path: str) -> List[str]:
+    """
+    Reads the family names declared in a font file's name table.
+
+    Args:
+        path: TrueType/OpenType font or collection
+
+    Returns:
+        list: Family names, empty if the file could not be parsed
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] == b'ttcf':
+            num_fonts = struct.unpack_from('>I', data, 8)[0]
+            offsets = struct.unpack_from(f'>{num_fonts}I', data, 12)
+        else:
+            offsets = (0,)
+        families = []
+        for offset in offsets:
+            for family in _read_name_table(data, offset):
+                if family not in families:
+                    families.append(family)
+        return families
+    except (OSError, struct.error, IndexError) as e:
+        logger.warning(f"Could not read font names from {path}: {e}")
+        return []
+
+
+class FontFile:
+    """
+    A font file found in one of the font directories.
+
+    Attributes:
+        path (str): Location of the file
+        families (list): Family names it declares
+        size (int): File size in bytes
+    """
+
+    def __init__(self, path, families, size):
+        self.path = path
+        self.families = families
+        self.size = size
+
+
+class FontSnapshot:
+    """
+    Immutable view of the available fonts, as used by the render hot path.
+
+    Attributes:
+        version (int): Incremented whenever the fonts change
+        font_paths (list): Directories to pass to Typst as `--font-path`
+        fonts (list): FontFile entries of every font found
+        families (list): Sorted family names of every font found
+        family_set (frozenset): The same names, for membership tests
+        font_awesome (bool): True if Font Awesome files are present
+        font_awesome_brands (bool): True if the Font Awesome brand icons are present
+        icon_fonts (bool): True if any icon font is present
+        fingerprint (str): Hash of the font files, changes when any of them does
+    """
+
+    def __init__(self, version, font_paths, fonts):
+        self.version = version
+        self.font_paths = font_paths
+        self.fonts = fonts
+        self.family_set = frozenset(family for font in fonts for family in font.families)
+        self.families = sorted(self.family_set)
+
+        names = [os.path.basename(font.path).lower() for font in fonts]
+        fa_files = [name for name in names if name.startswith('fa-')]
+        self.font_awesome = bool(fa_files) or any('Font Awesome' in f for f in self.families)
+        self.font_awesome_brands = (
+            any('brands' in name for name in fa_files)
+            or any('Font Awesome' in f and 'Brands' in f for f in self.families)
+        )
+        self.icon_fonts = self.font_awesome or any('icon' in name or 'awesome' in name for name in names)
+
+        digest = hashlib.sha256()
+        for path in font_paths:
+            digest.update(path.encode('utf-8') + b'\0')
+        for font in fonts:
+            digest.update(f"{font.path}\0{font.size}\0".encode('utf-8'))
+        self.fingerprint = digest.hexdigest()
+
+
+class FontRegistry:
+    """
+    Scans the font directories once and serves the result from memory.
+
+    The directories are walked only when the registry is built and when one of
+    them changes; `get()` otherwise returns the cached snapshot, re-checking the
+    directories' modification times at most every `check_interval` seconds.
+    """
+
+    def __init__(self, directory_source=source_font_dirs, check_interval: float = FONT_REGISTRY_CHECK_INTERVAL):
+        self.directory_source = directory_source
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[FontSnapshot] = None
+        self._dir_mtimes: Dict[str, int] = {}
+        self._last_check = 0.0
+        self.scans = 0
+
+    @staticmethod
+    def _mtime(path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return -1
+
+    def _scan(self) -> FontSnapshot:
+        font_paths = []
+        fonts = []
+        dir_mtimes = {}
+        for directory, custom in self.directory_source():
+            dir_mtimes[directory] = self._mtime(directory)
+            if not os.path.isdir(directory):
+                logger.warning(f"Font directory does not exist: {directory}")
+                continue
+            if custom and not directory.endswith(('/', '\\')):
+                # typst expects a trailing separator on the custom font path
+                directory += os.path.sep
+            font_paths.append(directory)
+            for root, dirs, files in os.walk(directory):
+                dirs.sort()
+                dir_mtimes[root] = self._mtime(root)
+                for name in sorted(files):
+                    if not name.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, name)
+                    families = read_font_families(path) or [os.path.splitext(name)[0].rsplit('-', 1)[0]]
+                    fonts.append(FontFile(path, families, os.path.getsize(path)))
+
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        snapshot = FontSnapshot(version, font_paths, fonts)
+        self._dir_mtimes = dir_mtimes
+        self.scans += 1
+
+        logger.info(f"Font registry v{version}: {len(fonts)} fonts in {font_paths}")
+        logger.info(f"Font families: {', '.join(snapshot.families)}")
+        if snapshot.font_awesome:
+            logger.info(f"Font Awesome available (brands: {snapshot.font_awesome_brands})")
+        elif not snapshot.icon_fonts:
+            logger.warning("No icon fonts detected - icons may not render correctly in the PDF")
+        return snapshot
+
+    def _changed(self) -> bool:
+        return any(self._mtime(path) != mtime for path, mtime in self._dir_mtimes.items())
+
+    def get(self) -> FontSnapshot:
+        """
+        Returns the current font snapshot, rescanning if the directories changed.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._last_check < self.check_interval:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or (
+                time.monotonic() - self._last_check >= self.check_interval and self._changed()
+            ):
+                self._snapshot = self._scan()
+            self._last_check = time.monotonic()
+            return self._snapshot
+
+    def refresh(self) -> FontSnapshot:
+        """Rescans the font directories unconditionally."""
+        with self._lock:
+            self._snapshot = self._scan()
+            self._last_check = time.monotonic()
+            return self._snapshot
+
+    def stats(self) -> dict:
+        snapshot = self.get()
+        return {
+            "version": snapshot.version,
+            "font_paths": snapshot.font_paths,
+            "fonts": len(snapshot.fonts),
+            "families": snapshot.families,
+            "font_awesome": snapshot.font_awesome,
+            "icon_fonts": snapshot.icon_fonts,
+            "scans": self.scans,
+        }
+
+
+font_registry = FontRegistry()
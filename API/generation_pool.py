@@ -0,0 +1,173 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from render_cancellation import RenderCancelled, check
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes generating Typst source with RenderCV; 0 runs
+# generation on the request thread instead
+GENERATION_WORKERS = int(os.environ.get('GENERATION_WORKERS', str(os.cpu_count() or 1)))
+
+
+class GenerationFailed(Exception):
+    """
+    Raised in place of an exception from RenderCV inside a worker, since not all
+    of those survive pickling back to the parent process.
+    """
+
+    def __init__(self, error_type, message):
+        super().__init__(error_type, message)
+        self.error_type = error_type
+        self.message = message
+
+    def __str__(self):
+        return f"{self.error_type}: {self.message}"
+
+
+def _init_worker():
+    # Import RenderCV once per worker so requests never pay for it
+    import rendercv.api  # noqa: F401
+    import rendercv_models  # noqa: F401
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def _generate_typst(cv):
+    from rendercv.api import create_contents_of_a_typst_file_from_a_yaml_string
+    import rendercv_models
+    try:
+        if isinstance(cv, dict):
+            # Already parsed by the render pipeline; this worker validates its
+            # design section only when it has not seen it before
+            return rendercv_models.generate_typst(cv)
+        return create_contents_of_a_typst_file_from_a_yaml_string(
+            yaml_file_as_string=cv
+        )
+    except Exception as e:
+        raise GenerationFailed(type(e).__name__, str(e)) from None
+
+
+def _validation_errors(document):
+    import rendercv_models
+    try:
+        return rendercv_models.validation_errors(document)
+    except Exception as e:
+        raise GenerationFailed(type(e).__name__, str(e)) from None
+
+
+class GenerationPool:
+    """
+    Pool of pre-started worker processes that turn YAML into Typst source, and
+    validate CVs for /validate.
+
+    RenderCV's validation, Markdown conversion and Jinja rendering are pure
+    Python and hold the GIL, so running them in separate processes lets
+    concurrent renders use every core. Workers are started eagerly with RenderCV
+    already imported. If the pool breaks, it is recreated on the next call and
+    the current request is generated in-process.
+    """
+
+    def __init__(self, workers=GENERATION_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # forkserver avoids forking a parent that is already running threads
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=_init_worker,
+                )
+                for _ in range(self.workers):
+                    self._executor.submit(_warm_up)
+                logger.info(f"Started {self.workers} Typst generation workers ({method}).")
+            return self._executor
+
+    def start(self):
+        """Starts the worker processes ahead of the first request."""
+        if self.enabled:
+            self._get_executor()
+
+    def generate_typst(self, cv, cancel_token=None):
+        """
+        Generates Typst source from a CV with RenderCV.
+
+        Args:
+            cv (dict or str): The parsed CV document, or its YAML content
+            cancel_token (CancelToken, optional): Drops the job if it is
+                cancelled before a worker picks it up
+
+        Returns:
+            str or list: The Typst source, or RenderCV's list of validation errors
+
+        Raises:
+            RenderCancelled: If the token was cancelled
+        """
+        return self._run(_generate_typst, cv, cancel_token)
+
+    def validation_errors(self, document, cancel_token=None):
+        """
+        Validates a parsed CV with RenderCV, without generating Typst.
+
+        Args:
+            document (dict): The parsed CV
+            cancel_token (CancelToken, optional): Drops the job if it is
+                cancelled before a worker picks it up
+
+        Returns:
+            list: RenderCV's errors (`loc`, `msg`, `input`); empty if it is valid
+
+        Raises:
+            RenderCancelled: If the token was cancelled
+        """
+        return self._run(_validation_errors, document, cancel_token)
+
+    def _run(self, fn, arg, cancel_token):
+        check(cancel_token)
+        if not self.enabled:
+            return fn(arg)
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, arg)
+            unregister = cancel_token.on_cancel(future.cancel) if cancel_token is not None else None
+            try:
+                result = future.result()
+            except CancelledError:
+                raise RenderCancelled() from None
+            finally:
+                if unregister is not None:
+                    unregister()
+            check(cancel_token)
+            return result
+        except BrokenProcessPool:
+            logger.error("Typst generation pool broke, restarting it and running the job in-process.")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            return fn(arg)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+generation_pool = GenerationPool()
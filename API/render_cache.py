@@ -0,0 +1,193 @@
+import datetime
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from render_cancellation import RenderCancelled
+from single_flight import SingleFlight
+
+# Default limits, overridable through the environment
+DEFAULT_MAX_BYTES = int(float(os.environ.get('RENDER_CACHE_SIZE_MB', '64')) * 1024 * 1024)
+DEFAULT_MAX_ENTRIES = int(os.environ.get('RENDER_CACHE_MAX_ENTRIES', '256'))
+
+
+def hash_document(parsed_yaml: Any) -> str:
+    """
+    Returns a canonical hash of a parsed YAML document.
+
+    The document is serialized to JSON with sorted keys, so comments, whitespace,
+    quoting style and key order in the original YAML do not affect the hash.
+    Today's date is mixed in because RenderCV stamps the current date into the
+    PDF when `rendercv_settings.date` is not set.
+
+    Args:
+        parsed_yaml: The document as returned by `yaml.safe_load`
+
+    Returns:
+        str: Hex digest identifying the document
+    """
+    canonical = json.dumps(
+        parsed_yaml,
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False,
+        default=str,
+    )
+    digest = hashlib.sha256()
+    digest.update(datetime.date.today().isoformat().encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(canonical.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """
+    Returns the hash of a raw text, used when a document cannot be parsed.
+
+    Args:
+        text: The text to hash
+
+    Returns:
+        str: Hex digest of the text
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Thread-safe LRU cache of rendered PDFs bounded by total size and entry count.
+
+    Lookups that miss can go through `get_or_render`, which coalesces concurrent
+    renders of the same key so that only the first caller does the work.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        # A cancelled render only fails its own request; waiters render themselves
+        self._flights = SingleFlight(retry_on=(RenderCancelled,))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the cached PDF for a key and marks it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bytes: The cached PDF, or None if the key is not cached
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """
+        Stores a PDF, evicting least recently used entries to stay within limits.
+        Values larger than the whole cache are not stored.
+
+        Args:
+            key: Cache key
+            value: PDF bytes to store
+        """
+        size = len(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+
+            self._entries[key] = value
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+                self.evictions += 1
+
+    def get_or_render(self, key: str, render: Callable[[], bytes], lookup: bool = True) -> Tuple[bytes, bool]:
+        """
+        Returns the cached PDF for a key, rendering and storing it on a miss.
+
+        Concurrent misses on the same key are coalesced: only the first caller
+        renders, and the others receive its PDF, or its exception, when it
+        finishes. Exceptions are never cached.
+
+        Args:
+            key: Cache key
+            render: Callable producing the PDF bytes
+            lookup: False if the caller has just missed with `get`, so the
+                miss is not counted twice
+
+        Returns:
+            tuple: (PDF bytes, True if this caller did not render it)
+        """
+        value = self.get(key) if lookup else None
+        if value is not None:
+            return value, True
+
+        rendered = []
+
+        def render_and_store():
+            # Another request may have stored this key just before we got here
+            with self._lock:
+                cached = self._entries.get(key)
+            if cached is not None:
+                return cached
+            result = render()
+            rendered.append(True)
+            self.put(key, result)
+            return result
+
+        value, shared = self._flights.do(key, render_and_store)
+        return value, shared or not rendered
+
+    def clear(self) -> None:
+        """Removes all cached entries. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            dict: Entry count, size in bytes, limits, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'coalesced': self._flights.coalesced,
+                'in_flight': self._flights.in_flight(),
+            }
+
+
+# Finished PDFs keyed by the canonical hash of the fixed YAML document
+pdf_cache = RenderCache()
+
+# Compiled PDFs keyed by the hash of the final Typst source, so YAML edits that
+# produce identical Typst output skip compilation
+typst_pdf_cache = RenderCache()
@@ -0,0 +1,151 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+# Editing sessions whose newest revision is remembered
+RENDER_REVISION_SESSIONS = int(os.environ.get('RENDER_REVISION_SESSIONS', '4096'))
+
+
+class RenderCancelled(Exception):
+    """
+    Raised when a render is abandoned because a newer revision of the same
+    editing session arrived or the client went away.
+    """
+
+
+class CancelToken:
+    """
+    Cancellation flag passed down the render pipeline.
+
+    Stages check it between steps, and long-running steps register callbacks
+    (for example killing the typst process) that run as soon as it is cancelled.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registers a callback to run on cancellation; runs it right away if the
+        token is already cancelled.
+
+        Returns:
+            callable: Function that unregisters the callback
+        """
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+
+                return remove
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled:
+            raise RenderCancelled()
+
+
+def check(cancel_token: Optional[CancelToken]) -> None:
+    """Raises RenderCancelled if the (optional) token has been cancelled."""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+
+
+def normalize_revision(revision):
+    """
+    Returns the revision number sent by a client, or None if it is missing or
+    not a non-negative integer.
+    """
+    if isinstance(revision, bool) or not isinstance(revision, int) or revision < 0:
+        return None
+    return revision
+
+
+class RevisionTracker:
+    """
+    Remembers the newest revision seen for each editing session.
+
+    Starting a render for a newer revision cancels the session's older one, and
+    a request that arrives after a newer revision is cancelled immediately, even
+    once the newer one has finished rendering. The newest revision is kept for
+    the `max_sessions` most recently active sessions.
+    """
+
+    def __init__(self, max_sessions: int = RENDER_REVISION_SESSIONS):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        # Session id -> (newest revision, token of its render in flight or None)
+        self._latest: 'OrderedDict[str, Tuple[int, Optional[CancelToken]]]' = OrderedDict()
+
+    def begin(self, session_id: Optional[str], revision: Optional[int]) -> CancelToken:
+        token = CancelToken()
+        if session_id is None or revision is None:
+            return token
+
+        superseded = None
+        with self._lock:
+            current = self._latest.get(session_id)
+            if current is not None and current[0] > revision:
+                stale = True
+            else:
+                stale = False
+                if current is not None and current[0] < revision:
+                    superseded = current[1]
+                self._latest[session_id] = (revision, token)
+            self._latest.move_to_end(session_id)
+            while len(self._latest) > self.max_sessions:
+                self._latest.popitem(last=False)
+
+        if stale:
+            token.cancel()
+        if superseded is not None:
+            superseded.cancel()
+        return token
+
+    def finish(self, session_id: Optional[str], token: CancelToken) -> None:
+        if session_id is None:
+            return
+        with self._lock:
+            current = self._latest.get(session_id)
+            if current is not None and current[1] is token:
+                # Keep the revision so older requests still arriving are refused
+                self._latest[session_id] = (current[0], None)
+
+    @contextmanager
+    def track(self, session_id: Optional[str], revision: Optional[int]):
+        """
+        Context manager yielding the cancel token for one render request.
+        """
+        token = self.begin(session_id, revision)
+        try:
+            yield token
+        finally:
+            self.finish(session_id, token)
+
+
+revisions = RevisionTracker()
@@ -0,0 +1,305 @@
+"""
+In-process render metrics in the Prometheus text exposition format.
+
+Stage durations are collected per request in a `RenderTimings` object that the
+render pipeline makes current with `track()`; code anywhere below it (the
+fixer, generation, the Typst compilers) wraps its work in `stage()`. When the
+request finishes, every stage is observed in the `render_stage_seconds`
+histogram labelled with the request's theme, which is usually only known once
+the YAML has been parsed.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Theme label values; anything else is reported as "other" to bound cardinality
+KNOWN_THEMES = ('classic', 'sb2nov', 'engineeringresumes', 'engineeringclassic', 'moderncv')
+
+
+def theme_label(theme) -> str:
+    if theme in KNOWN_THEMES:
+        return theme
+    return 'unknown' if theme is None else 'other'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def expose(self):
+        lines = self._header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), callback: Callable[[], Dict[Tuple[str, ...], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def expose(self):
+        lines = self._header()
+        for key, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def expose(self):
+        lines = self._header()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+stage_seconds = registry.register(Histogram(
+    'render_stage_seconds', 'Time spent in each render pipeline stage.', ('stage', 'theme')))
+render_seconds = registry.register(Histogram(
+    'render_seconds', 'End-to-end render time by kind (cv or theme_preview).', ('kind', 'theme', 'cache')))
+validation_failures = registry.register(Counter(
+    'render_validation_failures_total', 'Renders rejected by RenderCV validation after all fixes.', ('theme',)))
+fixer_retries = registry.register(Counter(
+    'render_fixer_retries_total', 'Validations retried after repairing the fields RenderCV rejected.', ('theme',)))
+cache_requests = registry.register(Counter(
+    'render_cache_requests_total', 'Render cache lookups by cache and result.', ('cache', 'result')))
+fix_rules_applied = registry.register(Counter(
+    'render_fix_rules_applied_total', 'Automatic fixes applied to CVs, by rule.', ('rule',)))
+validation_repairs = registry.register(Counter(
+    'render_validation_repairs_total', 'Fields removed or reset after RenderCV rejected them, by source (error or memo).',
+    ('source',)))
+validations = registry.register(Counter(
+    'render_validations_total', 'Validation-only requests, by result and whether RenderCV was skipped.',
+    ('result', 'cache')))
+typst_errors = registry.register(Counter(
+    'render_typst_errors_total', 'Typst compilations that failed.', ('theme',)))
+render_errors = registry.register(Counter(
+    'render_errors_total', 'Renders that failed, by kind and HTTP status.', ('kind', 'status')))
+
+
+class RenderTimings:
+    """
+    Stage durations of one render request.
+
+    Attributes:
+        theme (str): Theme label, set once the CV has been parsed
+        stages (dict): Stage name -> seconds, in the order stages first ran
+        total (float): Seconds from the start to the end of the render
+    """
+
+    def __init__(self, theme=None):
+        self.theme = theme
+        self.stages: Dict[str, float] = {}
+        self.total = 0.0
+        # Open stages: [name, start, time spent in nested stages]
+        self._open = []
+
+    def add(self, stage_name: str, seconds: float) -> None:
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+
+    def _enter(self, stage_name: str) -> None:
+        self._open.append([stage_name, time.perf_counter(), 0.0])
+
+    def _exit(self) -> None:
+        stage_name, start, nested = self._open.pop()
+        elapsed = time.perf_counter() - start
+        # A stage's own time excludes the stages nested inside it
+        self.add(stage_name, elapsed - nested)
+        if self._open:
+            self._open[-1][2] += elapsed
+
+
+_current: contextvars.ContextVar[Optional[RenderTimings]] = contextvars.ContextVar('render_timings', default=None)
+
+
+def current() -> Optional[RenderTimings]:
+    """Returns the timings of the render running in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def track():
+    """
+    Makes a fresh RenderTimings current for the block and observes its stages
+    in `render_stage_seconds` when the block ends.
+    """
+    timings = RenderTimings()
+    reset = _current.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.total = time.perf_counter() - start
+        _current.reset(reset)
+        label = theme_label(timings.theme)
+        for stage_name, seconds in timings.stages.items():
+            stage_seconds.observe(seconds, stage=stage_name, theme=label)
+
+
+@contextmanager
+def stage(stage_name: str):
+    """
+    Times the block as one stage of the current render. Time spent in stages
+    nested inside the block is counted for those stages only.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    timings._enter(stage_name)
+    try:
+        yield
+    finally:
+        timings._exit()
+
+
+def current_theme() -> str:
+    timings = _current.get()
+    return theme_label(timings.theme if timings is not None else None)
+
+
+def add_stage(timings: Optional[RenderTimings], stage_name: str, seconds: float) -> None:
+    """
+    Records a stage that ran outside the render's `track()` block, such as
+    waiting for a render slot before the render was handed to a thread.
+    """
+    if timings is None:
+        return
+    timings.add(stage_name, seconds)
+    timings.total += seconds
+    stage_seconds.observe(seconds, stage=stage_name, theme=theme_label(timings.theme))
+
+
+def server_timing(timings: Optional[RenderTimings], cache: Optional[str] = None) -> str:
+    """
+    Formats render timings as a `Server-Timing` header value, e.g.
+    `fix;dur=1.2, generate;dur=85.0, compile;dur=40.3, cache;desc="miss", total;dur=130.1`.
+
+    Args:
+        timings: Timings of the render, if any were collected
+        cache: Cache outcome to report ("hit", "miss"), if any
+
+    Returns:
+        str: The header value
+    """
+    entries = []
+    if timings is not None:
+        entries.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.stages.items())
+    if cache:
+        entries.append(f'cache;desc="{cache}"')
+    if timings is not None:
+        entries.append(f"total;dur={timings.total * 1000:.1f}")
+    return ', '.join(entries)
+
+
+def expose() -> str:
+    """Returns all metrics in the Prometheus text format."""
+    return registry.expose()
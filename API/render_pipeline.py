@@ -0,0 +1,572 @@
+import logging
+import traceback
+from contextlib import ExitStack
+
+import yaml_codec
+import validation_repair
+import cv_validation
+import rendercv_models
+from yaml_validator_fixer import fix_document, fix_yaml_text, load_yaml_document
+import render_cache
+import typst_compiler
+import typst_sessions
+import font_awesome_map
+import render_metrics
+from font_registry import font_registry
+from font_bundle import font_bundle
+from generation_pool import generation_pool
+from render_cancellation import RenderCancelled, check
+from render_scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+# Ensure RenderCV and its dependencies (Typst) are installed and accessible
+try:
+    # Use the function to generate Typst content
+    from rendercv.api import create_contents_of_a_typst_file_from_a_yaml_string
+    RENDERCV_AVAILABLE = True
+except ImportError:
+    print("ERROR: Cannot import from rendercv.api. Is RenderCV installed?")
+    create_contents_of_a_typst_file_from_a_yaml_string = None
+    RENDERCV_AVAILABLE = False
+
+class RenderError(Exception):
+    """
+    Raised by the render pipeline when a request cannot be turned into a PDF.
+    Carries the JSON error payload and the HTTP status code to return.
+    """
+
+    def __init__(self, message, details=None, status_code=500):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+        self.status_code = status_code
+
+    def to_payload(self):
+        payload = {"error": self.message}
+        if self.details is not None:
+            payload["details"] = self.details
+        return payload
+
+def _render_yaml_to_pdf(yaml_content, document, session_id=None, cancel_token=None):
+    """
+    Runs the CV -> Typst -> PDF pipeline for an already fixed CV.
+
+    Args:
+        yaml_content (str): YAML content as sent by the client, after
+            `fix_yaml_text` if it could not be parsed; None if the CV
+            was sent as a structured document
+        document (dict): The parsed document after the fix rules, handed to
+            RenderCV as is; fields RenderCV rejects are repaired in place
+            (see `validation_repair`). None if the content could not be parsed
+        session_id (str): Editing session to compile in, if any
+        cancel_token (CancelToken): Abandons the render when cancelled
+
+    Returns:
+        bytes: The compiled PDF
+
+    Raises:
+        RenderError: If validation or compilation fails
+        RenderCancelled: If the render was superseded
+    """
+    cv = document if document is not None else yaml_content
+
+    # Repairs remembered from earlier renders spare a validation that would fail
+    if document is not None:
+        _record_repairs(validation_repair.apply_known_repairs(document))
+
+    # === Step 1: Generate Typst content from the CV ===
+    logger.info("Generating Typst content from the CV...")
+    with render_metrics.stage('generate'):
+        typst_content = generation_pool.generate_typst(cv, cancel_token)
+
+    # === Step 1.5: Check for Validation Errors (RenderCV returns list on error) ===
+    if isinstance(typst_content, list):
+        logger.warning(f"RenderCV validation failed. Attempting to repair the reported fields...")
+
+        # Repair exactly the fields RenderCV reported, while every error can be repaired
+        attempts = 0
+        while isinstance(typst_content, list) and document is not None \
+                and attempts < validation_repair.MAX_REPAIR_ATTEMPTS:
+            with render_metrics.stage('fix_retry'):
+                repairs, unrepaired = validation_repair.repair_document(document, typst_content)
+            _record_repairs(repairs)
+            if unrepaired or not repairs:
+                # Another validation would fail on the remaining errors
+                typst_content = unrepaired or typst_content
+                break
+            attempts += 1
+            render_metrics.fixer_retries.inc(theme=render_metrics.current_theme())
+            with render_metrics.stage('generate'):
+                typst_content = generation_pool.generate_typst(document, cancel_token)
+
+        # If still failing, report the errors to the user
+        if isinstance(typst_content, list):
+            logger.warning(f"RenderCV validation still failed after fixes. Errors: {typst_content}")
+            # Format errors for frontend
+            error_messages = []
+            for error in typst_content:
+                field_path = '.'.join(error.get('loc', [])) # Join location tuple into string
+                message = error.get('msg', 'Unknown validation error')
+                error_messages.append(f"Field '{field_path}': {message}")
+
+            render_metrics.validation_failures.inc(theme=render_metrics.current_theme())
+            raise RenderError("YAML validation failed.", error_messages, 400) # Bad Request
+
+    if not typst_content:
+        # This might happen due to other internal RenderCV issues
+        logger.error("RenderCV generated empty Typst content without validation errors list.")
+        raise RenderError("Failed to generate Typst content. RenderCV returned empty result.")
+
+    # If we reach here, typst_content should be a string
+    if not isinstance(typst_content, str):
+        logger.error(f"RenderCV function returned unexpected type after validation check: {type(typst_content)}")
+        raise RenderError(f"Internal server error: Unexpected content type from RenderCV: {type(typst_content).__name__}")
+
+    logger.info("Typst content generated successfully (string received).")
+
+    # === Step 2: Inject Font Awesome setup when the icon fonts are available ===
+    fonts = font_registry.get()
+    if fonts.font_awesome_brands:
+        try:
+            # Inject Font Awesome setup into the Typst content
+            with render_metrics.stage('font_awesome'):
+                typst_content = font_awesome_map.inject_font_awesome_import(typst_content)
+            logger.info("Injected Font Awesome setup into Typst content")
+        except Exception as e:
+            logger.warning(f"Error injecting Font Awesome support: {e}")
+
+    # === Step 3: Compile, unless this exact Typst source was compiled before ===
+    check(cancel_token)
+    compiler = typst_compiler.get_compiler(typst_content)
+    source_key = render_cache.hash_text("\0".join([typst_content, fonts.fingerprint]))
+    pdf_data, cache_hit = render_cache.typst_pdf_cache.get_or_render(
+        source_key, lambda: _compile_typst_to_pdf(compiler, typst_content, session_id, cancel_token)
+    )
+    render_metrics.cache_requests.inc(cache='typst', result='hit' if cache_hit else 'miss')
+    if cache_hit:
+        logger.info(f"Typst source unchanged (key {source_key[:12]}), skipped compilation.")
+    return pdf_data
+
+def _compile_typst_to_pdf(compiler, typst_content, session_id=None, cancel_token=None):
+    """
+    Compiles Typst source with the configured backend. Requests from a live
+    editing session go to that session's pinned, incrementally compiling
+    Typst instance.
+
+    Args:
+        compiler: Backend from `typst_compiler.get_compiler()`
+        typst_content (str): Final Typst source
+        session_id (str): Editing session to compile in, if any
+        cancel_token (CancelToken): Kills the compile when cancelled
+
+    Returns:
+        bytes: The compiled PDF
+
+    Raises:
+        RenderError: If compilation fails or produces no PDF
+        RenderCancelled: If the render was superseded
+    """
+    try:
+        with render_metrics.stage('compile'):
+            # Sessions compile against the font bundle; sources needing other fonts skip them
+            if session_id and typst_sessions.session_pool.enabled and compiler is typst_compiler.get_compiler():
+                logger.info(f"Compiling Typst content in pinned session {session_id}...")
+                pdf_data = typst_sessions.session_pool.compile(
+                    session_id, typst_content, compiler.compile, cancel_token=cancel_token
+                )
+            else:
+                logger.info(f"Compiling Typst content with the {compiler.name} backend...")
+                pdf_data = compiler.compile(typst_content, cancel_token=cancel_token)
+    except typst_compiler.TypstCompileError as e:
+        render_metrics.typst_errors.inc(theme=render_metrics.current_theme())
+        logger.error(f"Typst compilation failed: {e.details or e.message}")
+        raise RenderError(e.message, e.details)
+
+    logger.info(f"Typst compilation successful. PDF size: {len(pdf_data)} bytes.")
+    return pdf_data
+
+class RenderResult:
+    """
+    Outcome of a successful render.
+
+    Attributes:
+        pdf_data (bytes): The compiled PDF
+        cache_hit (bool): True if the PDF came from the render cache
+        icon_warning (bool): True if no icon fonts are available
+        timings (RenderTimings): Time spent in each pipeline stage
+    """
+
+    def __init__(self, pdf_data, cache_hit, icon_warning, timings=None):
+        self.pdf_data = pdf_data
+        self.cache_hit = cache_hit
+        self.icon_warning = icon_warning
+        self.timings = timings
+
+def normalize_session_id(session_id):
+    """
+    Returns the editing session id sent by a client, or None if it is missing or
+    malformed.
+    """
+    if not isinstance(session_id, str) or not 0 < len(session_id) <= 64:
+        return None
+    return session_id
+
+def render_yaml(yaml_content, session_id=None, cancel_token=None, priority=None, client_id=''):
+    """
+    Fixes, validates and renders a CV given as YAML text, going through the
+    render caches.
+
+    Args:
+        yaml_content (str): YAML content as sent by the client
+        session_id (str): Editing session to compile in, if any
+        cancel_token (CancelToken): Abandons the render when cancelled
+        priority (str): Scheduler class to wait in on a cache miss, or None
+            if the caller already holds a render slot
+        client_id (str): Client identity for fair sharing of render slots
+
+    Returns:
+        RenderResult: The PDF and how it was produced
+
+    Raises:
+        RenderError: If the CV cannot be rendered
+        RenderCancelled: If a newer revision superseded this render
+    """
+    return _track_cv_render(prepare_yaml, yaml_content, session_id, cancel_token, priority, client_id)
+
+def render_document(document, session_id=None, cancel_token=None, priority=None, client_id=''):
+    """
+    Fixes, validates and renders a CV given as an already structured document
+    (`cv`, `design`, `locale`, `rendercv_settings`), such as a JSON request
+    body. The document goes to RenderCV without a YAML round trip and shares
+    the render cache with the equivalent YAML.
+
+    Args:
+        document (dict): The CV document; fixes are applied to it in place
+        session_id (str): Editing session to compile in, if any
+        cancel_token (CancelToken): Abandons the render when cancelled
+        priority (str): Scheduler class to wait in on a cache miss, or None
+            if the caller already holds a render slot
+        client_id (str): Client identity for fair sharing of render slots
+
+    Returns:
+        RenderResult: The PDF and how it was produced
+
+    Raises:
+        RenderError: If the CV cannot be rendered
+        RenderCancelled: If a newer revision superseded this render
+    """
+    return _track_cv_render(prepare_document, document, session_id, cancel_token, priority, client_id)
+
+def _track_cv_render(prepare, cv_input, session_id, cancel_token, priority, client_id):
+    slot = (lambda: scheduler.slot(priority, client_id, cancel_token)) if priority else None
+    with render_metrics.track() as timings:
+        try:
+            prepared = prepare(cv_input, session_id, cancel_token)
+            result = prepared.cached() or prepared.render(slot)
+        except RenderError as e:
+            record_cv_error(e)
+            raise
+    return record_cv_render(result, timings)
+
+def record_cv_error(error):
+    """Counts a CV render that failed with a RenderError."""
+    render_metrics.render_errors.inc(kind='cv', status=str(error.status_code))
+
+def record_cv_render(result, timings):
+    """
+    Attaches the timings of a finished CV render to its result and observes
+    its duration.
+
+    Returns:
+        RenderResult: `result`
+    """
+    result.timings = timings
+    render_metrics.render_seconds.observe(
+        timings.total,
+        kind='cv', theme=render_metrics.theme_label(timings.theme), cache='hit' if result.cache_hit else 'miss',
+    )
+    return result
+
+class PreparedRender:
+    """
+    A CV parsed, fixed and keyed for the render cache, not rendered yet.
+
+    `cached` only looks the PDF up, so callers can answer cache hits before
+    waiting for a render slot; `render` generates and compiles on a miss.
+    Both must run inside the render's `render_metrics.track()` block.
+    """
+
+    def __init__(self, yaml_content, document, cache_key, session_id, cancel_token):
+        self.yaml_content = yaml_content
+        self.document = document
+        self.cache_key = cache_key
+        self.session_id = session_id
+        self.cancel_token = cancel_token
+
+    def cached(self):
+        """
+        Returns:
+            RenderResult: The cached PDF, or None on a cache miss
+        """
+        pdf_data = render_cache.pdf_cache.get(self.cache_key)
+        if pdf_data is None:
+            return None
+        render_metrics.cache_requests.inc(cache='pdf', result='hit')
+        logger.info(f"PDF served from render cache (key {self.cache_key[:12]}).")
+        return RenderResult(pdf_data, True, not font_registry.get().icon_fonts)
+
+    def render(self, slot=None):
+        """
+        Renders the CV after `cached` missed. Concurrent renders of the same
+        cache key run once.
+
+        Args:
+            slot (callable): Returns a context manager holding a render slot
+                around the actual render, or None if the caller holds one
+
+        Returns:
+            RenderResult: The PDF and how it was produced
+
+        Raises:
+            RenderError: If the CV cannot be rendered
+            RenderCancelled: If a newer revision superseded this render
+        """
+        def render():
+            with ExitStack() as stack:
+                # Only the request that actually renders waits for a slot, not those coalesced onto it
+                if slot is not None:
+                    with render_metrics.stage('queue'):
+                        stack.enter_context(slot())
+                return _render_yaml_to_pdf(self.yaml_content, self.document, self.session_id, self.cancel_token)
+
+        cache_key = self.cache_key
+        try:
+            pdf_data, cache_hit = render_cache.pdf_cache.get_or_render(cache_key, render, lookup=False)
+            render_metrics.cache_requests.inc(cache='pdf', result='hit' if cache_hit else 'miss')
+            logger.info(f"PDF {'served from' if cache_hit else 'added to'} render cache (key {cache_key[:12]}).")
+        except (RenderError, RenderCancelled):
+            raise
+        except FileNotFoundError as e:
+            # Specific error if 'typst' command is not found
+            if 'typst' in str(e):
+                 logger.error(f"Typst command not found: {e}", exc_info=True)
+                 raise RenderError("Rendering failed: Typst command not found or not in PATH.")
+            else:
+                 logger.error(f"File not found error during processing: {e}", exc_info=True)
+                 raise RenderError(f"Server error: Required file not found.")
+        except ImportError:
+             # This might occur if the dynamic import fails inside the function somehow
+             logger.error("RenderCV function could not be imported.", exc_info=True)
+             raise RenderError("RenderCV API function not available.")
+        except Exception as e:
+            logger.error(f"Unexpected error during rendering: {e}", exc_info=True)
+            tb_str = traceback.format_exc()
+            logger.error(tb_str)
+            raise RenderError(f"An unexpected server error occurred: {type(e).__name__}")
+
+        return RenderResult(pdf_data, cache_hit, not font_registry.get().icon_fonts)
+
+def prepare_yaml(yaml_content, session_id=None, cancel_token=None):
+    """
+    Parses and fixes a CV given as YAML text and computes its render cache key.
+
+    Args:
+        yaml_content (str): YAML content as sent by the client
+        session_id (str): Editing session to compile in, if any
+        cancel_token (CancelToken): Abandons the render when cancelled
+
+    Returns:
+        PreparedRender: The CV, ready to look up and render
+
+    Raises:
+        RenderError: If RenderCV is not available
+    """
+    if not RENDERCV_AVAILABLE:
+        raise RenderError("RenderCV API function not available.")
+
+    # Parse once; fixes, diagnostics, the cache key and RenderCV all use this document
+    with render_metrics.stage('parse'):
+        document = load_yaml_document(yaml_content)
+
+    # Automatically fix common validation errors
+    with render_metrics.stage('fix'):
+        if document is not None:
+            document = _fix_document(document)
+        else:
+            yaml_content, fired = fix_yaml_text(yaml_content)
+            _record_fixes(fired)
+            if fired:
+                # The repair may have been all the text needed to parse
+                document = load_yaml_document(yaml_content)
+                if document is not None:
+                    document = _fix_document(document)
+
+    return _prepare_cv(yaml_content, document, session_id, cancel_token)
+
+def prepare_document(document, session_id=None, cancel_token=None):
+    """
+    Fixes a CV given as a structured document and computes its render cache
+    key, which it shares with the equivalent YAML.
+
+    Args:
+        document (dict): The CV document; fixes are applied to it in place
+        session_id (str): Editing session to compile in, if any
+        cancel_token (CancelToken): Abandons the render when cancelled
+
+    Returns:
+        PreparedRender: The CV, ready to look up and render
+
+    Raises:
+        RenderError: If RenderCV is not available or the document is not an object
+    """
+    if not RENDERCV_AVAILABLE:
+        raise RenderError("RenderCV API function not available.")
+    if not isinstance(document, dict):
+        raise RenderError("The CV document must be an object.", status_code=400)
+
+    with render_metrics.stage('fix'):
+        document = _fix_document(document)
+
+    return _prepare_cv(None, document, session_id, cancel_token)
+
+def _fix_document(document):
+    document, fired = fix_document(document)
+    _record_fixes(fired)
+    return document
+
+def _record_fixes(fired):
+    if fired:
+        logger.info(f"Applied fix rules: {', '.join(fired)}")
+        for rule_id in fired:
+            render_metrics.fix_rules_applied.inc(rule=rule_id)
+
+def _record_repairs(repairs):
+    if repairs:
+        logger.info(f"Repaired fields RenderCV rejected: {', '.join(map(repr, repairs))}")
+        for repair in repairs:
+            render_metrics.validation_repairs.inc(source=repair.source)
+
+def _prepare_cv(yaml_content, document, session_id, cancel_token):
+    # Log diagnostic information about icon configuration
+    if document is not None:
+        design = document.get('design')
+        render_metrics.current().theme = design.get('theme', 'classic') if isinstance(design, dict) else 'classic'
+        try:
+            # Log header and connection settings
+            if isinstance(design, dict) and isinstance(design.get('header'), dict):
+                header_config = design['header']
+                logger.info(f"Header configuration: use_icons_for_connections={header_config.get('use_icons_for_connections', False)}")
+
+            # Log which social networks are being used
+            cv = document.get('cv')
+            if isinstance(cv, dict) and 'social_networks' in cv:
+                networks = [item.get('network') for item in cv['social_networks']]
+                logger.info(f"Social networks that need icons: {networks}")
+        except Exception as e:
+            logger.warning(f"Could not read icon diagnostics: {e}")
+
+    # Identical documents (ignoring comments and formatting) share one cache
+    # entry, as long as the installed fonts are the same
+    if document is not None:
+        document_key = render_cache.hash_document(document)
+    else:
+        document_key = render_cache.hash_text(yaml_content)
+    cache_key = render_cache.hash_text("\0".join([document_key, font_registry.get().fingerprint]))
+
+    return PreparedRender(yaml_content, document, cache_key, session_id, cancel_token)
+
+def render_theme_preview(theme_name, sample_yaml):
+    """
+    Renders a sample CV with the given theme.
+
+    Args:
+        theme_name (str): Theme to preview
+        sample_yaml (str): YAML of the sample CV
+
+    Returns:
+        RenderResult: The PDF and the time spent on each stage
+
+    Raises:
+        RenderError: If the preview cannot be rendered
+    """
+    with render_metrics.track() as timings:
+        timings.theme = theme_name
+        try:
+            pdf_data = _render_theme_preview(theme_name, sample_yaml)
+        except RenderError as e:
+            render_metrics.render_errors.inc(kind='theme_preview', status=str(e.status_code))
+            raise
+    render_metrics.render_seconds.observe(
+        timings.total, kind='theme_preview', theme=render_metrics.theme_label(theme_name), cache='miss'
+    )
+    return RenderResult(pdf_data, False, not font_registry.get().icon_fonts, timings)
+
+def _render_theme_preview(theme_name, sample_yaml):
+    try:
+        # Use a sample resume content but with the requested theme
+        sample_cv = yaml_codec.load(sample_yaml)
+        
+        # Set the theme
+        if 'design' not in sample_cv:
+            sample_cv['design'] = {}
+        sample_cv['design']['theme'] = theme_name
+        
+        # Generate Typst content from the document directly
+        with render_metrics.stage('generate'):
+            typst_content = generation_pool.generate_typst(sample_cv)
+        
+        # Check for validation errors
+        if isinstance(typst_content, list):
+            render_metrics.validation_failures.inc(theme=render_metrics.current_theme())
+            raise RenderError(
+                "YAML validation failed for preview.",
+                [str(err) for err in typst_content],
+                400
+            )
+        
+        # Compile with the configured Typst backend
+        with render_metrics.stage('compile'):
+            return typst_compiler.get_compiler(typst_content).compile(typst_content)
+    
+    except RenderError:
+        raise
+    except typst_compiler.TypstCompileError as e:
+        render_metrics.typst_errors.inc(theme=render_metrics.current_theme())
+        print(f"Error generating preview for theme {theme_name}: {e.details or e.message}")
+        raise RenderError(f"Failed to generate preview: {e.message}", e.details)
+    except Exception as e:
+        print(f"Error generating preview for theme {theme_name}: {e}")
+        raise RenderError(f"Failed to generate preview: {str(e)}")
+
+# Gauges read from the scheduler and session pool at scrape time
+render_metrics.registry.register(render_metrics.Gauge(
+    'render_queue_depth', 'Renders waiting for a slot, by priority class.', ('priority',),
+    lambda: {(name,): c['queued'] for name, c in scheduler.stats()['classes'].items()},
+))
+render_metrics.registry.register(render_metrics.Gauge(
+    'render_running', 'Renders holding a slot, by priority class.', ('priority',),
+    lambda: {(name,): c['running'] for name, c in scheduler.stats()['classes'].items()},
+))
+render_metrics.registry.register(render_metrics.Gauge(
+    'render_typst_sessions', 'Pinned Typst sessions alive.', (),
+    lambda: {(): typst_sessions.session_pool.stats()['sessions']},
+))
+
+def cache_stats():
+    """
+    Returns statistics of the render and validation caches, pinned Typst
+    sessions and the render scheduler.
+    """
+    return {
+        "pdf_cache": render_cache.pdf_cache.stats(),
+        "typst_pdf_cache": render_cache.typst_pdf_cache.stats(),
+        "typst_sessions": typst_sessions.session_pool.stats(),
+        "generation_workers": generation_pool.workers,
+        "scheduler": scheduler.stats(),
+        "validation_cache": cv_validation.validator.stats(),
+        # Designs validated in this process (for /validate); workers keep their own
+        "design_cache": rendercv_models.design_cache.stats(),
+        "fonts": font_registry.stats(),
+        "font_bundle": font_bundle.stats(font_registry.get()),
+    }
@@ -0,0 +1,210 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, Optional
+
+from render_cancellation import CancelToken, RenderCancelled, check
+
+# Priority classes, most urgent first
+INTERACTIVE = 'interactive'
+EXPORT = 'export'
+PRIORITIES = (INTERACTIVE, EXPORT)
+
+# Number of renders allowed to run at the same time
+RENDER_CONCURRENCY = int(os.environ.get('RENDER_CONCURRENCY', str(os.cpu_count() or 1)))
+# How many of those slots export renders may fill; the rest stay free for previews
+RENDER_EXPORT_SLOTS = int(os.environ.get('RENDER_EXPORT_SLOTS', str(max(1, RENDER_CONCURRENCY - 1))))
+
+
+def normalize_priority(priority, default=INTERACTIVE):
+    """
+    Returns the priority class requested by a client, or `default` if it is
+    missing or unknown.
+    """
+    return priority if priority in PRIORITIES else default
+
+
+class _Ticket:
+    def __init__(self, priority: str, client_id: str):
+        self.priority = priority
+        self.client_id = client_id
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.event = threading.Event()
+        self.on_grant: Optional[Callable[[], None]] = None
+
+
+class _ClassStats:
+    def __init__(self):
+        self.running = 0
+        self.granted = 0
+        self.cancelled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class RenderScheduler:
+    """
+    Hands out render slots by priority class, then fairly between clients.
+
+    A freed slot always goes to a waiting interactive preview before any
+    export. Export renders may only fill `export_slots` of the slots, so a
+    preview never waits behind a full batch of downloads, while exports still
+    use whatever capacity previews leave idle. Within a class, clients take
+    turns: each waiting client gets one slot before any client gets a second.
+    """
+
+    def __init__(self, slots: int = RENDER_CONCURRENCY, export_slots: int = RENDER_EXPORT_SLOTS):
+        self.slots = max(1, slots)
+        self.export_slots = max(1, min(export_slots, self.slots))
+        self._lock = threading.Lock()
+        # priority -> client id -> waiting tickets, clients in turn order
+        self._queues: Dict[str, 'OrderedDict[str, deque]'] = {p: OrderedDict() for p in PRIORITIES}
+        self._stats = {p: _ClassStats() for p in PRIORITIES}
+
+    def _running(self) -> int:
+        return sum(s.running for s in self._stats.values())
+
+    def _enqueue(self, priority: str, client_id: str,
+                 on_grant: Optional[Callable[[], None]] = None) -> _Ticket:
+        ticket = _Ticket(priority, client_id)
+        ticket.on_grant = on_grant
+        with self._lock:
+            self._queues[priority].setdefault(client_id, deque()).append(ticket)
+            granted = self._dispatch()
+        self._notify(granted)
+        return ticket
+
+    def _dispatch(self):
+        # Called with the lock held; returns the tickets granted a slot
+        granted = []
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue and self._running() < self.slots:
+                if priority == EXPORT and self._stats[EXPORT].running >= self.export_slots:
+                    break
+                client_id, tickets = next(iter(queue.items()))
+                ticket = tickets.popleft()
+                if tickets:
+                    queue.move_to_end(client_id)  # next turn goes to another client
+                else:
+                    del queue[client_id]
+
+                stats = self._stats[priority]
+                wait = time.monotonic() - ticket.enqueued
+                stats.running += 1
+                stats.granted += 1
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+                ticket.granted = True
+                granted.append(ticket)
+        return granted
+
+    @staticmethod
+    def _notify(tickets):
+        for ticket in tickets:
+            ticket.event.set()
+            if ticket.on_grant is not None:
+                ticket.on_grant()
+
+    def _release(self, ticket: _Ticket) -> None:
+        with self._lock:
+            self._stats[ticket.priority].running -= 1
+            granted = self._dispatch()
+        self._notify(granted)
+
+    def _withdraw(self, ticket: _Ticket) -> None:
+        """Takes a waiting ticket out of the queue, or gives its slot back."""
+        with self._lock:
+            if not ticket.granted:
+                tickets = self._queues[ticket.priority].get(ticket.client_id)
+                if tickets is not None and ticket in tickets:
+                    tickets.remove(ticket)
+                    if not tickets:
+                        del self._queues[ticket.priority][ticket.client_id]
+                self._stats[ticket.priority].cancelled += 1
+                return
+        self._release(ticket)
+
+    @contextmanager
+    def slot(self, priority: str = INTERACTIVE, client_id: str = '',
+             cancel_token: Optional[CancelToken] = None):
+        """
+        Blocks until a render slot is granted and holds it for the block.
+
+        Args:
+            priority: INTERACTIVE or EXPORT
+            client_id: Identity used to share slots fairly between clients
+            cancel_token: Gives up the place in the queue when cancelled
+
+        Raises:
+            RenderCancelled: If the token was cancelled while waiting
+        """
+        check(cancel_token)
+        ticket = self._enqueue(priority, client_id)
+        unregister = cancel_token.on_cancel(ticket.event.set) if cancel_token is not None else None
+        try:
+            ticket.event.wait()
+        finally:
+            if unregister is not None:
+                unregister()
+        if cancel_token is not None and cancel_token.cancelled:
+            self._withdraw(ticket)
+            raise RenderCancelled()
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    @asynccontextmanager
+    async def async_slot(self, priority: str = INTERACTIVE, client_id: str = '',
+                         cancel_token: Optional[CancelToken] = None):
+        """
+        asyncio counterpart of `slot`; waiting requests do not hold a thread.
+        """
+        check(cancel_token)
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        ticket = self._enqueue(priority, client_id, on_grant=wake)
+        unregister = cancel_token.on_cancel(wake) if cancel_token is not None else None
+        try:
+            await granted
+        except BaseException:
+            self._withdraw(ticket)
+            raise
+        finally:
+            if unregister is not None:
+                unregister()
+        if cancel_token is not None and cancel_token.cancelled:
+            self._withdraw(ticket)
+            raise RenderCancelled()
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def stats(self) -> dict:
+        with self._lock:
+            classes = {}
+            for priority in PRIORITIES:
+                stats = self._stats[priority]
+                classes[priority] = {
+                    "queued": sum(len(t) for t in self._queues[priority].values()),
+                    "waiting_clients": len(self._queues[priority]),
+                    "running": stats.running,
+                    "granted": stats.granted,
+                    "cancelled": stats.cancelled,
+                    "mean_wait_ms": round(1000 * stats.total_wait / stats.granted, 2) if stats.granted else 0.0,
+                    "max_wait_ms": round(1000 * stats.max_wait, 2),
+                }
+            return {"slots": self.slots, "export_slots": self.export_slots, "classes": classes}
+
+
+scheduler = RenderScheduler()
@@ -0,0 +1,81 @@
+"""
+Stand-ins for RenderCV and Typst shared by the render tests, so the pipeline
+and the routes can run without either installed.
+"""
+
+import copy
+
+import render_cache
+import render_pipeline
+import typst_compiler
+import validation_repair
+
+CV_YAML = """
+cv:
+  name: John Doe  # comments do not change the cache key
+  sections:
+    summary:
+      - Engineer.
+design:
+  theme: classic
+  header:
+    small_caps_for_name: true
+  section_titles:
+    type: wavy
+"""
+
+CV_DOCUMENT = {
+    'design': {'section_titles': {'type': 'wavy'}, 'header': {'small_caps_for_name': True}, 'theme': 'classic'},
+    'cv': {'sections': {'summary': ['Engineer.']}, 'name': 'John Doe'},
+}
+
+
+class FakeGenerator:
+    """Stands in for the RenderCV worker pool; records the documents it is given."""
+
+    def __init__(self):
+        self.documents = []
+
+    def generate_typst(self, cv, cancel_token=None):
+        self.documents.append(copy.deepcopy(cv))
+        return f'#text[{cv["cv"]["name"]}]'
+
+
+class FakeCompiler:
+    name = 'fake'
+
+    def __init__(self):
+        self.sources = []
+
+    def compile(self, typst_content, cancel_token=None):
+        self.sources.append(typst_content)
+        return b'%PDF-' + typst_content.encode('utf-8')
+
+
+class StubbedRenderMixin:
+    """
+    unittest.TestCase mixin that swaps RenderCV and Typst for FakeGenerator and
+    FakeCompiler and empties the render caches around each test.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.generator = FakeGenerator()
+        self.compiler = FakeCompiler()
+        self.patch(render_pipeline, 'RENDERCV_AVAILABLE', True)
+        self.patch(render_pipeline, 'generation_pool', self.generator)
+        self.patch(typst_compiler, 'get_compiler', lambda typst_content=None: self.compiler)
+        for cache in (render_cache.pdf_cache, render_cache.typst_pdf_cache):
+            cache.clear()
+            self.addCleanup(cache.clear)
+        validation_repair.memo.clear()
+
+    def patch(self, target, name, value):
+        """Sets `target.name` to `value` for the duration of the test."""
+        missing = object()
+        original = getattr(target, name, missing)
+        if original is missing:
+            self.addCleanup(delattr, target, name)
+        else:
+            self.addCleanup(setattr, target, name, original)
+        setattr(target, name, value)
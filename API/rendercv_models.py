@@ -0,0 +1,167 @@
+"""
+RenderCV validation with the design section validated once per distinct design.
+
+In a live editing session only the `cv` section changes between keystrokes,
+while `design` is the largest block RenderCV validates (every entry type's
+templates and options). `validate` keeps validated designs in an LRU keyed
+by the hash of their sub-document and hands RenderCV the cached model in
+place of the mapping, which RenderCV accepts as is for built-in themes.
+
+`locale` and `rendercv_settings` are validated every time. They are small,
+and their validators update RenderCV's module-level locale and date, which
+another document in the same process may have changed since.
+
+Each generation worker keeps its own cache, serving both renders and
+/validate; the request process only uses its own when the pool is disabled.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+import render_cache
+
+logger = logging.getLogger(__name__)
+
+# Validated designs kept per process
+DESIGN_CACHE_MAX_ENTRIES = int(os.environ.get('RENDERCV_DESIGN_CACHE_MAX_ENTRIES', '32'))
+
+try:
+    import pydantic
+    from rendercv import data as rendercv_data
+    from rendercv import renderer as rendercv_renderer
+    from rendercv.api.functions import read_a_python_dictionary_and_return_a_data_model
+except ImportError:
+    pass
+
+try:
+    # Models RenderCV accepts back without validating them again; custom
+    # themes are validated from their mapping every time
+    from rendercv.data.models.design import available_theme_options
+    BUILTIN_DESIGNS = tuple(available_theme_options.values())
+except ImportError:
+    BUILTIN_DESIGNS = ()
+
+
+def design_key(design: Any) -> Optional[str]:
+    """Returns the hash identifying a design sub-document, or None if it is not a mapping."""
+    if not isinstance(design, dict):
+        return None
+    canonical = json.dumps(design, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return render_cache.hash_text(canonical)
+
+
+class DesignCache:
+    """
+    Thread-safe LRU of validated design models keyed by `design_key`.
+
+    Args:
+        max_entries: Number of designs kept
+    """
+
+    def __init__(self, max_entries: int = DESIGN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Optional[str]) -> Any:
+        if key is None:
+            return None
+        with self._lock:
+            design = self._entries.get(key)
+            if design is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return design
+
+    def put(self, key: Optional[str], design: Any) -> None:
+        if key is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = design
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def disable(self) -> None:
+        with self._lock:
+            self.max_entries = 0
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+design_cache = DesignCache()
+
+
+def validate(document: Dict[str, Any]):
+    """
+    Validates a parsed CV, reusing the validated design of an earlier
+    document with the same design section.
+
+    Args:
+        document: The parsed CV; it is not modified
+
+    Returns:
+        The RenderCV data model
+
+    Raises:
+        pydantic.ValidationError: If the document is invalid
+    """
+    key = design_key(document.get('design')) if BUILTIN_DESIGNS else None
+    design = design_cache.get(key)
+    if design is not None:
+        try:
+            return read_a_python_dictionary_and_return_a_data_model(dict(document, design=design))
+        except Exception as e:
+            # The cached design is valid, so an error in it means this RenderCV
+            # version does not take validated designs back
+            if isinstance(e, pydantic.ValidationError) and \
+                    not any(error['loc'][:1] == ('design',) for error in e.errors()):
+                raise
+            logger.warning(f"RenderCV rejected a validated design ({type(e).__name__}); disabling design reuse.")
+            design_cache.disable()
+    data_model = read_a_python_dictionary_and_return_a_data_model(document)
+    if design is None and isinstance(data_model.design, BUILTIN_DESIGNS):
+        design_cache.put(key, data_model.design)
+    return data_model
+
+
+def validation_errors(document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Returns RenderCV's errors (`loc`, `msg`, `input`) for a parsed CV; empty if
+    it is valid.
+    """
+    try:
+        validate(document)
+    except pydantic.ValidationError as e:
+        return rendercv_data.parse_validation_errors(e)
+    return []
+
+
+def generate_typst(document: Dict[str, Any]) -> Union[str, List[Dict[str, Any]]]:
+    """
+    Validates a parsed CV and generates its Typst source, like RenderCV's
+    `create_contents_of_a_typst_file_from_a_python_dictionary`.
+
+    Returns:
+        str or list: The Typst source, or RenderCV's list of validation errors
+    """
+    try:
+        data_model = validate(document)
+    except pydantic.ValidationError as e:
+        return rendercv_data.parse_validation_errors(e)
+    return rendercv_renderer.create_contents_of_a_typst_file(data_model)
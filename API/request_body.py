@@ -0,0 +1,114 @@
+"""
+Decoding of render request bodies, shared by the Flask and the ASGI app.
+
+`/render_live` accepts either the JSON envelope `{"yaml_content": ...,
+"session_id": ..., "revision": ..., "priority": ...}` or the YAML itself as an
+`application/yaml` (or `text/yaml`) body, with the other fields in the query
+string. Either form may be sent with `Content-Encoding: gzip`.
+"""
+
+import json
+import os
+import zlib
+from typing import Any, Dict, Mapping
+
+# Largest accepted body after decompression, to bound memory use and gzip bombs
+MAX_REQUEST_BODY_BYTES = int(float(os.environ.get('MAX_REQUEST_BODY_MB', '8')) * 1024 * 1024)
+
+JSON_CONTENT_TYPES = ('application/json',)
+YAML_CONTENT_TYPES = ('application/yaml', 'application/x-yaml', 'text/yaml', 'text/x-yaml')
+
+# Render options a raw YAML request passes in the query string
+QUERY_FIELDS = ('session_id', 'revision', 'priority')
+
+
+class RequestBodyError(Exception):
+    """
+    Raised when a request body cannot be decoded. Carries the HTTP status code
+    to return.
+    """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def decode_content(raw: bytes, content_encoding: str = '', max_bytes: int = MAX_REQUEST_BODY_BYTES) -> bytes:
+    """
+    Removes the request's content encoding.
+
+    Args:
+        raw: Body as received
+        content_encoding: Value of the Content-Encoding header
+        max_bytes: Largest body accepted after decoding
+
+    Returns:
+        bytes: The decoded body
+
+    Raises:
+        RequestBodyError: If the encoding is unsupported, the data is corrupt
+            or the decoded body is too large
+    """
+    encoding = (content_encoding or '').strip().lower()
+    if encoding in ('', 'identity'):
+        body = raw
+    elif encoding in ('gzip', 'x-gzip'):
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(raw, max_bytes + 1)
+        except zlib.error as e:
+            raise RequestBodyError(f"Invalid gzip request body: {e}")
+        if not decompressor.eof and len(body) <= max_bytes:
+            raise RequestBodyError("Invalid gzip request body: data is truncated.")
+    else:
+        raise RequestBodyError(f"Unsupported Content-Encoding '{content_encoding}'.", 415)
+
+    if len(body) > max_bytes:
+        raise RequestBodyError(f"Request body exceeds {max_bytes} bytes.", 413)
+    return body
+
+
+def parse_render_request(raw: bytes, mimetype: str, content_encoding: str = '',
+                         args: Mapping[str, str] = None, allow_yaml: bool = True) -> Dict[str, Any]:
+    """
+    Decodes a render request into the fields of the JSON envelope.
+
+    Args:
+        raw: Body as received
+        mimetype: Content type without parameters
+        content_encoding: Value of the Content-Encoding header
+        args: Query string arguments, read for raw YAML bodies
+        allow_yaml: Whether a raw YAML body is accepted
+
+    Returns:
+        dict: The request fields; a raw YAML body is returned as `yaml_content`
+
+    Raises:
+        RequestBodyError: If the body cannot be decoded
+    """
+    mimetype = (mimetype or '').lower()
+    if mimetype in JSON_CONTENT_TYPES or mimetype.endswith('+json'):
+        body = decode_content(raw, content_encoding)
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise RequestBodyError(f"Invalid JSON request body: {e}")
+        if not isinstance(data, dict):
+            raise RequestBodyError("Request body must be a JSON object.")
+        return data
+
+    if allow_yaml and mimetype in YAML_CONTENT_TYPES:
+        body = decode_content(raw, content_encoding)
+        try:
+            yaml_content = body.decode('utf-8')
+        except UnicodeDecodeError:
+            raise RequestBodyError("YAML request body must be UTF-8.")
+        data = {field: args[field] for field in QUERY_FIELDS if args and field in args}
+        if data.get('revision', '').isdigit():
+            data['revision'] = int(data['revision'])
+        data['yaml_content'] = yaml_content
+        return data
+
+    accepted = JSON_CONTENT_TYPES + (YAML_CONTENT_TYPES if allow_yaml else ())
+    raise RequestBodyError(f"Request must be one of: {', '.join(accepted)}.", 415)
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight block until it finishes and receive the same value, or the same
+    exception. Nothing is remembered once the call completes.
+
+    Exceptions listed in `retry_on` are specific to the caller that ran the
+    function (such as its render being cancelled); waiters that see one run
+    the work again themselves instead of failing with it.
+    """
+
+    def __init__(self, retry_on: Tuple[type, ...] = ()):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.retry_on = retry_on
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Runs `fn` unless a call for `key` is already in flight.
+
+        Args:
+            key: Identity of the work
+            fn: Callable doing the work
+
+        Returns:
+            tuple: (value, True if the value came from another caller's run)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                if isinstance(call.error, self.retry_on):
+                    return self.do(key, fn)
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+            return call.value, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class _AsyncFlight:
+    def __init__(self, task: asyncio.Task, abandon: Optional[Callable[[], None]]):
+        self.task = task
+        self.abandon = abandon
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of `SingleFlight`.
+
+    The work runs as its own task, so a caller going away (for example a client
+    disconnect cancelling its handler) does not cancel it for the others. Only
+    when the last caller waiting on a flight goes away is the flight's
+    `abandon` callback run, to stop work nobody will receive.
+    """
+
+    def __init__(self, retry_on: Tuple[type, ...] = ()):
+        self._flights: Dict[str, _AsyncFlight] = {}
+        self.retry_on = retry_on
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]],
+                 abandon: Optional[Callable[[], None]] = None) -> Tuple[Any, bool]:
+        """
+        Awaits `fn` unless a call for `key` is already in flight.
+
+        Args:
+            key: Identity of the work
+            fn: Coroutine function doing the work
+            abandon: Stops the work; run if this caller starts the flight and
+                every caller waiting on it is cancelled
+
+        Returns:
+            tuple: (value, True if the value came from another caller's run)
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            flight = _AsyncFlight(asyncio.ensure_future(fn()), abandon)
+            self._flights[key] = flight
+
+            def forget(done_task, key=key):
+                current = self._flights.get(key)
+                if current is not None and current.task is done_task:
+                    del self._flights[key]
+
+            flight.task.add_done_callback(forget)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done() and flight.abandon is not None:
+                flight.abandon()
+            raise
+        except self.retry_on:
+            if not shared:
+                raise
+            return await self.do(key, fn, abandon)
+        finally:
+            flight.waiters -= 1
+
+    def in_flight(self) -> int:
+        return len(self._flights)
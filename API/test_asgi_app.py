@@ -0,0 +1,78 @@
+import asyncio
+import importlib.util
+import json
+import unittest
+import cv_validation
+from cv_validation import CvValidator
+from render_test_fixtures import CV_YAML, StubbedRenderMixin
+
+QUART_AVAILABLE = importlib.util.find_spec('quart') is not None
+
+@unittest.skipUnless(QUART_AVAILABLE, "quart is not installed")
+class TestAsgiRoutes(StubbedRenderMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        from asgi_app import app
+        self.app = app
+
+    def post(self, path, **kwargs):
+        async def post():
+            response = await self.app.test_client().post(path, **kwargs)
+            return response, await response.get_data()
+
+        return asyncio.run(post())
+
+    def test_render_live(self):
+        response, data = self.post('/render_live', json={'yaml_content': CV_YAML})
+        self.assertEqual((response.status_code, response.mimetype), (200, 'application/pdf'))
+        self.assertEqual(data, b'%PDF-#text[John Doe]')
+        self.assertEqual(response.headers['X-Render-Cache'], 'miss')
+
+        response, _ = self.post('/render_live', json={'yaml_content': CV_YAML})
+        self.assertEqual(response.headers['X-Render-Cache'], 'hit')
+        self.assertEqual(len(self.generator.documents), 1)
+
+    def test_render_live_requires_yaml(self):
+        response, data = self.post('/render_live', json={})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('yaml_content', json.loads(data)['error'])
+
+    def test_older_revision_of_a_session_is_refused(self):
+        body = {'yaml_content': CV_YAML, 'session_id': 'asgi-test', 'revision': 2}
+        response, _ = self.post('/render_live', json=body)
+        self.assertEqual(response.status_code, 200)
+
+        response, data = self.post('/render_live', json=dict(body, revision=1))
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('superseded', json.loads(data)['error'])
+        # Another session sending the same content is served from the cache
+        response, _ = self.post('/render_live', json=dict(body, session_id='other', revision=1))
+        self.assertEqual(response.headers['X-Render-Cache'], 'hit')
+        self.assertEqual(len(self.generator.documents), 1)
+
+    def test_validate(self):
+        self.patch(cv_validation, 'VALIDATION_AVAILABLE', True)
+        self.patch(cv_validation, 'validator', CvValidator(validate=lambda document: []))
+
+        response, data = self.post('/validate', json={'yaml_content': CV_YAML})
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(data)
+        self.assertEqual((payload['valid'], payload['errors'], payload['cached']), (True, [], False))
+        self.assertTrue(response.headers['Server-Timing'].startswith('validate;desc="miss";dur='))
+
+        response, data = self.post('/validate', json={'yaml_content': CV_YAML})
+        self.assertTrue(json.loads(data)['cached'])
+        self.assertTrue(response.headers['Server-Timing'].startswith('validate;desc="hit";dur='))
+
+    def test_oversized_body_is_rejected_with_json(self):
+        limit = self.app.config['MAX_CONTENT_LENGTH']
+        self.addCleanup(self.app.config.__setitem__, 'MAX_CONTENT_LENGTH', limit)
+        self.app.config['MAX_CONTENT_LENGTH'] = 64
+
+        response, data = self.post('/render_live', json={'yaml_content': CV_YAML})
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('error', json.loads(data))
+        self.assertEqual(self.generator.documents, [])
+
+if __name__ == '__main__':
+    unittest.main()
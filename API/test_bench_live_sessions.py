@@ -0,0 +1,34 @@
+import random
+import unittest
+import yaml
+from bench_live_sessions import Recorder, edit_yaml
+from theme_manager import get_theme_content
+
+class TestBenchLiveSessions(unittest.TestCase):
+    def test_edits_keep_the_document_valid(self):
+        rng = random.Random(7)
+        original = get_theme_content('classic')
+        content = original
+        for _ in range(200):
+            content = edit_yaml(content, rng)
+            document = yaml.safe_load(content)
+        self.assertNotEqual(content, original)
+        original_document = yaml.safe_load(original)
+        self.assertEqual(document['design'], original_document['design'])
+        self.assertEqual(document['cv']['email'], original_document['cv']['email'])
+        self.assertEqual(document['cv']['sections']['education'][0]['start_date'],
+                         original_document['cv']['sections']['education'][0]['start_date'])
+
+    def test_superseded_renders_are_not_errors(self):
+        recorder = Recorder()
+        recorder.record('render_live', '200', 0.1, 'miss')
+        recorder.record('render_live', '409', 0.2)
+        recorder.record('render_live', '500', 0.3)
+        recorder.record('render_live', 'exception', 0.4)
+        summary = recorder.report(elapsed=2.0)['render_live']
+        self.assertEqual((summary['requests'], summary['errors'], summary['superseded']), (4, 2, 1))
+        self.assertEqual(summary['throughput_rps'], 2.0)
+        self.assertEqual(summary['cache'], {'miss': 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import yaml
+from bench_render_pipeline import CORPUS_SIZES, build_corpus, compare_reports, load_theme_templates
+
+def report(total_p50, compile_p50):
+    return {"cases": [{
+        "case": "classic/small",
+        "total": {"p50_ms": total_p50, "p95_ms": total_p50},
+        "stages": {"compile": {"p50_ms": compile_p50}},
+    }]}
+
+class TestBenchRenderPipeline(unittest.TestCase):
+    def test_corpus_covers_every_theme_and_size(self):
+        corpus = build_corpus(list(CORPUS_SIZES))
+        themes = load_theme_templates()
+        self.assertEqual(len(corpus), len(themes) * len(CORPUS_SIZES))
+        for case in corpus:
+            document = yaml.safe_load(case["yaml"])
+            entries = sum(len(items) for items in document["cv"]["sections"].values())
+            self.assertEqual(entries, case["entries"])
+            self.assertEqual(document["design"], themes[case["theme"]]["design"])
+
+    def test_large_corpus_entries_are_distinct(self):
+        case = build_corpus(["huge"], ["classic"])[0]
+        experience = yaml.safe_load(case["yaml"])["cv"]["sections"]["experience"]
+        self.assertGreater(len(experience), 50)
+        self.assertEqual(len({entry["company"] for entry in experience}), len(experience))
+
+    def test_compare_flags_only_real_slowdowns(self):
+        baseline = report(100.0, 40.0)
+        self.assertEqual(compare_reports(report(110.0, 43.0), baseline), [])
+        regressions = compare_reports(report(150.0, 44.0), baseline)
+        self.assertEqual({r["metric"] for r in regressions}, {"total.p50_ms", "total.p95_ms"})
+        # 50% slower but under the absolute floor
+        self.assertEqual(compare_reports(report(100.0, 60.0), report(100.0, 40.0), min_delta_ms=25), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import yaml
+from bench_yaml_text_repair import INPUTS, check_linear, legacy_fix
+from yaml_validator_fixer import fix_yaml_text
+
+class TestBenchYamlTextRepair(unittest.TestCase):
+    def test_broken_cv_is_fixed(self):
+        text = INPUTS['broken_cv'](64 * 1024)
+        with self.assertRaises(yaml.YAMLError):
+            yaml.safe_load(text)
+        fixed, fired = fix_yaml_text(text)
+        self.assertEqual(len(fired), 5)
+        design = yaml.safe_load(fixed.replace("  locale: 'unclosed\n", ''))['design']
+        self.assertEqual(design, {'theme': 'classic', 'header': None,
+                                  'section_titles': {'type': 'with-partial-line'}, 'highlights': None})
+        # The regex chain shifts the line after adjacent removed fields
+        self.assertNotIn('\n  section_titles:', legacy_fix(text))
+
+    def test_inputs_reach_the_requested_size(self):
+        for name, make in INPUTS.items():
+            if name != 'broken_cv':
+                self.assertGreater(len(make(256 * 1024)), 200 * 1024, name)
+
+    def test_check_linear_flags_growing_cost_per_byte(self):
+        rows = [
+            {'input': 'flat', 'bytes': 1000, 'ns_per_byte': 20.0},
+            {'input': 'flat', 'bytes': 4000, 'ns_per_byte': 25.0},
+            {'input': 'quadratic', 'bytes': 1000, 'ns_per_byte': 20.0},
+            {'input': 'quadratic', 'bytes': 4000, 'ns_per_byte': 80.0},
+        ]
+        self.assertEqual(check_linear(rows, 3.0), [{'input': 'quadratic', 'growth': 4.0}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import validation_repair
+from cv_validation import CvValidator, locate
+import yaml_codec
+
+YAML = """cv:
+  name: John Doe
+  email: not-an-email
+  sections:
+    experience:
+      - company: ACME
+        start_date: 2020-13
+design:
+  theme: classic
+  header:
+    small_caps_for_name: true
+  page:
+    size: a99
+"""
+
+def fake_rendercv(document):
+    errors = []
+    if document['cv'].get('email') == 'not-an-email':
+        errors.append({'loc': ('cv', 'email'), 'msg': 'Invalid email', 'input': 'not-an-email'})
+    entry = document['cv']['sections']['experience'][0]
+    if entry.get('start_date') == '2020-13':
+        errors.append({'loc': ('cv', 'sections', 'experience', '0', 'ExperienceEntry', 'start_date'),
+                       'msg': 'Invalid date', 'input': '2020-13'})
+    if document['design'].get('page', {}).get('size') == 'a99':
+        errors.append({'loc': ('design', 'page', 'size'), 'msg': 'Unknown page size', 'input': 'a99'})
+    return errors
+
+class TestCvValidation(unittest.TestCase):
+    def setUp(self):
+        validation_repair.memo.clear()
+        self.calls = []
+
+        def validate(document):
+            self.calls.append(document)
+            return fake_rendercv(document)
+        self.validator = CvValidator(validate=validate)
+
+    def test_errors_have_positions_and_fixes_are_reported(self):
+        result = self.validator.validate_yaml(YAML)
+        self.assertFalse(result.valid)
+        self.assertEqual([(e['path'], e['line'], e['column']) for e in result.errors], [
+            ('cv.email', 3, 3),
+            ('cv.sections.experience.0.ExperienceEntry.start_date', 7, 9),
+        ])
+        self.assertEqual(result.fixes, [
+            {'rule': 'header-small-caps-for-name'},
+            {'path': 'design.page.size', 'action': 'remove', 'line': 13, 'column': 5},
+        ])
+        # The unrepairable CV errors stop the loop after one validation
+        self.assertEqual(len(self.calls), 1)
+
+    def test_results_are_cached_by_document(self):
+        valid = YAML.replace('not-an-email', 'john@example.com').replace('2020-13', '2020-01')
+        first = self.validator.validate_yaml(valid)
+        self.assertTrue(first.valid)
+        self.assertFalse(first.cached)
+        self.assertEqual(len(self.calls), 2)  # validated, repaired, validated again
+
+        # Reformatted, the same document is not validated again; positions follow the text
+        reformatted = '# edited\n' + valid.replace('  name: John Doe\n', '  name: "John Doe"\n')
+        second = self.validator.validate_yaml(reformatted)
+        third = self.validator.validate_yaml(reformatted)
+        self.assertTrue(second.cached)
+        self.assertTrue(third.cached)
+        self.assertEqual(len(self.calls), 2)  # the remembered repair leads to the repaired entry
+        self.assertEqual([fix.get('path') for fix in first.fixes], [fix.get('path') for fix in second.fixes])
+        self.assertEqual(second.fixes, third.fixes)
+        self.assertEqual(third.fixes[-1]['line'], 14)
+        self.assertEqual(self.validator.stats(), {'entries': 2, 'hits': 2, 'misses': 1})
+
+    def test_syntax_errors_are_located(self):
+        result = self.validator.validate_yaml('cv:\n  name: [unclosed\n')
+        self.assertEqual(len(result.errors), 1)
+        self.assertTrue(result.errors[0]['message'].startswith('YAML syntax error'))
+        self.assertEqual(result.errors[0]['line'], 3)
+        self.assertFalse(result.errors[0]['repairable'])
+        self.assertEqual(self.validator.validate_yaml('- a list').errors[0]['line'], 1)
+        self.assertEqual(self.calls, [])
+
+    def test_syntax_errors_the_text_repair_fixes_are_repairable(self):
+        # The broken value belongs to a field the fix rules remove
+        broken = 'cv:\n  name: John Doe\ndesign:\n  header:\n    small_caps_for_name: [true\n  theme: classic\n'
+        result = self.validator.validate_yaml(broken)
+        self.assertTrue(result.errors[0]['message'].startswith('YAML syntax error'))
+        self.assertTrue(result.errors[0]['repairable'])
+        self.assertEqual(self.calls, [])
+
+    def test_missing_fields_point_at_their_parent(self):
+        root, _ = yaml_codec.compose_and_load(YAML)
+        self.assertEqual(locate(root, ('cv', 'sections', 'experience', '0', 'position')), (6, 9))
+        self.assertEqual(locate(root, ('cv', 'phone')), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
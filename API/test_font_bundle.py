@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from font_bundle import FontBundleManager, build_font_bundle, theme_font_families
+from font_registry import FontFile, FontSnapshot
+
+def write_font(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+class TestFontBundle(unittest.TestCase):
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.parent = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.source, 'custom'))
+        fonts = [
+            FontFile(write_font(self.source, 'SourceSans3-Regular.ttf', b'sans'), ['Source Sans 3'], 4),
+            FontFile(write_font(self.source, 'Lato-Regular.ttf', b'lato'), ['Lato'], 4),
+            FontFile(write_font(self.source, 'fa-brands-400.ttf', b'brands'), ['Font Awesome 6 Brands'], 6),
+            # The same icon font shipped again in RENDERCV_FONT_PATH
+            FontFile(write_font(os.path.join(self.source, 'custom'), 'fa-brands-400.ttf', b'brands'),
+                     ['Font Awesome 6 Brands'], 6),
+        ]
+        self.fonts = FontSnapshot(1, [self.source], fonts)
+
+    def tearDown(self):
+        shutil.rmtree(self.source)
+        shutil.rmtree(self.parent)
+
+    def test_theme_fonts_are_collected(self):
+        families = theme_font_families()
+        self.assertIn('Source Sans 3', families)
+        self.assertIn('Montserrat', families)
+
+    def test_bundle_keeps_referenced_and_icon_fonts_once(self):
+        bundle = build_font_bundle(self.fonts, ['Source Sans 3'], self.parent)
+        self.assertEqual(sorted(f for f in os.listdir(bundle.path) if not f.startswith('.')),
+                         ['SourceSans3-Regular.ttf', 'fa-brands-400.ttf'])
+        self.assertEqual(bundle.families, {'Source Sans 3', 'Font Awesome 6 Brands'})
+        self.assertEqual((bundle.files, bundle.source_files), (2, 4))
+
+    def test_bundle_is_reused(self):
+        first = build_font_bundle(self.fonts, ['Source Sans 3'], self.parent)
+        second = build_font_bundle(self.fonts, ['Source Sans 3'], self.parent)
+        self.assertEqual(first.path, second.path)
+        self.assertEqual(len(os.listdir(self.parent)), 1)
+
+    def test_covers_only_bundled_families(self):
+        bundle = build_font_bundle(self.fonts, ['Source Sans 3'], self.parent)
+        source = '#let design-text-font-family = "Source Sans 3"\n#text(font: ("Font Awesome 6 Brands"))[x]\n'
+        self.assertTrue(bundle.covers(source + '#text[A "quoted" phrase]'))
+        self.assertFalse(bundle.covers(source + '#let design-header-name-font-family = "Lato"'))
+        # Families the registry does not know may be system fonts; the bundle cannot serve them
+        self.assertFalse(bundle.covers(source + '#set text(font: "Arial")'))
+
+    def test_disabled_manager_returns_no_bundle(self):
+        self.assertIsNone(FontBundleManager(enabled=False, parent_dir=self.parent).get(self.fonts))
+
+if __name__ == '__main__':
+    unittest.main()
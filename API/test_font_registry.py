@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+from font_registry import FontRegistry, read_font_families
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+
+class TestFontRegistry(unittest.TestCase):
+    def setUp(self):
+        self.font_dir = tempfile.mkdtemp()
+        shutil.copy(os.path.join(FONTS_DIR, 'fa-solid-900.ttf'), self.font_dir)
+        self.registry = FontRegistry(lambda: [(self.font_dir, True)], check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.font_dir)
+
+    def test_reads_family_names(self):
+        self.assertEqual(read_font_families(os.path.join(FONTS_DIR, 'fa-brands-400.ttf')), ['Font Awesome 6 Brands'])
+
+    def test_snapshot(self):
+        fonts = self.registry.get()
+        self.assertEqual(fonts.families, ['Font Awesome 6 Free'])
+        self.assertEqual(fonts.font_paths, [self.font_dir + os.path.sep])
+        self.assertTrue(fonts.font_awesome)
+        self.assertFalse(fonts.font_awesome_brands)
+        self.assertTrue(fonts.icon_fonts)
+
+    def test_unchanged_directories_are_not_rescanned(self):
+        first = self.registry.get()
+        self.assertIs(self.registry.get(), first)
+        self.assertEqual(self.registry.scans, 1)
+
+    def test_added_font_triggers_rescan(self):
+        first = self.registry.get()
+        shutil.copy(os.path.join(FONTS_DIR, 'fa-brands-400.ttf'), self.font_dir)
+        # Make sure the directory mtime differs even on coarse-grained filesystems
+        stat = os.stat(self.font_dir)
+        os.utime(self.font_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        second = self.registry.get()
+        self.assertEqual(second.version, first.version + 1)
+        self.assertTrue(second.font_awesome_brands)
+        self.assertNotEqual(second.fingerprint, first.fingerprint)
+
+    def test_missing_directory_reports_no_icon_fonts(self):
+        registry = FontRegistry(lambda: [(os.path.join(self.font_dir, 'missing'), False)], check_interval=0)
+        fonts = registry.get()
+        self.assertEqual(fonts.font_paths, [])
+        self.assertFalse(fonts.icon_fonts)
+
+if __name__ == '__main__':
+    unittest.main()
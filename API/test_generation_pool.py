@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+import unittest
+import generation_pool
+from generation_pool import GenerationFailed, GenerationPool
+from render_cancellation import CancelToken, RenderCancelled
+
+# Jobs and worker initializer sent to the pool in place of RenderCV's; they are
+# pickled by reference, so they live at module level
+
+def _init_worker():
+    pass
+
+def pid(_):
+    return os.getpid()
+
+def square(x):
+    return x * x
+
+def fail(message):
+    raise GenerationFailed('ValidationError', message)
+
+def exit_in_worker(parent_pid):
+    if os.getpid() != parent_pid:
+        os._exit(1)
+    return 'in-process'
+
+class TestGenerationPool(unittest.TestCase):
+    def setUp(self):
+        original = generation_pool._init_worker
+        generation_pool._init_worker = _init_worker
+        self.addCleanup(setattr, generation_pool, '_init_worker', original)
+        self.pool = GenerationPool(workers=1)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_start_runs_jobs_in_a_worker_and_shutdown_stops_it(self):
+        self.pool.start()
+        executor = self.pool._executor
+        self.assertIsNotNone(executor)
+        self.assertEqual(self.pool._run(square, 7, None), 49)
+        self.assertNotEqual(self.pool._run(pid, None, None), os.getpid())
+
+        self.pool.shutdown()
+        self.assertIsNone(self.pool._executor)
+        # The next job starts a fresh pool
+        self.assertEqual(self.pool._run(square, 3, None), 9)
+        self.assertIsNot(self.pool._executor, executor)
+
+    def test_spawn_is_used_without_forkserver(self):
+        methods = []
+        get_context = multiprocessing.get_context
+
+        def record(method=None):
+            methods.append(method)
+            return get_context(method)
+
+        for name, value in (('get_all_start_methods', lambda: ['fork', 'spawn']), ('get_context', record)):
+            self.addCleanup(setattr, multiprocessing, name, getattr(multiprocessing, name))
+            setattr(multiprocessing, name, value)
+
+        self.assertEqual(self.pool._run(square, 4, None), 16)
+        self.assertEqual(methods, ['spawn'])
+
+    def test_worker_exceptions_reach_the_caller(self):
+        with self.assertRaises(GenerationFailed) as cm:
+            self.pool._run(fail, 'bad theme', None)
+        self.assertEqual((cm.exception.error_type, cm.exception.message), ('ValidationError', 'bad theme'))
+        # The pool survives the failed job
+        self.assertEqual(self.pool._run(square, 5, None), 25)
+
+    def test_broken_pool_runs_the_job_in_process_and_restarts(self):
+        executor = self.pool._get_executor()
+        self.assertEqual(self.pool._run(exit_in_worker, os.getpid(), None), 'in-process')
+        self.assertIsNone(self.pool._executor)
+        self.assertEqual(self.pool._run(square, 6, None), 36)
+        self.assertIsNot(self.pool._executor, executor)
+
+    def test_cancelled_token_never_submits(self):
+        token = CancelToken()
+        token.cancel()
+        with self.assertRaises(RenderCancelled):
+            self.pool._run(square, 2, token)
+        self.assertIsNone(self.pool._executor)
+
+    def test_disabled_pool_runs_in_process(self):
+        pool = GenerationPool(workers=0)
+        pool.start()
+        self.assertEqual(pool._run(exit_in_worker, os.getpid(), None), 'in-process')
+        self.assertIsNone(pool._executor)
+
+if __name__ == '__main__':
+    unittest.main()
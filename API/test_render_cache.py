@@ -0,0 +1,118 @@
+import threading
+import time
+import unittest
+import yaml
+from render_cache import RenderCache, hash_document
+
+class TestRenderCache(unittest.TestCase):
+    def test_hash_ignores_comments_and_formatting(self):
+        first = yaml.safe_load("""
+cv:
+  name: "John Doe"   # the name
+  email: john.doe@example.com
+design:
+  theme: classic
+""")
+        second = yaml.safe_load("""
+design: {theme: 'classic'}
+cv:
+    email: "john.doe@example.com"
+    name: John Doe
+""")
+        third = yaml.safe_load("""
+cv:
+  name: "Jane Doe"
+  email: john.doe@example.com
+design:
+  theme: classic
+""")
+        self.assertEqual(hash_document(first), hash_document(second))
+        self.assertNotEqual(hash_document(first), hash_document(third))
+
+    def test_lru_eviction_by_entries_and_bytes(self):
+        cache = RenderCache(max_bytes=10, max_entries=2)
+        cache.put('a', b'1234')
+        cache.put('b', b'1234')
+        # Touch 'a' so that 'b' becomes the least recently used entry
+        self.assertEqual(cache.get('a'), b'1234')
+        cache.put('c', b'1234')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'1234')
+
+        # 'c' + 'a' + 'd' exceeds 10 bytes, so the least recently used entry goes
+        cache.put('d', b'12345')
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 10)
+        self.assertIsNone(cache.get('c'))
+        self.assertEqual(cache.get('d'), b'12345')
+
+        # Values larger than the cache are never stored
+        cache.put('huge', b'x' * 11)
+        self.assertIsNone(cache.get('huge'))
+
+    def test_get_or_render_counts_hits_and_misses(self):
+        cache = RenderCache(max_bytes=1024, max_entries=8)
+        value, hit = cache.get_or_render('key', lambda: b'pdf')
+        self.assertEqual((value, hit), (b'pdf', False))
+        value, hit = cache.get_or_render('key', lambda: b'other')
+        self.assertEqual((value, hit), (b'pdf', True))
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_failed_render_is_not_cached(self):
+        cache = RenderCache(max_bytes=1024, max_entries=8)
+
+        def fail():
+            raise RuntimeError('compile failed')
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_render('key', fail)
+        self.assertIsNone(cache.get('key'))
+
+    def test_concurrent_renders_of_same_key_run_once(self):
+        cache = RenderCache(max_bytes=1024, max_entries=8)
+        calls = []
+
+        def render():
+            calls.append(1)
+            time.sleep(0.05)
+            return b'pdf'
+
+        threads = [threading.Thread(target=cache.get_or_render, args=('key', render)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get('key'), b'pdf')
+
+    def test_concurrent_failures_are_shared(self):
+        cache = RenderCache(max_bytes=1024, max_entries=8)
+        calls = []
+        errors = []
+
+        def render():
+            calls.append(1)
+            time.sleep(0.05)
+            raise RuntimeError('validation failed')
+
+        def request():
+            try:
+                cache.get_or_render('key', render)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(cache.stats()['coalesced'], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import unittest
+from render_cancellation import CancelToken, RenderCancelled, RevisionTracker, normalize_revision
+from single_flight import AsyncSingleFlight, SingleFlight
+
+class TestRevisionTracker(unittest.TestCase):
+    def test_newer_revision_cancels_older_render(self):
+        tracker = RevisionTracker()
+        old = tracker.begin('a', 1)
+        new = tracker.begin('a', 2)
+        self.assertTrue(old.cancelled)
+        self.assertFalse(new.cancelled)
+
+    def test_stale_revision_is_cancelled_immediately(self):
+        tracker = RevisionTracker()
+        tracker.begin('a', 5)
+        self.assertTrue(tracker.begin('a', 4).cancelled)
+
+    def test_sessions_are_independent(self):
+        tracker = RevisionTracker()
+        first = tracker.begin('a', 1)
+        tracker.begin('b', 2)
+        self.assertFalse(first.cancelled)
+
+    def test_finished_revision_still_refuses_older_ones(self):
+        tracker = RevisionTracker()
+        with tracker.track('a', 3):
+            pass
+        self.assertTrue(tracker.begin('a', 1).cancelled)
+        self.assertFalse(tracker.begin('a', 3).cancelled)
+
+    def test_revisions_are_kept_for_recent_sessions_only(self):
+        tracker = RevisionTracker(max_sessions=2)
+        for session_id in ('a', 'b', 'c'):
+            with tracker.track(session_id, 5):
+                pass
+        self.assertFalse(tracker.begin('a', 1).cancelled)
+        self.assertTrue(tracker.begin('c', 1).cancelled)
+
+    def test_requests_without_revision_are_never_superseded(self):
+        tracker = RevisionTracker()
+        token = tracker.begin('a', None)
+        tracker.begin('a', 1)
+        self.assertFalse(token.cancelled)
+
+    def test_normalize_revision(self):
+        self.assertEqual(normalize_revision(3), 3)
+        self.assertIsNone(normalize_revision(-1))
+        self.assertIsNone(normalize_revision('3'))
+        self.assertIsNone(normalize_revision(True))
+
+class TestCancelToken(unittest.TestCase):
+    def test_callbacks_run_on_cancel(self):
+        token = CancelToken()
+        calls = []
+        token.on_cancel(lambda: calls.append('kill'))
+        unregister = token.on_cancel(lambda: calls.append('removed'))
+        unregister()
+        token.cancel()
+        token.cancel()
+        self.assertEqual(calls, ['kill'])
+        with self.assertRaises(RenderCancelled):
+            token.raise_if_cancelled()
+
+    def test_callback_registered_after_cancel_runs_immediately(self):
+        token = CancelToken()
+        token.cancel()
+        calls = []
+        token.on_cancel(lambda: calls.append('kill'))
+        self.assertEqual(calls, ['kill'])
+
+class TestSingleFlightRetry(unittest.TestCase):
+    def test_waiters_rerun_when_leader_is_cancelled(self):
+        flights = SingleFlight(retry_on=(RenderCancelled,))
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def cancelled_render():
+            started.set()
+            release.wait()
+            raise RenderCancelled()
+
+        def leader():
+            with self.assertRaises(RenderCancelled):
+                flights.do('doc', cancelled_render)
+
+        def waiter():
+            results.append(flights.do('doc', lambda: b'pdf'))
+
+        leader_thread = threading.Thread(target=leader)
+        leader_thread.start()
+        started.wait()
+        waiter_thread = threading.Thread(target=waiter)
+        waiter_thread.start()
+        while flights.coalesced == 0:
+            pass
+        release.set()
+        leader_thread.join()
+        waiter_thread.join()
+        self.assertEqual(results, [(b'pdf', False)])
+
+class TestAsyncSingleFlightAbandon(unittest.TestCase):
+    def run_flight(self, disconnect):
+        async def scenario():
+            flights = AsyncSingleFlight(retry_on=(RenderCancelled,))
+            token = CancelToken()
+            release = asyncio.Event()
+
+            async def render():
+                await release.wait()
+                return b'pdf'
+
+            callers = [asyncio.ensure_future(flights.do('doc', render, abandon=token.cancel)) for _ in range(2)]
+            await asyncio.sleep(0)
+            for caller in callers[:disconnect]:
+                caller.cancel()
+            await asyncio.sleep(0)
+            cancelled = token.cancelled
+            release.set()
+            await asyncio.gather(*callers, return_exceptions=True)
+            return cancelled
+
+        return asyncio.run(scenario())
+
+    def test_render_continues_while_another_caller_waits(self):
+        self.assertFalse(self.run_flight(disconnect=1))
+
+    def test_render_is_abandoned_when_every_caller_is_gone(self):
+        self.assertTrue(self.run_flight(disconnect=2))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import copy
+import json
+import unittest
+import render_cache
+import render_metrics
+import render_pipeline
+from render_pipeline import RenderError
+from render_test_fixtures import CV_DOCUMENT, CV_YAML, StubbedRenderMixin
+
+class TestRenderDocument(StubbedRenderMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.misses = render_cache.pdf_cache.stats()['misses']
+
+    def test_fixes_are_applied_before_rendercv(self):
+        result = render_pipeline.render_document(copy.deepcopy(CV_DOCUMENT))
+        self.assertEqual(result.pdf_data, b'%PDF-#text[John Doe]')
+        self.assertFalse(result.cache_hit)
+        design = self.generator.documents[0]['design']
+        self.assertNotIn('small_caps_for_name', design['header'])
+        self.assertEqual(design['section_titles']['type'], 'with-partial-line')
+
+    def test_json_document_shares_the_cache_entry_of_the_equivalent_yaml(self):
+        self.assertFalse(render_pipeline.render_yaml(CV_YAML).cache_hit)
+        result = render_pipeline.render_document(json.loads(json.dumps(CV_DOCUMENT)))
+        self.assertTrue(result.cache_hit)
+        self.assertEqual(len(self.generator.documents), 1)
+        self.assertEqual(render_cache.pdf_cache.stats()['entries'], 1)
+
+    def test_cache_hits_never_wait_for_a_slot(self):
+        miss = render_pipeline.render_yaml(CV_YAML, priority='interactive')
+        with render_metrics.track():
+            hit = render_pipeline.prepare_yaml(CV_YAML).cached()
+        self.assertIn('queue', miss.timings.stages)
+        self.assertEqual((hit.cache_hit, hit.pdf_data), (True, miss.pdf_data))
+        self.assertEqual(render_cache.pdf_cache.stats()['misses'] - self.misses, 1)
+
+    def test_non_object_document_is_rejected(self):
+        for document in (['cv'], 'cv: {}', None):
+            with self.assertRaises(RenderError) as cm:
+                render_pipeline.render_document(document)
+            self.assertEqual(cm.exception.status_code, 400)
+        self.assertEqual(self.generator.documents, [])
+
+if __name__ == '__main__':
+    unittest.main()
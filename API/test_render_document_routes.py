@@ -0,0 +1,48 @@
+import asyncio
+import copy
+import importlib.util
+import unittest
+from render_test_fixtures import CV_DOCUMENT, StubbedRenderMixin
+
+FLASK_AVAILABLE = importlib.util.find_spec('flask') is not None
+QUART_AVAILABLE = importlib.util.find_spec('quart') is not None
+
+class RenderDocumentRoutes(StubbedRenderMixin):
+    """
+    Tests of /render_document shared by both apps; mixed into a TestCase that
+    provides `post(body)` returning (status code, content type, body).
+    """
+
+    def test_render_document(self):
+        status, mimetype, data = self.post({'document': copy.deepcopy(CV_DOCUMENT)})
+        self.assertEqual((status, mimetype), (200, 'application/pdf'))
+        self.assertEqual(data, b'%PDF-#text[John Doe]')
+        # Fixes were applied before the document reached RenderCV
+        self.assertNotIn('small_caps_for_name', self.generator.documents[0]['design']['header'])
+
+    def test_non_object_document_is_rejected(self):
+        for document in (['cv'], 'cv: {}'):
+            status, mimetype, _ = self.post({'document': document})
+            self.assertEqual((status, mimetype), (400, 'application/json'))
+        self.assertEqual(self.generator.documents, [])
+
+@unittest.skipUnless(FLASK_AVAILABLE, "flask is not installed")
+class TestFlaskRenderDocument(RenderDocumentRoutes, unittest.TestCase):
+    def post(self, body):
+        from app import app
+        response = app.test_client().post('/render_document', json=body)
+        return response.status_code, response.mimetype, response.get_data()
+
+@unittest.skipUnless(QUART_AVAILABLE, "quart is not installed")
+class TestAsgiRenderDocument(RenderDocumentRoutes, unittest.TestCase):
+    def post(self, body):
+        from asgi_app import app
+
+        async def post():
+            response = await app.test_client().post('/render_document', json=body)
+            return response.status_code, response.mimetype, await response.get_data()
+
+        return asyncio.run(post())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import time
+import unittest
+import render_metrics
+from render_metrics import Counter, Histogram, Registry
+
+class TestRenderMetrics(unittest.TestCase):
+    def test_histogram_exposition(self):
+        histogram = Histogram('demo_seconds', 'Demo.', ('stage',), buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage='compile')
+        histogram.observe(0.5, stage='compile')
+        histogram.observe(5, stage='compile')
+        lines = histogram.expose()
+        self.assertIn('# TYPE demo_seconds histogram', lines)
+        self.assertIn('demo_seconds_bucket{stage="compile",le="0.1"} 1', lines)
+        self.assertIn('demo_seconds_bucket{stage="compile",le="1.0"} 2', lines)
+        self.assertIn('demo_seconds_bucket{stage="compile",le="+Inf"} 3', lines)
+        self.assertIn('demo_seconds_count{stage="compile"} 3', lines)
+
+    def test_counter_labels_are_escaped(self):
+        registry = Registry()
+        counter = registry.register(Counter('demo_total', 'Demo.', ('theme',)))
+        counter.inc(theme='a"b')
+        counter.inc(2, theme='a"b')
+        self.assertIn('demo_total{theme="a\\"b"} 3', registry.expose())
+
+    def test_nested_stages_count_their_own_time(self):
+        with render_metrics.track() as timings:
+            with render_metrics.stage('compile'):
+                with render_metrics.stage('readback'):
+                    time.sleep(0.02)
+        self.assertGreaterEqual(timings.stages['readback'], 0.02)
+        self.assertLess(timings.stages['compile'], 0.02)
+
+    def test_stages_are_observed_with_theme_label(self):
+        before = render_metrics.stage_seconds.count(stage='generate', theme='sb2nov')
+        with render_metrics.track() as timings:
+            with render_metrics.stage('generate'):
+                pass
+            timings.theme = 'sb2nov'
+        self.assertEqual(render_metrics.stage_seconds.count(stage='generate', theme='sb2nov'), before + 1)
+
+    def test_stage_outside_a_render_is_ignored(self):
+        with render_metrics.stage('compile'):
+            pass
+        self.assertIsNone(render_metrics.current())
+
+    def test_server_timing_header(self):
+        timings = render_metrics.RenderTimings()
+        timings.add('generate', 0.0851)
+        timings.add('compile', 0.04)
+        timings.total = 0.13
+        self.assertEqual(
+            render_metrics.server_timing(timings, 'miss'),
+            'generate;dur=85.1, compile;dur=40.0, cache;desc="miss", total;dur=130.0',
+        )
+        self.assertEqual(render_metrics.server_timing(None, 'hit'), 'cache;desc="hit"')
+
+    def test_theme_label_bounds_cardinality(self):
+        self.assertEqual(render_metrics.theme_label('classic'), 'classic')
+        self.assertEqual(render_metrics.theme_label('my_custom_theme'), 'other')
+        self.assertEqual(render_metrics.theme_label(None), 'unknown')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+import unittest
+from render_cancellation import CancelToken, RenderCancelled
+from render_scheduler import EXPORT, INTERACTIVE, RenderScheduler, normalize_priority
+
+def start_waiter(scheduler, priority, client_id, order, release=None):
+    def run():
+        with scheduler.slot(priority, client_id):
+            order.append((priority, client_id))
+            if release is not None:
+                release.wait()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+def wait_for_queue(scheduler, priority, depth):
+    while scheduler.stats()['classes'][priority]['queued'] < depth:
+        time.sleep(0.001)
+
+class TestRenderScheduler(unittest.TestCase):
+    def test_interactive_renders_go_first(self):
+        scheduler = RenderScheduler(slots=1, export_slots=1)
+        order = []
+        with scheduler.slot(EXPORT, 'batch'):
+            threads = [start_waiter(scheduler, EXPORT, 'batch', order)]
+            wait_for_queue(scheduler, EXPORT, 1)
+            threads.append(start_waiter(scheduler, INTERACTIVE, 'editor', order))
+            wait_for_queue(scheduler, INTERACTIVE, 1)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, [(INTERACTIVE, 'editor'), (EXPORT, 'batch')])
+
+    def test_exports_leave_slots_for_previews(self):
+        scheduler = RenderScheduler(slots=2, export_slots=1)
+        release = threading.Event()
+        order = []
+        exporter = start_waiter(scheduler, EXPORT, 'batch', order, release)
+        queued = start_waiter(scheduler, EXPORT, 'batch', order, release)
+        wait_for_queue(scheduler, EXPORT, 1)
+        with scheduler.slot(INTERACTIVE, 'editor'):
+            self.assertEqual(scheduler.stats()['classes'][EXPORT]['running'], 1)
+        release.set()
+        exporter.join()
+        queued.join()
+
+    def test_clients_take_turns(self):
+        scheduler = RenderScheduler(slots=1, export_slots=1)
+        order = []
+        threads = []
+        with scheduler.slot(EXPORT, 'hold'):
+            for client_id in ['a', 'a', 'a', 'b']:
+                threads.append(start_waiter(scheduler, EXPORT, client_id, order))
+                wait_for_queue(scheduler, EXPORT, len(threads))
+        for thread in threads:
+            thread.join()
+        self.assertEqual([client for _, client in order], ['a', 'b', 'a', 'a'])
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        scheduler = RenderScheduler(slots=1, export_slots=1)
+        token = CancelToken()
+        errors = []
+
+        def run():
+            try:
+                with scheduler.slot(INTERACTIVE, 'editor', token):
+                    pass
+            except RenderCancelled as e:
+                errors.append(e)
+
+        with scheduler.slot(INTERACTIVE, 'other'):
+            thread = threading.Thread(target=run)
+            thread.start()
+            wait_for_queue(scheduler, INTERACTIVE, 1)
+            token.cancel()
+            thread.join()
+        self.assertEqual(len(errors), 1)
+        stats = scheduler.stats()['classes'][INTERACTIVE]
+        self.assertEqual((stats['queued'], stats['running'], stats['cancelled']), (0, 0, 1))
+
+    def test_async_slot(self):
+        scheduler = RenderScheduler(slots=1, export_slots=1)
+
+        async def main():
+            order = []
+
+            async def render(priority, name):
+                async with scheduler.async_slot(priority, name):
+                    order.append(name)
+                    await asyncio.sleep(0)
+
+            async with scheduler.async_slot(EXPORT, 'hold'):
+                tasks = [asyncio.ensure_future(render(EXPORT, 'export'))]
+                await asyncio.sleep(0)
+                tasks.append(asyncio.ensure_future(render(INTERACTIVE, 'preview')))
+                await asyncio.sleep(0)
+            await asyncio.gather(*tasks)
+            return order
+
+        self.assertEqual(asyncio.run(main()), ['preview', 'export'])
+
+    def test_normalize_priority(self):
+        self.assertEqual(normalize_priority('export'), EXPORT)
+        self.assertEqual(normalize_priority('urgent'), INTERACTIVE)
+        self.assertEqual(normalize_priority(None), INTERACTIVE)
+
+if __name__ == '__main__':
+    unittest.main()
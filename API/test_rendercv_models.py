@@ -0,0 +1,145 @@
+import unittest
+import rendercv_models
+from rendercv_models import DesignCache, design_key
+
+try:
+    import pydantic
+except ImportError:
+    pydantic = None
+
+class FakeDesign:
+    def __init__(self, options):
+        self.options = options
+
+class FakeModel:
+    def __init__(self, document, design):
+        self.cv = document.get('cv')
+        self.design = design
+
+class FakeRenderCV:
+    """
+    Stands in for `read_a_python_dictionary_and_return_a_data_model`: validates
+    design mappings into FakeDesign and takes validated designs back as they are.
+    """
+
+    def __init__(self, reject_models=None, error=None):
+        self.validated_designs = 0
+        self.reused_designs = 0
+        self.reject_models = reject_models
+        self.error = error
+
+    def __call__(self, document):
+        if self.error is not None:
+            raise self.error
+        design = document['design']
+        if isinstance(design, FakeDesign):
+            if self.reject_models is not None:
+                raise self.reject_models
+            self.reused_designs += 1
+        else:
+            self.validated_designs += 1
+            design = FakeDesign(design)
+        return FakeModel(document, design)
+
+def document(name, theme='classic'):
+    return {'cv': {'name': name}, 'design': {'theme': theme, 'page': {'size': 'a4'}}}
+
+class TestRendercvModels(unittest.TestCase):
+    def test_design_key_ignores_key_order(self):
+        a = {'theme': 'classic', 'page': {'size': 'a4', 'top_margin': '2cm'}}
+        b = {'page': {'top_margin': '2cm', 'size': 'a4'}, 'theme': 'classic'}
+        self.assertEqual(design_key(a), design_key(b))
+        self.assertNotEqual(design_key(a), design_key(dict(a, theme='sb2nov')))
+        self.assertIsNone(design_key(None))
+
+    def test_design_cache_is_bounded(self):
+        cache = DesignCache(max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, object())
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertIsNone(cache.get(None))
+        self.assertEqual(cache.stats(), {'entries': 2, 'hits': 1, 'misses': 1})
+
+        cache.disable()
+        cache.put('d', object())
+        self.assertEqual((cache.get('d'), cache.stats()['entries']), (None, 0))
+
+class ValidateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.patch('BUILTIN_DESIGNS', (FakeDesign,))
+        self.patch('design_cache', DesignCache(max_entries=4))
+
+    def patch(self, name, value):
+        missing = object()
+        original = getattr(rendercv_models, name, missing)
+        if original is missing:
+            self.addCleanup(delattr, rendercv_models, name)
+        else:
+            self.addCleanup(setattr, rendercv_models, name, original)
+        setattr(rendercv_models, name, value)
+
+    def use(self, rendercv):
+        self.patch('read_a_python_dictionary_and_return_a_data_model', rendercv)
+        return rendercv
+
+class TestValidate(ValidateTestCase):
+    def test_cached_design_is_passed_back(self):
+        rendercv = self.use(FakeRenderCV())
+        first = rendercv_models.validate(document('John'))
+        second_document = document('Jane')
+        second = rendercv_models.validate(second_document)
+
+        self.assertEqual((rendercv.validated_designs, rendercv.reused_designs), (1, 1))
+        self.assertIs(second.design, first.design)
+        self.assertEqual(second.cv, {'name': 'Jane'})
+        # The caller's document keeps its mapping
+        self.assertEqual(second_document['design'], {'theme': 'classic', 'page': {'size': 'a4'}})
+
+    def test_other_designs_are_validated(self):
+        rendercv = self.use(FakeRenderCV())
+        rendercv_models.validate(document('John'))
+        rendercv_models.validate(document('John', theme='sb2nov'))
+        self.assertEqual((rendercv.validated_designs, rendercv.reused_designs), (2, 0))
+
+    def test_custom_designs_are_not_cached(self):
+        self.patch('BUILTIN_DESIGNS', (type('OtherDesign', (), {}),))
+        rendercv = self.use(FakeRenderCV())
+        rendercv_models.validate(document('John'))
+        rendercv_models.validate(document('John'))
+        self.assertEqual((rendercv.validated_designs, rendercv.reused_designs), (2, 0))
+
+@unittest.skipIf(pydantic is None, "pydantic is not installed")
+class TestValidateFallback(ValidateTestCase):
+    def validation_error(self, field):
+        model = pydantic.create_model('Document', **{field: (int, ...)})
+        try:
+            model(**{field: 'not a number'})
+        except pydantic.ValidationError as e:
+            return e
+
+    def test_rejected_model_disables_design_reuse(self):
+        for error in (TypeError('design must be a mapping'), self.validation_error('design')):
+            with self.subTest(error=type(error).__name__):
+                self.patch('design_cache', DesignCache(max_entries=4))
+                rendercv = self.use(FakeRenderCV(reject_models=error))
+                rendercv_models.validate(document('John'))
+                model = rendercv_models.validate(document('Jane'))
+
+                # Validated again from the mapping, and never reused after that
+                self.assertEqual(rendercv.validated_designs, 2)
+                self.assertIsInstance(model.design, FakeDesign)
+                self.assertEqual(rendercv_models.design_cache.max_entries, 0)
+                rendercv_models.validate(document('Jim'))
+                self.assertEqual(rendercv.validated_designs, 3)
+
+    def test_errors_outside_the_design_are_raised(self):
+        self.use(FakeRenderCV())
+        rendercv_models.validate(document('John'))
+        self.use(FakeRenderCV(reject_models=self.validation_error('cv')))
+        with self.assertRaises(pydantic.ValidationError):
+            rendercv_models.validate(document('Jane'))
+        self.assertEqual(rendercv_models.design_cache.max_entries, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import gzip
+import json
+import unittest
+from request_body import RequestBodyError, decode_content, parse_render_request
+
+YAML = 'cv:\n  name: "Jürgen"\n'
+
+class TestRequestBody(unittest.TestCase):
+    def test_json_envelope(self):
+        raw = json.dumps({'yaml_content': YAML, 'revision': 3}).encode('utf-8')
+        self.assertEqual(parse_render_request(raw, 'application/json'), {'yaml_content': YAML, 'revision': 3})
+
+    def test_raw_yaml_with_query_options(self):
+        data = parse_render_request(YAML.encode('utf-8'), 'application/yaml', '',
+                                    {'session_id': 'abc', 'revision': '7', 'other': 'x'})
+        self.assertEqual(data, {'yaml_content': YAML, 'session_id': 'abc', 'revision': 7})
+
+    def test_gzip_bodies(self):
+        raw = gzip.compress(YAML.encode('utf-8'))
+        self.assertEqual(parse_render_request(raw, 'text/yaml', 'gzip')['yaml_content'], YAML)
+        envelope = gzip.compress(json.dumps({'yaml_content': YAML}).encode('utf-8'))
+        self.assertEqual(parse_render_request(envelope, 'application/json', 'gzip')['yaml_content'], YAML)
+
+    def test_decompressed_size_is_bounded(self):
+        bomb = gzip.compress(b'a' * 100000)
+        with self.assertRaises(RequestBodyError) as raised:
+            decode_content(bomb, 'gzip', max_bytes=1000)
+        self.assertEqual(raised.exception.status_code, 413)
+
+    def test_rejected_bodies(self):
+        cases = [
+            (b'not gzip', 'application/yaml', 'gzip', 400),
+            (YAML.encode('utf-8'), 'application/yaml', 'br', 415),
+            (YAML.encode('utf-8'), 'text/plain', '', 415),
+            (b'[1, 2]', 'application/json', '', 400),
+            (gzip.compress(YAML.encode('utf-8'))[:-8], 'application/yaml', 'gzip', 400),
+        ]
+        for raw, mimetype, encoding, status in cases:
+            with self.assertRaises(RequestBodyError, msg=(mimetype, encoding)) as raised:
+                parse_render_request(raw, mimetype, encoding)
+            self.assertEqual(raised.exception.status_code, status)
+        with self.assertRaises(RequestBodyError):
+            parse_render_request(YAML.encode('utf-8'), 'application/yaml', allow_yaml=False)
+
+if __name__ == '__main__':
+    unittest.main()
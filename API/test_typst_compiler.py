@@ -0,0 +1,103 @@
+import json
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+from render_cancellation import CancelToken, RenderCancelled
+from typst_compiler import CliTypstCompiler, TypstCompileError, scratch_dir
+
+# Stands in for `typst compile ... - -`: records its arguments, then answers
+# according to the first line of the source read from stdin
+FAKE_TYPST = textwrap.dedent("""
+    import json, os, sys, time
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, 'args.json'), 'w') as f:
+        json.dump(sys.argv[1:], f)
+    source = sys.stdin.buffer.read()
+    if source.startswith(b'#error'):
+        sys.stderr.write('error: unknown variable: oops\\n' + 'x' * 1000)
+        sys.exit(1)
+    if source.startswith(b'#empty'):
+        sys.exit(0)
+    if source.startswith(b'#hang'):
+        open(os.path.join(here, 'started'), 'w').close()
+        time.sleep(30)
+    sys.stdout.buffer.write(b'%PDF-' + source)
+""")
+
+class TestCliTypstCompiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        script = os.path.join(self.tmp.name, 'fake_typst.py')
+        with open(script, 'w') as f:
+            f.write(FAKE_TYPST)
+        self.binary = os.path.join(self.tmp.name, 'typst')
+        with open(self.binary, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(self.binary, os.stat(self.binary).st_mode | stat.S_IEXEC)
+
+    def args(self):
+        with open(os.path.join(self.tmp.name, 'args.json')) as f:
+            return json.load(f)
+
+    def test_source_is_piped_through_stdin_and_stdout(self):
+        compiler = CliTypstCompiler(['/fonts/a', '/fonts/b'], typst_binary=self.binary, ignore_system_fonts=True)
+        self.assertEqual(compiler.compile('#text[é]'), '%PDF-#text[é]'.encode('utf-8'))
+        self.assertEqual(self.args(), [
+            'compile', '--diagnostic-format', 'human', '--root', scratch_dir(),
+            '--font-path', '/fonts/a', '--font-path', '/fonts/b', '--ignore-system-fonts', '-', '-',
+        ])
+
+    def test_system_fonts_are_searched_by_default(self):
+        CliTypstCompiler([], typst_binary=self.binary).compile('x')
+        self.assertNotIn('--ignore-system-fonts', self.args())
+        self.assertEqual(self.args()[-2:], ['-', '-'])
+
+    def test_failed_compile_raises_with_truncated_diagnostics(self):
+        with self.assertRaises(TypstCompileError) as cm:
+            CliTypstCompiler([], typst_binary=self.binary).compile('#error')
+        self.assertEqual(cm.exception.message, "Typst compilation failed.")
+        self.assertTrue(cm.exception.details.startswith('error: unknown variable: oops'))
+        self.assertEqual(len(cm.exception.details), 503)
+
+    def test_empty_output_raises(self):
+        with self.assertRaises(TypstCompileError) as cm:
+            CliTypstCompiler([], typst_binary=self.binary).compile('#empty')
+        self.assertIn('empty', cm.exception.message)
+
+    def test_cancel_kills_the_process(self):
+        compiler = CliTypstCompiler([], typst_binary=self.binary)
+        token = CancelToken()
+        outcome = []
+
+        def compile():
+            try:
+                compiler.compile('#hang', cancel_token=token)
+            except RenderCancelled:
+                outcome.append('cancelled')
+
+        thread = threading.Thread(target=compile)
+        start = time.monotonic()
+        thread.start()
+        started = os.path.join(self.tmp.name, 'started')
+        while not os.path.exists(started) and time.monotonic() - start < 10:
+            time.sleep(0.01)
+        token.cancel()
+        thread.join(timeout=10)
+        self.assertEqual(outcome, ['cancelled'])
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_cancelled_token_never_starts_a_process(self):
+        token = CancelToken()
+        token.cancel()
+        with self.assertRaises(RenderCancelled):
+            CliTypstCompiler([], typst_binary=self.binary).compile('x', cancel_token=token)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, 'args.json')))
+
+if __name__ == '__main__':
+    unittest.main()
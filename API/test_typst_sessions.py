@@ -0,0 +1,169 @@
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from typst_compiler import TypstCompileError
+from typst_sessions import SessionCompilerFailed, SessionPool, WatchSessionCompiler
+
+class FakeCompiler:
+    def __init__(self, fail_with=None):
+        self.sources = []
+        self.closed = False
+        self.fail_with = fail_with
+
+    def compile(self, typst_content, cancel_token=None):
+        if self.fail_with:
+            raise self.fail_with
+        self.sources.append(typst_content)
+        return typst_content.encode('utf-8')
+
+    def close(self):
+        self.closed = True
+
+def one_shot(typst_content, cancel_token=None):
+    return b'one-shot:' + typst_content.encode('utf-8')
+
+class TestSessionPool(unittest.TestCase):
+    def test_session_reuses_its_compiler(self):
+        created = []
+
+        def factory():
+            created.append(FakeCompiler())
+            return created[-1]
+
+        pool = SessionPool(factory, max_sessions=4, idle_timeout=60)
+        self.assertEqual(pool.compile('a', 'rev1', one_shot), b'rev1')
+        self.assertEqual(pool.compile('a', 'rev2', one_shot), b'rev2')
+        self.assertEqual(len(created), 1)
+        self.assertEqual(created[0].sources, ['rev1', 'rev2'])
+        pool.close_all()
+        self.assertTrue(created[0].closed)
+
+    def test_least_recently_used_session_is_evicted(self):
+        created = {}
+
+        def factory():
+            compiler = FakeCompiler()
+            created[len(created)] = compiler
+            return compiler
+
+        pool = SessionPool(factory, max_sessions=2, idle_timeout=60)
+        pool.compile('a', 'x', one_shot)
+        pool.compile('b', 'x', one_shot)
+        pool.compile('a', 'y', one_shot)
+        pool.compile('c', 'x', one_shot)
+
+        self.assertTrue(created[1].closed)  # 'b' was least recently used
+        self.assertFalse(created[0].closed)
+        self.assertEqual(pool.stats()['sessions'], 2)
+        pool.close_all()
+
+    def test_idle_sessions_are_reaped(self):
+        pool = SessionPool(FakeCompiler, max_sessions=4, idle_timeout=0.01)
+        pool.compile('a', 'x', one_shot)
+        time.sleep(0.02)
+        self.assertEqual(pool.reap_idle(), 1)
+        self.assertEqual(pool.stats()['sessions'], 0)
+
+    def test_document_errors_keep_the_session(self):
+        pool = SessionPool(lambda: FakeCompiler(TypstCompileError("Typst compilation failed.")), max_sessions=4, idle_timeout=60)
+        with self.assertRaises(TypstCompileError):
+            pool.compile('a', 'x', one_shot)
+        self.assertEqual(pool.stats()['sessions'], 1)
+        pool.close_all()
+
+    def test_broken_compiler_falls_back_to_one_shot(self):
+        pool = SessionPool(lambda: FakeCompiler(RuntimeError('watcher died')), max_sessions=4, idle_timeout=60)
+        self.assertEqual(pool.compile('a', 'x', one_shot), b'one-shot:x')
+        self.assertEqual(pool.stats()['sessions'], 0)
+
+    def test_compiler_is_created_outside_the_pool_lock(self):
+        pool = SessionPool(None, max_sessions=4, idle_timeout=60)
+        held = []
+
+        def factory():
+            held.append(pool._lock.locked())
+            return FakeCompiler()
+
+        pool.factory = factory
+        pool.compile('a', 'x', one_shot)
+        self.assertEqual(held, [False])
+        pool.close_all()
+
+# Stands in for `typst watch MAIN OUTPUT`: polls the source and copies each
+# new revision to the output, reporting on stderr like typst does
+FAKE_WATCH = textwrap.dedent("""
+    import os, sys, time
+    source, output = sys.argv[-2], sys.argv[-1]
+    seen = None
+    while True:
+        try:
+            st = os.stat(source)
+            state = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            state = None
+        if state is not None and state != seen:
+            seen = state
+            with open(source, 'rb') as f:
+                data = f.read()
+            if os.environ.get('FAKE_WATCH_FROZEN') and os.path.exists(output):
+                pass
+            elif data.startswith(b'#error'):
+                print('[00:00:00] compiled with errors', file=sys.stderr, flush=True)
+                print('error: unknown variable', file=sys.stderr, flush=True)
+                continue
+            else:
+                with open(output, 'wb') as f:
+                    f.write(data)
+            print('[00:00:00] compiled successfully in 1ms', file=sys.stderr, flush=True)
+        time.sleep(0.005)
+""")
+
+class TestWatchSessionCompiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        script = os.path.join(self.tmp.name, 'fake_watch.py')
+        with open(script, 'w') as f:
+            f.write(FAKE_WATCH)
+        self.binary = os.path.join(self.tmp.name, 'typst')
+        with open(self.binary, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(self.binary, os.stat(self.binary).st_mode | stat.S_IEXEC)
+        self.addCleanup(self.tmp.cleanup)
+        self.addCleanup(os.environ.pop, 'FAKE_WATCH_FROZEN', None)
+
+    def compiler(self):
+        compiler = WatchSessionCompiler([], typst_binary=self.binary, timeout=5)
+        self.addCleanup(compiler.close)
+        return compiler
+
+    def test_each_revision_is_compiled_whole(self):
+        compiler = self.compiler()
+        for revision in range(5):
+            source = f'rev{revision} ' + 'x' * 65536 * revision
+            self.assertEqual(compiler.compile(source), source.encode('utf-8'))
+
+    def test_document_errors_carry_diagnostics(self):
+        compiler = self.compiler()
+        with self.assertRaises(TypstCompileError) as cm:
+            compiler.compile('#error')
+        self.assertIn('unknown variable', cm.exception.details)
+        self.assertEqual(compiler.compile('fixed'), b'fixed')
+
+    def test_stale_output_fails_the_session(self):
+        compiler = self.compiler()
+        compiler.compile('rev1')
+        # The watcher now reports compilations without writing the output
+        compiler.close()
+        os.environ['FAKE_WATCH_FROZEN'] = '1'
+        compiler = self.compiler()
+        (compiler.workdir / 'main.pdf').write_bytes(b'rev0')
+        time.sleep(0.01)
+        with self.assertRaises(SessionCompilerFailed):
+            compiler.compile('rev1')
+
+if __name__ == '__main__':
+    unittest.main()
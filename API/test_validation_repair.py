@@ -0,0 +1,73 @@
+import unittest
+import validation_repair
+from validation_repair import RepairMemo, apply_known_repairs, repair_document, resolve_location
+
+def error(*loc, msg='Input should be a valid value'):
+    return {'loc': tuple(loc), 'msg': msg, 'input': ''}
+
+class TestValidationRepair(unittest.TestCase):
+    def setUp(self):
+        validation_repair.memo.clear()
+
+    def test_locations_skip_model_names(self):
+        document = {'cv': {'sections': {'experience': [{'start_date': '2020-13'}]}}}
+        self.assertEqual(
+            resolve_location(document, ('cv', 'sections', 'experience', '0', 'ExperienceEntry', 'start_date')),
+            ('cv', 'sections', 'experience', 0, 'start_date'))
+        # Missing fields and whole entries are not fields that can be repaired
+        self.assertIsNone(resolve_location(document, ('cv', 'name')))
+        self.assertIsNone(resolve_location(document, ('cv', 'sections', 'experience', '0')))
+
+    def test_reported_fields_are_removed_or_reset(self):
+        document = {
+            'cv': {'name': 'John', 'email': 'not-an-email'},
+            'design': {'theme': 'classic', 'page': {'size': 'a99', 'top_margin': 'lots'},
+                       'section_titles': {'type': 'wavy'}},
+        }
+        repairs, unrepaired = repair_document(document, [
+            error('design', 'page', 'size'),
+            error('design', 'page', 'size', msg='reported twice'),
+            error('design', 'ClassicThemeOptions', 'section_titles', 'type'),
+            error('cv', 'email'),
+        ])
+        self.assertEqual([(r.path, r.action, r.source) for r in repairs], [
+            (('design', 'page', 'size'), ('remove',), 'error'),
+            (('design', 'section_titles', 'type'), ('default', 'with-partial-line'), 'error'),
+        ])
+        # The CV's own content is reported, not removed
+        self.assertEqual(unrepaired, [error('cv', 'email')])
+        self.assertEqual(document['cv']['email'], 'not-an-email')
+        self.assertEqual(document['design'], {'theme': 'classic', 'page': {'top_margin': 'lots'},
+                                              'section_titles': {'type': 'with-partial-line'}})
+
+    def test_fields_inside_removed_fields_are_skipped(self):
+        document = {'design': {'header': {'alignment': 'diagonal'}, 'theme': 'classic'}}
+        repairs, unrepaired = repair_document(document, [error('design', 'header'),
+                                                         error('design', 'header', 'alignment')])
+        self.assertEqual([r.path for r in repairs], [('design', 'header')])
+        self.assertEqual((unrepaired, document), ([], {'design': {'theme': 'classic'}}))
+
+    def test_repairs_are_remembered_by_design_path_and_value(self):
+        design = {'theme': 'classic', 'page': {'size': 'a99', 'top_margin': '2cm'}}
+        repair_document({'cv': {'name': 'John'}, 'design': dict(design, page=dict(design['page']))},
+                        [error('design', 'page', 'size'), error('locale', 'language')])
+        same = {'cv': {'name': 'Edited'}, 'design': dict(design, page=dict(design['page']))}
+        repairs = apply_known_repairs(same)
+        self.assertEqual([(r.path, r.source) for r in repairs], [(('design', 'page', 'size'), 'memo')])
+        self.assertEqual(same['design']['page'], {'top_margin': '2cm'})
+        # The same value in a document with another design is left for RenderCV to judge
+        other_theme = {'design': dict(design, theme='custom', page=dict(design['page']))}
+        self.assertEqual(apply_known_repairs(other_theme), [])
+        self.assertEqual(other_theme['design']['page']['size'], 'a99')
+
+    def test_memo_is_bounded(self):
+        memo = RepairMemo(max_entries=2)
+        document = {'design': {'page': {'size': 'a97'}}}
+        scope = validation_repair.design_scope(document)
+        for size in ('a97', 'a98', 'a99'):
+            memo.remember(scope, ('design', 'page', 'size'), size, ('remove',))
+        self.assertEqual(len(memo), 2)
+        self.assertEqual(memo.apply(document), [])
+
+if __name__ == '__main__':
+    unittest.main()
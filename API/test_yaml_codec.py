@@ -0,0 +1,35 @@
+import datetime
+import os
+import unittest
+import yaml
+import yaml_codec
+from theme_manager import THEMES_DIR
+
+class TestYamlCodec(unittest.TestCase):
+    def test_codec_matches_the_pure_python_safe_loader(self):
+        for name in sorted(os.listdir(THEMES_DIR)):
+            with open(os.path.join(THEMES_DIR, name), 'r', encoding='utf-8') as f:
+                content = f.read()
+            self.assertEqual(yaml_codec.load(content), yaml.load(content, Loader=yaml.SafeLoader), name)
+
+    def test_dump_round_trips(self):
+        document = {'cv': {'name': 'Jürgen', 'sections': {'a': ['yes', 1, None]}},
+                    'rendercv_settings': {'date': datetime.date(2025, 3, 1)}}
+        dumped = yaml_codec.dump(document, allow_unicode=True)
+        self.assertIn('Jürgen', dumped)
+        self.assertNotIn('{', dumped)
+        self.assertEqual(yaml_codec.load(dumped), document)
+
+    def test_unsafe_tags_are_rejected(self):
+        with self.assertRaises(yaml_codec.YAMLError):
+            yaml_codec.load('!!python/object/apply:os.system ["true"]')
+
+    def test_compose_and_load_returns_positions(self):
+        node, document = yaml_codec.compose_and_load('cv:\n  name: John\n  sections: [1, 2]\n')
+        self.assertEqual(document, {'cv': {'name': 'John', 'sections': [1, 2]}})
+        key, value = node.value[0][1].value[1]
+        self.assertEqual((key.value, key.start_mark.line, key.start_mark.column), ('sections', 2, 2))
+        self.assertEqual(yaml_codec.compose_and_load(''), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+import yaml
+from yaml_fix_rules import FixRule, RuleSet, load_default_rule_set, load_rules
+
+class TestYamlFixRules(unittest.TestCase):
+    def test_default_rules_report_what_fired(self):
+        document = {
+            'cv': {'sections': {'experience': [{'design': {'header': {'small_caps_for_name': True}}}]}},
+            'design': {'header': {'small_caps_for_name': True, 'name_font_size': '30pt'},
+                       'section_titles': {'type': 'moderncv'}},
+        }
+        document, fired = load_default_rule_set(extra_file='').apply(document)
+        self.assertEqual(fired, ['header-small-caps-for-name'])
+        self.assertEqual(document['design']['header'], {'name_font_size': '30pt'})
+        # Only the paths the rules name are fixed
+        self.assertIn('small_caps_for_name', document['cv']['sections']['experience'][0]['design']['header'])
+
+    def test_wildcards_enum_and_rename(self):
+        rules = RuleSet([
+            FixRule('entry-date', 'cv.sections.*.*.date', 'rename', to='start_date'),
+            FixRule('locale-language', 'locale.language', 'enum', allowed=['en', 'de'], default='en'),
+        ])
+        document = {
+            'cv': {'sections': {'experience': [{'date': '2020'}, {'date': '2021', 'start_date': '2019'}],
+                                'summary': ['text entries are skipped']}},
+            'locale': {'language': 'xx'},
+        }
+        document, fired = rules.apply(document)
+        self.assertEqual(fired, ['entry-date', 'entry-date', 'locale-language'])
+        self.assertEqual(document['cv']['sections']['experience'], [{'start_date': '2020'}, {'start_date': '2019'}])
+        self.assertEqual(document['locale']['language'], 'en')
+
+    def test_rules_are_loaded_from_files(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+            f.write('rules:\n  - id: no-photo\n    path: cv.photo\n    action: remove\n')
+        try:
+            rules = load_default_rule_set(extra_file=f.name)
+            self.assertEqual(rules.rules[-1].id, 'no-photo')
+            self.assertEqual(rules.apply({'cv': {'photo': 'me.jpg'}})[1], ['no-photo'])
+        finally:
+            os.unlink(f.name)
+
+    def test_malformed_rules_are_rejected(self):
+        for options in ({'action': 'explode'}, {'action': 'enum', 'allowed': ['a']}, {'action': 'rename'}):
+            with self.assertRaises(ValueError):
+                FixRule('bad', 'design.x', **options)
+        with self.assertRaises(ValueError):
+            FixRule('bad', 'cv.sections.*', 'remove')
+        with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+            f.write('rules:\n  - id: no-path\n    action: remove\n')
+        try:
+            with self.assertRaises(ValueError):
+                load_rules(f.name)
+        finally:
+            os.unlink(f.name)
+
+    def test_text_repair_follows_rule_paths(self):
+        text = (
+            "cv:\r\n"
+            "  sections:\r\n"
+            "    experience:\r\n"
+            "    - type: 'not-a-title-type'\r\n"
+            "      summary: |\r\n"
+            "        small_caps_for_name: kept inside a block scalar\r\n"
+            "design:\r\n"
+            "  header:\r\n"
+            "    small_caps_for_name:\r\n"
+            "      - dropped with its block\r\n"
+            "    # comments outside the block stay\r\n"
+            "    name_font_size: 30pt\r\n"
+            "  section_titles:\r\n"
+            "    type: invalid-type  # unquoted\r\n"
+            "  broken: 'unclosed\r\n"
+        )
+        fixed, fired = load_default_rule_set(extra_file='').apply_text(text)
+        self.assertEqual(fired, ['header-small-caps-for-name', 'section-titles-type'])
+        self.assertEqual(fixed, text
+                         .replace("    small_caps_for_name:\r\n      - dropped with its block\r\n", "")
+                         .replace("type: invalid-type  # unquoted", 'type: "with-partial-line"'))
+
+    def test_text_repair_inside_list_items(self):
+        rules = RuleSet([
+            FixRule('entry-date', 'cv.sections.*.*.date', 'rename', to='start_date'),
+            FixRule('entry-extra', 'cv.sections.*.*.extra', 'remove'),
+        ])
+        text = ("cv:\n  sections:\n    experience:\n"
+                "      - date: 2020\n        company: A\n"
+                "      - extra: x\n        date: 2021\n"
+                "    notes:\n    - - date: nested lists are not entries\n")
+        fixed, fired = rules.apply_text(text)
+        self.assertEqual(fired, ['entry-date', 'entry-extra', 'entry-date'])
+        self.assertEqual(yaml.safe_load(fixed)['cv']['sections'], {
+            'experience': [{'start_date': 2020, 'company': 'A'}, {'start_date': 2021}],
+            'notes': [[{'date': 'nested lists are not entries'}]],
+        })
+
+    def test_text_repair_drops_indentless_sequences(self):
+        rules = RuleSet([
+            FixRule('nested-bullet', 'design.highlights.nested_bullet', 'remove'),
+            FixRule('entry-extra', 'cv.sections.*.*.extra', 'remove'),
+        ])
+        text = ("cv:\n  sections:\n    experience:\n"
+                "    - extra:  # a comment\n      - a\n      - b\n      company: A\n"
+                "design:\n  highlights:\n    nested_bullet:\n    - '>'\n    -\n      - deeper\n"
+                "    bullet: '*'\n  theme: classic\n")
+        fixed, fired = rules.apply_text(text)
+        expected, expected_fired = rules.apply(yaml.safe_load(text))
+        self.assertEqual(yaml.safe_load(fixed), expected)
+        self.assertEqual(sorted(fired), sorted(expected_fired))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 import yaml
-from yaml_validator_fixer import fix_yaml_validation_errors, fix_yaml_with_regex, apply_fixes
+from yaml_validator_fixer import fix_yaml_validation_errors, fix_yaml_with_regex, apply_fixes, load_yaml_document
 
 class TestYamlValidatorFixer(unittest.TestCase):
     def test_fix_yaml_validation_errors(self):
@@ -55,5 +55,23 @@ design:
         # Check that invalid values are corrected
         self.assertIn('type: "with-partial-line"', fixed_yaml)
 
+    def test_load_yaml_document(self):
+        # Fixes applied to the parsed document match the text round trip
+        yaml_content = """
+cv:
+  name: "John Doe"
+design:
+  header:
+    small_caps_for_name: true
+  section_titles:
+    type: 'invalid-type'
+"""
+        document = apply_fixes(load_yaml_document(yaml_content))
+        self.assertEqual(document, yaml.safe_load(fix_yaml_validation_errors(yaml_content)))
+
+        # Content that is not a YAML mapping is left to the regex fixer
+        self.assertIsNone(load_yaml_document("cv: [unclosed"))
+        self.assertIsNone(load_yaml_document("- just\n- a list"))
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
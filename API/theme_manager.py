@@ -1,10 +1,14 @@
 import os
-import yaml
 from pathlib import Path
 
+import yaml_codec
+
 # Path to theme templates
 THEMES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'themes')
 
+# Themes shipped with the app, which cannot be deleted
+BUILTIN_THEMES = ['classic', 'moderncv', 'sb2nov', 'engineeringclassic']
+
 def get_available_themes():
     """
     Returns a list of available theme names by checking for .yaml files in the themes directory.
@@ -20,8 +24,7 @@ def get_available_themes():
             themes.append(file.stem)
     
     # Always include these built-in themes if not already in the list
-    builtin_themes = ['classic', 'moderncv', 'sb2nov', 'engineeringclassic']
-    for theme in builtin_themes:
+    for theme in BUILTIN_THEMES:
         if theme not in themes and Path(THEMES_DIR, f"{theme}.yaml").exists():
             themes.append(theme)
     
@@ -50,6 +53,18 @@ def get_theme_content(theme_name):
         print(f"Theme file not found: {theme_path}")
         return None
 
+def is_valid_theme_name(theme_name):
+    """
+    Checks that a theme name only contains letters, numbers, and underscores.
+    
+    Args:
+        theme_name (str): Name of the theme
+        
+    Returns:
+        bool: True if the name is valid
+    """
+    return theme_name.replace('_', '').isalnum()
+
 def save_theme(theme_name, yaml_content):
     """
     Saves a theme's YAML content to file.
@@ -66,13 +81,12 @@ def save_theme(theme_name, yaml_content):
         os.makedirs(THEMES_DIR, exist_ok=True)
         
         # Validate YAML before saving
-        yaml.safe_load(yaml_content)
+        content_dict = yaml_codec.load(yaml_content)
         
         # Make sure the theme name is properly reflected in the content
-        content_dict = yaml.safe_load(yaml_content)
         if 'design' in content_dict and 'theme' in content_dict['design']:
             content_dict['design']['theme'] = theme_name
-            yaml_content = yaml.dump(content_dict, default_flow_style=False)
+            yaml_content = yaml_codec.dump(content_dict)
         
         # Save the theme file
         theme_path = os.path.join(THEMES_DIR, f"{theme_name}.yaml")
@@ -84,6 +98,27 @@ def save_theme(theme_name, yaml_content):
         print(f"Error saving theme {theme_name}: {e}")
         return False
 
+def delete_theme(theme_name):
+    """
+    Deletes a theme's YAML file.
+    
+    Args:
+        theme_name (str): Name of the theme
+        
+    Returns:
+        bool: True if deleted, False if the file is missing or is a symlink
+        
+    Raises:
+        OSError: If the file exists but could not be removed
+    """
+    theme_path = os.path.join(THEMES_DIR, f"{theme_name}.yaml")
+    
+    # Check if file exists and is not a symlink (security check)
+    if os.path.exists(theme_path) and not os.path.islink(theme_path):
+        os.remove(theme_path)
+        return True
+    return False
+
 def get_default_theme_content():
     """
     Returns the content of the default theme (classic if available, otherwise fallback to empty template).
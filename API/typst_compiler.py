@@ -0,0 +1,273 @@
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+from typing import List, Optional
+
+from font_bundle import font_bundle
+from font_registry import font_registry
+from render_cancellation import CancelToken, check
+
+logger = logging.getLogger(__name__)
+
+# Which backend compiles Typst to PDF: "cli" (one typst process per render) or
+# "python" (in-process Typst bindings, `pip install typst`)
+TYPST_BACKEND = os.environ.get('TYPST_BACKEND', 'cli').lower()
+
+# Number of in-process compilers kept alive by the python backend. Each one
+# holds its own font book, so this bounds both memory and parallel compiles.
+TYPST_PYTHON_WORKERS = int(os.environ.get('TYPST_PYTHON_WORKERS', str(os.cpu_count() or 1)))
+
+
+class TypstCompileError(Exception):
+    """
+    Raised when Typst fails to turn a source into a PDF.
+    `details` holds the (possibly truncated) Typst diagnostics.
+    """
+
+    def __init__(self, message: str, details: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+
+
+def _truncate(text: str, limit: int = 500) -> str:
+    return (text[:limit] + '...') if len(text) > limit else text
+
+
+def scratch_dir() -> str:
+    """
+    Returns a directory for files that Typst truly needs a path for, such as the
+    project root and session sources. Prefers the in-memory /dev/shm so these
+    never touch disk, falling back to the regular temp directory.
+
+    Returns:
+        str: Path of the scratch directory
+    """
+    global _scratch_dir
+    if _scratch_dir is None:
+        base = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else tempfile.gettempdir()
+        path = os.path.join(base, 'rendercv-scratch')
+        os.makedirs(path, exist_ok=True)
+        _scratch_dir = path
+    return _scratch_dir
+
+
+_scratch_dir = None
+
+
+class CliTypstCompiler:
+    """
+    Compiles by running the typst CLI once per document.
+    The source is piped to stdin and the PDF read from stdout, so no files are
+    written; every run still rediscovers the fonts.
+    """
+
+    name = 'cli'
+
+    def __init__(self, font_paths: List[str], typst_binary: str = 'typst', ignore_system_fonts: bool = False):
+        self.font_paths = list(font_paths)
+        self.ignore_system_fonts = ignore_system_fonts
+        self.typst_binary = typst_binary
+        self._command = [self.typst_binary, "compile", "--diagnostic-format", "human", "--root", scratch_dir()]
+        for font_path in self.font_paths:
+            self._command.extend(["--font-path", font_path])
+        if ignore_system_fonts:
+            self._command.append("--ignore-system-fonts")
+        # Read the source from stdin and write the PDF to stdout
+        self._command.extend(["-", "-"])
+
+    def compile(self, typst_content: str, cancel_token: Optional[CancelToken] = None) -> bytes:
+        """
+        Compiles Typst source to PDF.
+
+        Args:
+            typst_content: Typst source
+            cancel_token: Kills the typst process when cancelled
+
+        Returns:
+            bytes: The compiled PDF
+
+        Raises:
+            TypstCompileError: If compilation fails or produces no PDF
+            RenderCancelled: If the token was cancelled
+            FileNotFoundError: If the typst binary is not installed
+        """
+        check(cancel_token)
+        logger.info("Compiling Typst source from stdin using typst CLI...")
+        process = subprocess.Popen(
+            self._command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        unregister = cancel_token.on_cancel(process.kill) if cancel_token is not None else None
+        try:
+            stdout, stderr = process.communicate(typst_content.encode('utf-8'))
+        finally:
+            if unregister is not None:
+                unregister()
+        check(cancel_token)
+        stderr = stderr.decode('utf-8', errors='replace')
+
+        # Always log stderr, even on success, for potential warnings
+        if stderr:
+            logger.warning(f"Typst stderr (Return Code {process.returncode}):\n{stderr}")
+
+        if process.returncode != 0:
+            raise TypstCompileError("Typst compilation failed.", _truncate(stderr or "Unknown Typst error"))
+        if not stdout:
+            raise TypstCompileError("PDF generation failed after compilation (output is empty).")
+        return stdout
+
+
+def new_python_compiler(typst_module, root: str, font_paths: List[str], ignore_system_fonts: bool = False):
+    """
+    Creates a `typst.Compiler`, passing `ignore_system_fonts` only when it is set
+    so older bindings without that option keep working.
+    """
+    if ignore_system_fonts:
+        return typst_module.Compiler(root=root, font_paths=font_paths, ignore_system_fonts=True)
+    return typst_module.Compiler(root=root, font_paths=font_paths)
+
+
+class PythonTypstCompiler:
+    """
+    Compiles in-process with the Typst Python bindings.
+
+    Each `typst.Compiler` keeps a long-lived world whose font book is loaded once,
+    and the source is passed as bytes, so no process is spawned and no files are
+    written. Compilers are not safe to share between threads, so a small pool of
+    them is kept and each compile checks one out.
+    """
+
+    name = 'python'
+
+    def __init__(self, font_paths: List[str], workers: int = TYPST_PYTHON_WORKERS,
+                 ignore_system_fonts: bool = False):
+        import typst  # Raises ImportError when the bindings are not installed
+
+        self._typst = typst
+        self.font_paths = list(font_paths)
+        self.ignore_system_fonts = ignore_system_fonts
+        self.workers = max(1, workers)
+        self._idle: 'queue.LifoQueue' = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+        # Build the first world eagerly so font loading happens at startup
+        self._created = 1
+        self._idle.put(self._new_compiler())
+
+    def _new_compiler(self):
+        return new_python_compiler(self._typst, scratch_dir(), self.font_paths, self.ignore_system_fonts)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.workers
+            if can_create:
+                self._created += 1
+        if can_create:
+            return self._new_compiler()
+        return self._idle.get()
+
+    def compile(self, typst_content: str, cancel_token: Optional[CancelToken] = None) -> bytes:
+        """
+        Compiles Typst source to PDF. An in-process compile cannot be
+        interrupted, so cancellation is only honoured before and after it.
+
+        Args:
+            typst_content: Typst source
+            cancel_token: Abandons the compile when cancelled
+
+        Returns:
+            bytes: The compiled PDF
+
+        Raises:
+            TypstCompileError: If compilation fails or produces no PDF
+            RenderCancelled: If the token was cancelled
+        """
+        check(cancel_token)
+        compiler = self._checkout()
+        try:
+            pdf_data = compiler.compile(input=typst_content.encode('utf-8'), format="pdf")
+        except Exception as e:
+            raise TypstCompileError("Typst compilation failed.", _truncate(str(e)))
+        finally:
+            self._idle.put(compiler)
+        check(cancel_token)
+
+        if not pdf_data:
+            raise TypstCompileError("PDF generation failed after compilation (file is empty).")
+        return pdf_data
+
+
+def create_compiler(backend: str = TYPST_BACKEND, font_paths: Optional[List[str]] = None,
+                    ignore_system_fonts: bool = False):
+    """
+    Creates a compiler for the requested backend, falling back to the CLI when
+    the python backend cannot be loaded.
+
+    Args:
+        backend: "cli" or "python"
+        font_paths: Font directories, defaults to the font registry's
+        ignore_system_fonts: Search only `font_paths`, not the system fonts
+
+    Returns:
+        CliTypstCompiler or PythonTypstCompiler
+    """
+    if font_paths is None:
+        font_paths = font_registry.get().font_paths
+
+    if backend == 'python':
+        try:
+            return PythonTypstCompiler(font_paths, ignore_system_fonts=ignore_system_fonts)
+        except ImportError:
+            logger.warning("Typst Python bindings are not installed, falling back to the typst CLI.")
+    elif backend != 'cli':
+        logger.warning(f"Unknown TYPST_BACKEND '{backend}', using the typst CLI.")
+
+    return CliTypstCompiler(font_paths, ignore_system_fonts=ignore_system_fonts)
+
+
+_compilers = {}
+_compiler_lock = threading.Lock()
+
+
+def get_compiler(typst_content: Optional[str] = None):
+    """
+    Returns the process-wide compiler selected by TYPST_BACKEND, creating it on
+    first use and again whenever the font registry reports changed fonts.
+
+    Compiles normally see only the consolidated font bundle, without the system
+    fonts, which keeps Typst's font discovery short. A source quoting a font
+    family that is not in the bundle gets the compiler searching every font
+    directory and the system fonts instead.
+
+    Args:
+        typst_content: Source about to be compiled, if known
+
+    Returns:
+        CliTypstCompiler or PythonTypstCompiler
+    """
+    fonts = font_registry.get()
+    bundle = font_bundle.get(fonts)
+    if bundle is not None and (typst_content is None or bundle.covers(typst_content)):
+        key, font_paths, ignore_system_fonts = 'bundle', [bundle.path], True
+    else:
+        key, font_paths, ignore_system_fonts = 'all', fonts.font_paths, False
+
+    entry = _compilers.get(key)
+    if entry is None or entry[0] != fonts.version:
+        with _compiler_lock:
+            entry = _compilers.get(key)
+            if entry is None or entry[0] != fonts.version:
+                compiler = create_compiler(font_paths=font_paths, ignore_system_fonts=ignore_system_fonts)
+                logger.info(f"Using Typst backend: {compiler.name} (fonts: {', '.join(font_paths)})")
+                entry = _compilers[key] = (fonts.version, compiler)
+    return entry[1]
@@ -0,0 +1,402 @@
+import atexit
+import contextlib
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import render_metrics
+import typst_compiler
+from typst_compiler import TypstCompileError
+from render_cancellation import CancelToken, RenderCancelled, check
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of live editing sessions; 0 disables session pinning
+TYPST_MAX_SESSIONS = int(os.environ.get('TYPST_MAX_SESSIONS', '32'))
+
+# Seconds of inactivity after which a session's compiler is shut down
+TYPST_SESSION_IDLE_TIMEOUT = float(os.environ.get('TYPST_SESSION_IDLE_TIMEOUT', '300'))
+
+# Seconds to wait for a pinned compiler before giving up on it
+TYPST_SESSION_COMPILE_TIMEOUT = float(os.environ.get('TYPST_SESSION_COMPILE_TIMEOUT', '30'))
+
+MAIN_FILE = 'main.typ'
+OUTPUT_FILE = 'main.pdf'
+
+
+class SessionCompilerFailed(Exception):
+    """
+    Raised when a pinned compiler is unusable (crashed, timed out), as opposed to
+    the document failing to compile. The caller should discard the session.
+    """
+
+
+class WatchSessionCompiler:
+    """
+    Keeps a `typst watch` process running for one editing session.
+
+    Each compile replaces the session's source file and waits for typst to
+    report the recompilation. Because the process stays alive, Typst's memoized
+    parsing and layout results from the previous revision are reused.
+
+    The source is replaced atomically, so the watcher never compiles a
+    half-written revision, and the output is only read back if it was written
+    after the revision was: a watcher that stopped following the file is
+    treated as failed rather than answering with an older PDF.
+    """
+
+    def __init__(self, font_paths: List[str], typst_binary: str = 'typst',
+                 timeout: float = TYPST_SESSION_COMPILE_TIMEOUT, ignore_system_fonts: bool = False):
+        self.font_paths = list(font_paths)
+        self.ignore_system_fonts = ignore_system_fonts
+        self.typst_binary = typst_binary
+        self.timeout = timeout
+        self.workdir = Path(tempfile.mkdtemp(prefix='session-', dir=typst_compiler.scratch_dir()))
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self._pending = False
+
+    def _start(self) -> None:
+        command = [self.typst_binary, "watch", "--diagnostic-format", "human"]
+        for font_path in self.font_paths:
+            command.extend(["--font-path", font_path])
+        if self.ignore_system_fonts:
+            command.append("--ignore-system-fonts")
+        command.extend([MAIN_FILE, OUTPUT_FILE])
+
+        self._process = subprocess.Popen(
+            command,
+            cwd=self.workdir,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        threading.Thread(target=self._read_status, args=(self._process.stderr,), daemon=True).start()
+
+    def _read_status(self, stream) -> None:
+        for line in stream:
+            self._lines.put(line.rstrip('\n'))
+        # End of stream: the watcher exited
+        self._lines.put(None)
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                self._lines.get_nowait()
+            except queue.Empty:
+                return
+
+    def _wait_for_status(self, cancel_token: Optional[CancelToken]) -> str:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if cancel_token is not None and cancel_token.cancelled:
+                # typst keeps compiling this revision; its status line must be
+                # consumed before the next revision is written
+                self._pending = True
+                raise RenderCancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SessionCompilerFailed("typst watch did not report a compilation in time")
+            try:
+                line = self._lines.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                continue
+            if line is None:
+                raise SessionCompilerFailed("typst watch exited")
+            if 'compiled with errors' in line:
+                return 'error'
+            if 'compiled successfully' in line or 'compiled with warnings' in line:
+                return 'ok'
+
+    def compile(self, typst_content: str, cancel_token: Optional[CancelToken] = None) -> bytes:
+        """
+        Compiles a new revision of the session's document.
+
+        Raises:
+            TypstCompileError: If the document has errors
+            RenderCancelled: If the token was cancelled while waiting
+            SessionCompilerFailed: If the watcher died or did not answer in time
+        """
+        if self._pending:
+            # Let the abandoned revision finish so its status is not taken for ours
+            self._pending = False
+            if self._wait_for_status(None) == 'error':
+                self._collect_diagnostics()
+        check(cancel_token)
+
+        self._drain()
+        written_ns = self._write_source(typst_content)
+        if self._process is None:
+            self._start()
+
+        if self._wait_for_status(cancel_token) == 'error':
+            raise TypstCompileError("Typst compilation failed.", self._collect_diagnostics())
+
+        output_path = self.workdir / OUTPUT_FILE
+        try:
+            output_ns = output_path.stat().st_mtime_ns
+        except OSError:
+            output_ns = -1
+        if output_ns < written_ns:
+            raise SessionCompilerFailed("typst watch reported a compilation older than this revision")
+
+        with render_metrics.stage('readback'):
+            pdf_data = output_path.read_bytes()
+        if not pdf_data:
+            raise TypstCompileError("PDF generation failed after compilation (file is empty).")
+        return pdf_data
+
+    def _write_source(self, typst_content: str) -> int:
+        """Replaces the source file in one step and returns its modification time (ns)."""
+        # Staged next to the session directory, where typst is not watching
+        fd, staged = tempfile.mkstemp(prefix='revision-', suffix='.typ', dir=self.workdir.parent)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(typst_content)
+            os.replace(staged, self.workdir / MAIN_FILE)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(staged)
+            raise
+        return (self.workdir / MAIN_FILE).stat().st_mtime_ns
+
+    def _collect_diagnostics(self) -> str:
+        # Diagnostics follow the status line; stop once typst goes quiet
+        lines = []
+        while True:
+            try:
+                line = self._lines.get(timeout=0.05)
+            except queue.Empty:
+                break
+            if line is None:
+                break
+            lines.append(line)
+        detail = '\n'.join(lines).strip() or "Unknown Typst error"
+        return (detail[:500] + '...') if len(detail) > 500 else detail
+
+    def close(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class PythonSessionCompiler:
+    """
+    Pins one Typst Python bindings world to an editing session.
+
+    The source lives in a fixed file inside the session directory, so each
+    revision replaces the same source in the world and Typst can reparse and
+    re-layout incrementally instead of starting from an empty world.
+    """
+
+    def __init__(self, font_paths: List[str], ignore_system_fonts: bool = False):
+        import typst
+
+        self.workdir = Path(tempfile.mkdtemp(prefix='session-', dir=typst_compiler.scratch_dir()))
+        self._compiler = typst_compiler.new_python_compiler(
+            typst, str(self.workdir), list(font_paths), ignore_system_fonts
+        )
+
+    def compile(self, typst_content: str, cancel_token: Optional[CancelToken] = None) -> bytes:
+        check(cancel_token)
+        main_path = self.workdir / MAIN_FILE
+        main_path.write_text(typst_content, encoding='utf-8')
+        try:
+            pdf_data = self._compiler.compile(input=str(main_path), format="pdf")
+        except Exception as e:
+            detail = str(e)
+            raise TypstCompileError("Typst compilation failed.", (detail[:500] + '...') if len(detail) > 500 else detail)
+        if not pdf_data:
+            raise TypstCompileError("PDF generation failed after compilation (file is empty).")
+        check(cancel_token)
+        return pdf_data
+
+    def close(self) -> None:
+        self._compiler = None
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def default_session_factory():
+    """
+    Creates a pinned compiler matching the configured TYPST_BACKEND.
+    """
+    compiler = typst_compiler.get_compiler()
+    if compiler.name == 'python':
+        return PythonSessionCompiler(compiler.font_paths, ignore_system_fonts=compiler.ignore_system_fonts)
+    return WatchSessionCompiler(compiler.font_paths, ignore_system_fonts=compiler.ignore_system_fonts)
+
+
+class _Session:
+    def __init__(self, compiler):
+        self.compiler = compiler
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class SessionPool:
+    """
+    Maps editing session ids to pinned compilers.
+
+    At most `max_sessions` compilers are alive; opening another one shuts down
+    the least recently used session. Sessions idle for longer than
+    `idle_timeout` seconds are closed by a background reaper.
+    """
+
+    def __init__(self, factory: Callable = default_session_factory,
+                 max_sessions: int = TYPST_MAX_SESSIONS,
+                 idle_timeout: float = TYPST_SESSION_IDLE_TIMEOUT):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: 'OrderedDict[str, _Session]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_sessions > 0
+
+    def _acquire(self, session_id: str) -> _Session:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_used = time.monotonic()
+                return session
+
+        # Starting a compiler can take a while; other sessions keep compiling
+        created = _Session(self.factory())
+        evicted = []
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = created
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    _, old = self._sessions.popitem(last=False)
+                    evicted.append(old)
+            else:
+                # Another request for this session created one first
+                evicted.append(created)
+            self._sessions.move_to_end(session_id)
+            session.last_used = time.monotonic()
+            self._ensure_reaper()
+
+        for old in evicted:
+            self._close(old)
+        return session
+
+    def _discard(self, session_id: str, session: _Session) -> None:
+        with self._lock:
+            if self._sessions.get(session_id) is session:
+                del self._sessions[session_id]
+        self._close(session)
+
+    @staticmethod
+    def _close(session: _Session) -> None:
+        # Wait for an in-flight compile before tearing the compiler down
+        with session.lock:
+            try:
+                session.compiler.close()
+            except Exception as e:
+                logger.warning(f"Error closing session compiler: {e}")
+
+    def compile(self, session_id: str, typst_content: str, fallback: Callable[..., bytes],
+                cancel_token: Optional[CancelToken] = None) -> bytes:
+        """
+        Compiles a revision with the session's pinned compiler.
+
+        If the pinned compiler cannot be created or fails for reasons other than
+        the document itself, the session is discarded and `fallback` compiles
+        the source one-shot instead.
+
+        Args:
+            session_id: Identifier sent by the editor
+            typst_content: Typst source of the new revision
+            fallback: One-shot compile function
+            cancel_token: Abandons the compile when cancelled
+
+        Returns:
+            bytes: The compiled PDF
+
+        Raises:
+            TypstCompileError: If the document does not compile
+            RenderCancelled: If the token was cancelled
+        """
+        try:
+            session = self._acquire(session_id)
+        except Exception as e:
+            logger.warning(f"Could not start a pinned compiler for session {session_id}: {e}")
+            return fallback(typst_content, cancel_token=cancel_token)
+
+        with session.lock:
+            try:
+                pdf_data = session.compiler.compile(typst_content, cancel_token=cancel_token)
+                session.last_used = time.monotonic()
+                return pdf_data
+            except (TypstCompileError, RenderCancelled):
+                raise
+            except Exception as e:
+                logger.warning(f"Pinned compiler for session {session_id} failed, compiling one-shot: {e}")
+
+        self._discard(session_id, session)
+        return fallback(typst_content, cancel_token=cancel_token)
+
+    def reap_idle(self) -> int:
+        """
+        Closes sessions idle for longer than the idle timeout.
+
+        Returns:
+            int: Number of sessions closed
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [(sid, s) for sid, s in self._sessions.items() if s.last_used < cutoff]
+            for sid, _ in idle:
+                del self._sessions[sid]
+        for _, session in idle:
+            self._close(session)
+        return len(idle)
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper = threading.Thread(target=self._reap_forever, daemon=True)
+            self._reaper.start()
+
+    def _reap_forever(self) -> None:
+        interval = max(1.0, min(self.idle_timeout / 2, 60.0))
+        while True:
+            time.sleep(interval)
+            self.reap_idle()
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._close(session)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'max_sessions': self.max_sessions,
+                'idle_timeout': self.idle_timeout,
+            }
+
+
+session_pool = SessionPool()
+atexit.register(session_pool.close_all)
@@ -0,0 +1,255 @@
+"""
+Targeted repair of CVs that RenderCV rejected.
+
+RenderCV reports each validation error with the `loc` path of the offending
+field. `repair_document` removes exactly those fields from the parsed
+document, or resets them to the default of a matching `enum` fix rule, so
+RenderCV falls back to its own defaults and the next validation passes.
+Only sections where a default is a sensible stand-in are repaired; errors in
+the CV's own content are reported to the user.
+
+Repairs are remembered by the document's design, field path and offending
+value. When the same value turns up at the same path of a document with the
+same design again, typically on the next keystroke of a live editing session,
+`apply_known_repairs` fixes it before RenderCV sees the document, saving the
+failed validation. Whether a value is valid can depend on the theme and the
+rest of the design, so documents with another design never take a repair.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import rendercv_models
+from yaml_fix_rules import rule_set
+
+# Validations retried after repairing, per render
+MAX_REPAIR_ATTEMPTS = int(os.environ.get('VALIDATION_REPAIR_ATTEMPTS', '2'))
+# Remembered repairs (field path and value)
+REPAIR_MEMO_SIZE = int(os.environ.get('VALIDATION_REPAIR_MEMO_SIZE', '256'))
+# Top-level sections whose fields may be removed or reset
+REPAIRABLE_SECTIONS = tuple(
+    s.strip() for s in os.environ.get('VALIDATION_REPAIR_SECTIONS', 'design,locale,rendercv_settings').split(',')
+    if s.strip()
+)
+
+# Values longer than this are not remembered
+_MAX_FINGERPRINT_CHARS = 1024
+
+_REMOVE = ('remove',)
+
+
+class Repair:
+    """
+    One field fixed after a validation error.
+
+    Attributes:
+        path (tuple): Keys and list indices from the document root to the field
+        action (tuple): ('remove',) or ('default', value)
+        source (str): "error" if found from a validation error, "memo" if
+            remembered from an earlier one
+    """
+
+    __slots__ = ('path', 'action', 'source')
+
+    def __init__(self, path, action, source):
+        self.path = path
+        self.action = action
+        self.source = source
+
+    def __repr__(self):
+        return f"Repair({'.'.join(map(str, self.path))}, {self.action[0]}, {self.source})"
+
+
+def _fingerprint(value: Any) -> Optional[str]:
+    text = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return text if len(text) <= _MAX_FINGERPRINT_CHARS else None
+
+
+def _lookup(document: Any, path: Sequence[Any]) -> Tuple[Optional[dict], Any]:
+    """Returns the mapping holding the field at `path` and the field's key, or (None, None)."""
+    container = document
+    for key in path[:-1]:
+        if isinstance(container, dict) and key in container:
+            container = container[key]
+        elif isinstance(container, list) and isinstance(key, int) and key < len(container):
+            container = container[key]
+        else:
+            return None, None
+    if isinstance(container, dict) and path and path[-1] in container:
+        return container, path[-1]
+    return None, None
+
+
+def resolve_location(document: Any, loc: Sequence[Any]) -> Optional[Tuple[Any, ...]]:
+    """
+    Maps an error location onto the document.
+
+    Pydantic inserts model and union member names into locations; segments
+    that are not keys or indices of the document are skipped. The last
+    segment must name an existing field of a mapping.
+
+    Args:
+        document: The parsed document
+        loc: Location from a RenderCV error, with list indices as strings
+
+    Returns:
+        tuple: The field's path, or None if the location does not name a field
+    """
+    path: List[Any] = []
+    container = document
+    resolved_last = False
+    for segment in loc:
+        segment = str(segment)
+        resolved_last = True
+        if isinstance(container, dict) and segment in container:
+            path.append(segment)
+        elif isinstance(container, list) and segment.isdigit() and int(segment) < len(container):
+            path.append(int(segment))
+        else:
+            resolved_last = False
+            continue
+        container = container[path[-1]]
+    if not resolved_last or not path or not isinstance(path[-1], str):
+        return None
+    return tuple(path)
+
+
+def _plan(document: Dict[str, Any], path: Tuple[Any, ...]) -> Optional[tuple]:
+    if len(path) < 2 or path[0] not in REPAIRABLE_SECTIONS:
+        return None
+    for rule in rule_set.rules_for(path):
+        if rule.action == 'enum':
+            mapping, key = _lookup(document, path)
+            if mapping[key] != rule.options['default']:
+                return ('default', rule.options['default'])
+    return _REMOVE
+
+
+def _apply(document: Dict[str, Any], path: Tuple[Any, ...], action: tuple) -> bool:
+    mapping, key = _lookup(document, path)
+    if mapping is None:
+        return False
+    if action[0] == 'default':
+        mapping[key] = action[1]
+    else:
+        del mapping[key]
+    return True
+
+
+def design_scope(document: Dict[str, Any]) -> Optional[str]:
+    """Returns the key remembered repairs of a document are scoped by: its design's hash."""
+    return rendercv_models.design_key(document.get('design'))
+
+
+class RepairMemo:
+    """
+    Thread-safe LRU of repairs keyed by design, field path and offending value.
+
+    Args:
+        max_entries: Number of repairs remembered
+    """
+
+    def __init__(self, max_entries: int = REPAIR_MEMO_SIZE):
+        self.max_entries = max_entries
+        # (design key, path, value fingerprint) -> action
+        self._entries: 'OrderedDict[Tuple[Optional[str], Tuple[Any, ...], str], tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def remember(self, scope: Optional[str], path: Tuple[Any, ...], value: Any, action: tuple) -> None:
+        """
+        Remembers a repair.
+
+        Args:
+            scope: `design_key` of the repaired document's design, before any repair
+            path: The repaired field
+            value: The field's offending value
+            action: The repair made
+        """
+        fingerprint = _fingerprint(value)
+        if fingerprint is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[(scope, path, fingerprint)] = action
+            self._entries.move_to_end((scope, path, fingerprint))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def apply(self, document: Dict[str, Any]) -> List[Repair]:
+        """
+        Applies the repairs remembered for the document's design whose path holds
+        the remembered value in `document`.
+        """
+        scope = design_scope(document)
+        with self._lock:
+            entries = [(key, action) for key, action in self._entries.items() if key[0] == scope]
+        repairs = []
+        for (_, path, fingerprint), action in entries:
+            mapping, key = _lookup(document, path)
+            if mapping is None or _fingerprint(mapping[key]) != fingerprint:
+                continue
+            _apply(document, path, action)
+            repairs.append(Repair(path, action, 'memo'))
+            with self._lock:
+                if (scope, path, fingerprint) in self._entries:
+                    self._entries.move_to_end((scope, path, fingerprint))
+        return repairs
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+memo = RepairMemo()
+
+
+def repair_document(document: Dict[str, Any], errors: List[Dict[str, Any]]) -> Tuple[List[Repair], List[Dict[str, Any]]]:
+    """
+    Repairs the fields RenderCV reported, in place.
+
+    Args:
+        document: The parsed document RenderCV rejected
+        errors: RenderCV's error list, each with a `loc` and a `msg`
+
+    Returns:
+        tuple: (the repairs made, the errors that could not be repaired)
+    """
+    # Plan every repair before changing anything, so locations resolve
+    # against the document RenderCV saw
+    scope = design_scope(document)
+    planned: Dict[Tuple[Any, ...], tuple] = {}
+    unrepaired: List[Dict[str, Any]] = []
+    for error in errors:
+        path = resolve_location(document, error.get('loc') or ())
+        action = _plan(document, path) if path is not None else None
+        if action is None:
+            unrepaired.append(error)
+        else:
+            planned.setdefault(path, action)
+
+    repairs: List[Repair] = []
+    for path, action in planned.items():
+        mapping, key = _lookup(document, path)
+        if mapping is None:
+            # Inside a field removed by an earlier repair
+            continue
+        memo.remember(scope, path, mapping[key], action)
+        _apply(document, path, action)
+        repairs.append(Repair(path, action, 'error'))
+    return repairs, unrepaired
+
+
+def apply_known_repairs(document: Dict[str, Any]) -> List[Repair]:
+    """
+    Applies remembered repairs to a document before validation, in place.
+
+    Returns:
+        list: The repairs made
+    """
+    return memo.apply(document)
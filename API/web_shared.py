@@ -0,0 +1,710 @@
+"""
+Pieces shared by the Flask (app.py) and ASGI (asgi_app.py) apps: the sample CV
+used for theme previews, the editor page, and building /validate responses.
+"""
+
+import render_metrics
+
+# --- LARGE YAML SAMPLE --- (Corrected version from previous steps)
+# Replace the placeholder in HTML_TEMPLATE with this
+DEFAULT_YAML_CONTENT = """
+cv:
+  name: "John Doe"
+  location: "Location"
+  email: "john.doe@example.com"
+  phone: "+1-609-999-9995"
+  website:
+  social_networks:
+    - network: "LinkedIn"
+      username: "john.doe"
+    - network: "GitHub"
+      username: "john.doe"
+  sections:
+    welcome_to_RenderCV!:
+      - "[RenderCV](https://rendercv.com) is a Typst-based CV framework designed for academics and engineers, with Markdown syntax support."
+      - "Each section title is arbitrary. Each section contains a list of entries, and there are 7 different entry types to choose from."
+    education:
+      - institution: "Stanford University"
+        area: "Computer Science"
+        degree: "PhD"
+        date:
+        start_date: "2023-09"
+        end_date: "present"
+        location: "Stanford, CA, USA"
+        summary:
+        highlights:
+          - "Working on the optimization of autonomous vehicles in urban environments"
+      - institution: "Boğaziçi University"
+        area: "Computer Engineering"
+        degree: "BS"
+        date:
+        start_date: "2018-09"
+        end_date: "2022-06"
+        location: "Istanbul, Türkiye"
+        summary:
+        highlights:
+          - "GPA: 3.9/4.0, ranked 1st out of 100 students"
+          - "Awards: Best Senior Project, High Honor"
+    experience:
+      - company: "Company C"
+        position: "Summer Intern"
+        date:
+        start_date: "2024-06"
+        end_date: "2024-09"
+        location: "Livingston, LA, USA"
+        summary:
+        highlights:
+          - "Developed deep learning models for the detection of gravitational waves in LIGO data"
+          - "Published [3 peer-reviewed research papers](https://example.com) about the project and results"
+      - company: "Company B"
+        position: "Summer Intern"
+        date:
+        start_date: "2023-06"
+        end_date: "2023-09"
+        location: "Ankara, Türkiye"
+        summary:
+        highlights:
+          - "Optimized the production line by 15% by implementing a new scheduling algorithm"
+      - company: "Company A"
+        position: "Summer Intern"
+        date:
+        start_date: "2022-06"
+        end_date: "2022-09"
+        location: "Istanbul, Türkiye"
+        summary:
+        highlights:
+          - "Designed an inventory management web application for a warehouse"
+    projects:
+      - name: "[Example Project](https://example.com)"
+        date:
+        start_date: "2024-05"
+        end_date: "present"
+        location:
+        summary: "A web application for writing essays"
+        highlights:
+          - "Launched an [iOS app](https://example.com) in 09/2024 that currently has 10k+ monthly active users"
+          - "The app is made open-source (3,000+ stars [on GitHub](https://github.com))"
+      - name: "[Teaching on Udemy](https://example.com)"
+        date: "Fall 2023"
+        start_date:
+        end_date:
+        location:
+        summary:
+        highlights:
+          - 'Instructed the "Statics" course on Udemy (60,000+ students, 200,000+ hours watched)'
+    skills:
+      - label: "Programming"
+        details: "Proficient with Python, C++, and Git; good understanding of Web, app development, and DevOps"
+      - label: "Mathematics"
+        details: "Good understanding of differential equations, calculus, and linear algebra"
+      - label: "Languages"
+        details: "English (fluent, TOEFL: 118/120), Turkish (native)"
+    publications:
+      - title: "3D Finite Element Analysis of No-Insulation Coils"
+        authors:
+          - "Frodo Baggins"
+          - "***John Doe***"
+          - "Samwise Gamgee"
+        doi: "10.1109/TASC.2023.3340648"
+        url:
+        journal:
+        date: "2004-01"
+    extracurricular_activities:
+      - bullet: "There are 7 unique entry types in RenderCV: *BulletEntry*, *TextEntry*, *EducationEntry*, *ExperienceEntry*, *NormalEntry*, *PublicationEntry*, and *OneLineEntry*."
+      - bullet: "Each entry type has a different structure and layout. This document demonstrates all of them."
+    numbered_entries:
+      - number: "This is a numbered entry."
+      - number: "This is another numbered entry."
+      - number: "This is the third numbered entry."
+    reversed_numbered_entries:
+      - reversed_number: "This is a reversed numbered entry."
+      - reversed_number: "This is another reversed numbered entry."
+      - reversed_number: "This is the third reversed numbered entry."
+design:
+  theme: "moderncv" # Using the theme specified in the YAML
+  page:
+    size: "us-letter"
+    top_margin: "2cm"
+    bottom_margin: "2cm"
+    left_margin: "2cm"
+    right_margin: "2cm"
+    show_page_numbering: true
+    show_last_updated_date: true
+  colors:
+    text: "rgb(0, 0, 0)"
+    name: "rgb(0, 79, 144)"
+    connections: "rgb(0, 79, 144)"
+    section_titles: "rgb(0, 79, 144)"
+    links: "rgb(0, 79, 144)"
+    last_updated_date_and_page_numbering: "rgb(128, 128, 128)"
+  text:
+    font_family: "Source Sans 3"
+    font_size: "10pt"
+    leading: "0.6em"
+    alignment: "justified"
+    date_and_location_column_alignment: "right"
+  links:
+    underline: false
+    use_external_link_icon: true
+  header:
+    name_font_family: "Source Sans 3"
+    name_font_size: "30pt"
+    name_bold: true
+    photo_width: "3.5cm"
+    vertical_space_between_name_and_connections: "0.7cm"
+    vertical_space_between_connections_and_first_section: "0.7cm"
+    horizontal_space_between_connections: "0.5cm"
+    connections_font_family: "Source Sans 3"
+    separator_between_connections: ""
+    use_icons_for_connections: true
+    alignment: "center"
+  section_titles:
+    type: "moderncv"
+    font_family: "Source Sans 3"
+    font_size: "1.4em"
+    bold: true
+    small_caps: false
+    line_thickness: "0.5pt"
+    vertical_space_above: "0.5cm"
+    vertical_space_below: "0.3cm"
+  entries:
+    date_and_location_width: "4.15cm"
+    left_and_right_margin: "0.2cm"
+    horizontal_space_between_columns: "0.1cm"
+    vertical_space_between_entries: "1.2em"
+    allow_page_break_in_sections: true
+    allow_page_break_in_entries: true
+    short_second_row: false
+    show_time_spans_in: []
+  highlights:
+    bullet: "•"
+    top_margin: "0.25cm"
+    left_margin: "0.4cm"
+    vertical_space_between_highlights: "0.25cm"
+    horizontal_space_between_bullet_and_highlight: "0.5em"
+    summary_left_margin: "0cm"
+  entry_types:
+    one_line_entry:
+      template: "**LABEL:** DETAILS"
+    education_entry:
+      main_column_first_row_template: "**INSTITUTION**, AREA"
+      degree_column_template: "**DEGREE**"
+      degree_column_width: "1cm"
+      main_column_second_row_template: |-
+        SUMMARY
+        HIGHLIGHTS
+      date_and_location_column_template: |-
+        LOCATION
+        DATE
+    normal_entry:
+      main_column_first_row_template: "**NAME**"
+      main_column_second_row_template: |-
+        SUMMARY
+        HIGHLIGHTS
+      date_and_location_column_template: |-
+        LOCATION
+        DATE
+    experience_entry:
+      main_column_first_row_template: "**COMPANY**, POSITION"
+      main_column_second_row_template: |-
+        SUMMARY
+        HIGHLIGHTS
+      date_and_location_column_template: |-
+        LOCATION
+        DATE
+    publication_entry:
+      main_column_first_row_template: "**TITLE**"
+      main_column_second_row_template: |-
+        AUTHORS
+        URL (JOURNAL)
+      main_column_second_row_without_journal_template: |-
+        AUTHORS
+        URL
+      main_column_second_row_without_url_template: |-
+        AUTHORS
+        JOURNAL
+      date_and_location_column_template: "DATE"
+locale:
+  language: "en"
+  phone_number_format: "national"
+  page_numbering_template: "NAME - Page PAGE_NUMBER of TOTAL_PAGES"
+  last_updated_date_template: "Last updated in TODAY"
+  date_template: "MONTH_ABBREVIATION YEAR"
+  month: "month"
+  months: "months"
+  year: "year"
+  years: "years"
+  present: "present"
+  to: "–"
+  abbreviations_for_months:
+    - "Jan"
+    - "Feb"
+    - "Mar"
+    - "Apr"
+    - "May"
+    - "June"
+    - "July"
+    - "Aug"
+    - "Sept"
+    - "Oct"
+    - "Nov"
+    - "Dec"
+  full_names_of_months:
+    - "January"
+    - "February"
+    - "March"
+    - "April"
+    - "May"
+    - "June"
+    - "July"
+    - "August"
+    - "September"
+    - "October"
+    - "November"
+    - "December"
+rendercv_settings:
+  date: "2025-03-01"
+  bold_keywords: []
+"""
+
+# --- Template for the Frontend ---
+# Modified to include theme selector dropdown
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>RenderCV Live Editor</title>
+    <!-- CodeMirror CSS -->
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.15/codemirror.min.css">
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.15/theme/material-darker.min.css">
+    <!-- Basic Styling -->
+    <style>
+        /* ... Keep existing styles ... */
+        #pdf-preview { width: 100%; height: 100%; border: none; } /* Style for object */
+        #download-link-container { padding: 5px; text-align: center; border-top: 1px solid #eee; }
+        #pdf-download-link { display: none; /* Show only when URL is ready */ }
+        
+        /* Status styles */
+        #status.success { color: green; }
+        #status.error { color: red; }
+        #status.loading { color: blue; }
+        #status.waiting { color: gray; }
+        #status.warning { color: orange; } /* New warning class */
+        
+        /* Theme selector styles */
+        #theme-selector-container {
+            margin-bottom: 10px;
+            padding: 10px;
+            background-color: #f5f5f5;
+            border-radius: 5px;
+        }
+        #theme-selector {
+            padding: 5px;
+            margin-right: 10px;
+        }
+        #save-theme-container {
+            margin-top: 10px;
+        }
+        #save-theme-name {
+            padding: 5px;
+            margin-right: 10px;
+        }
+        .button {
+            padding: 5px 10px;
+            background-color: #4CAF50;
+            color: white;
+            border: none;
+            border-radius: 3px;
+            cursor: pointer;
+        }
+        .button:hover {
+            background-color: #45a049;
+        }
+    </style>
+</head>
+<body>
+    <div id="editor-container">
+        <h3>YAML Editor</h3>
+        <!-- Theme selector -->
+        <div id="theme-selector-container">
+            <label for="theme-selector">Select Theme:</label>
+            <select id="theme-selector">
+                {% for theme in themes %}
+                <option value="{{ theme }}">{{ theme }}</option>
+                {% endfor %}
+            </select>
+            <button class="button" id="load-theme-btn">Load Theme</button>
+            
+            <div id="save-theme-container">
+                <input type="text" id="save-theme-name" placeholder="New theme name">
+                <button class="button" id="save-theme-btn">Save As New Theme</button>
+            </div>
+        </div>
+        
+        <div class="codemirror-wrapper">
+            <textarea id="yaml-editor">{{ default_yaml }}</textarea>
+        </div>
+        <div id="status">Status: Initialized. Edit YAML to update preview.</div>
+    </div>
+
+    <div id="preview-container">
+        <h3>Live PDF Preview</h3>
+        <!-- CHANGED: Use <object> instead of <embed> -->
+        <object id="pdf-preview" type="application/pdf" data="about:blank" width="100%" height="95%">
+            <!-- Fallback content if object cannot be displayed -->
+            <p>PDF preview could not be displayed. Try the download link:</p>
+            <div id="download-link-container-fallback" style="padding: 10px;">
+                 <a id="pdf-download-link-fallback" href="#" target="_blank" download="cv.pdf">[Download PDF]</a>
+            </div>
+        </object>
+         <!-- Add a separate, always visible container for the download link -->
+        <div id="download-link-container">
+             <a id="pdf-download-link" href="#" target="_blank" download="cv.pdf">[Download/Open PDF Directly]</a>
+        </div>
+    </div>
+
+    <!-- CodeMirror JS -->
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.15/codemirror.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.15/mode/yaml/yaml.min.js"></script>
+    <!-- Frontend Logic -->
+    <script>
+        const yamlTextArea = document.getElementById('yaml-editor');
+        // Get the object element
+        const pdfPreviewObject = document.getElementById('pdf-preview');
+        // Get the download links
+        const pdfDownloadLink = document.getElementById('pdf-download-link');
+        const pdfDownloadLinkFallback = document.getElementById('pdf-download-link-fallback'); // For fallback link
+        
+        // Theme selector elements
+        const themeSelector = document.getElementById('theme-selector');
+        const loadThemeBtn = document.getElementById('load-theme-btn');
+        const saveThemeNameInput = document.getElementById('save-theme-name');
+        const saveThemeBtn = document.getElementById('save-theme-btn');
+
+        const statusDiv = document.getElementById('status');
+        let debounceTimeout;
+        let currentBlobUrl = null;
+        // Identifies this editor tab so the server can keep a warm Typst instance for it
+        const sessionId = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : Math.random().toString(36).slice(2);
+        // Each edit gets a higher revision; the in-flight render of an older one is aborted
+        let revision = 0;
+        let renderController = null;
+
+        const editor = CodeMirror.fromTextArea(yamlTextArea, { /* ... options ... */ });
+        function debounce(func, delay) {
+            let timeoutId;
+            return function(...args) {
+                clearTimeout(timeoutId);
+                timeoutId = setTimeout(() => {
+                    func.apply(this, args);
+                }, delay);
+            };
+        }
+
+        // Theme loading functionality
+        loadThemeBtn.addEventListener('click', async () => {
+            const selectedTheme = themeSelector.value;
+            statusDiv.textContent = `Status: Loading ${selectedTheme} theme...`;
+            statusDiv.className = 'loading';
+            
+            try {
+                const response = await fetch(`/themes/${selectedTheme}`);
+                if (response.ok) {
+                    const data = await response.json();
+                    editor.setValue(data.content);
+                    statusDiv.textContent = `Status: ${selectedTheme} theme loaded successfully!`;
+                    statusDiv.className = 'success';
+                    // Trigger preview update
+                    setTimeout(updatePreview, 500);
+                } else {
+                    const errorData = await response.json();
+                    statusDiv.textContent = `Error loading theme: ${errorData.error || 'Unknown error'}`;
+                    statusDiv.className = 'error';
+                }
+            } catch (error) {
+                statusDiv.textContent = `Error loading theme: ${error.message}`;
+                statusDiv.className = 'error';
+            }
+        });
+        
+        // Theme saving functionality
+        saveThemeBtn.addEventListener('click', async () => {
+            const themeName = saveThemeNameInput.value.trim();
+            if (!themeName) {
+                statusDiv.textContent = 'Error: Please enter a theme name';
+                statusDiv.className = 'error';
+                return;
+            }
+            
+            // Validate theme name - letters, numbers, underscores only
+            if (!/^[a-zA-Z0-9_]+$/.test(themeName)) {
+                statusDiv.textContent = 'Error: Theme name can only contain letters, numbers, and underscores';
+                statusDiv.className = 'error';
+                return;
+            }
+            
+            statusDiv.textContent = `Status: Saving theme "${themeName}"...`;
+            statusDiv.className = 'loading';
+            
+            try {
+                const response = await fetch('/themes/save', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        theme_name: themeName,
+                        yaml_content: editor.getValue()
+                    })
+                });
+                
+                const data = await response.json();
+                
+                if (response.ok) {
+                    statusDiv.textContent = `Status: ${data.message}`;
+                    statusDiv.className = 'success';
+                    
+                    // Check if the theme is already in the dropdown list
+                    let themeExists = false;
+                    for (let i = 0; i < themeSelector.options.length; i++) {
+                        if (themeSelector.options[i].value === themeName) {
+                            themeExists = true;
+                            break;
+                        }
+                    }
+                    
+                    // Add the theme to the dropdown if it doesn't exist
+                    if (!themeExists) {
+                        const option = document.createElement('option');
+                        option.value = themeName;
+                        option.textContent = themeName;
+                        themeSelector.appendChild(option);
+                    }
+                    
+                    // Select the newly saved theme
+                    themeSelector.value = themeName;
+                } else {
+                    statusDiv.textContent = `Error: ${data.error || 'Failed to save theme'}`;
+                    statusDiv.className = 'error';
+                }
+            } catch (error) {
+                statusDiv.textContent = `Error saving theme: ${error.message}`;
+                statusDiv.className = 'error';
+            }
+        });
+
+        // YAML is posted as is; large documents are gzipped when the browser can
+        const GZIP_MIN_BYTES = 16384;
+        async function encodeYamlBody(text) {
+            if (text.length < GZIP_MIN_BYTES || typeof CompressionStream === 'undefined') {
+                return { body: text, headers: {} };
+            }
+            const stream = new Blob([text]).stream().pipeThrough(new CompressionStream('gzip'));
+            return { body: await new Response(stream).blob(), headers: { 'Content-Encoding': 'gzip' } };
+        }
+
+        async function updatePreview() {
+            console.log("updatePreview function started.");
+            const yamlContent = editor.getValue();
+            statusDiv.textContent = 'Status: Change detected, requesting render...';
+            statusDiv.className = 'loading';
+            // Hide download link while loading
+            pdfDownloadLink.style.display = 'none';
+            pdfDownloadLinkFallback.style.display = 'none';
+
+
+            if (currentBlobUrl) {
+                console.log("Revoking previous Blob URL:", currentBlobUrl);
+                URL.revokeObjectURL(currentBlobUrl);
+                currentBlobUrl = null; // Reset the variable
+            }
+            // Set object data to blank while loading
+             pdfPreviewObject.data = 'about:blank';
+
+
+            if (renderController) {
+                renderController.abort();
+            }
+            const controller = new AbortController();
+            renderController = controller;
+            revision += 1;
+
+            try {
+                // Lint first; only valid documents are worth a PDF
+                const encoded = await encodeYamlBody(yamlContent);
+                const validation = await fetch('/validate', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/yaml', ...encoded.headers },
+                    body: encoded.body,
+                    signal: controller.signal
+                });
+                if (controller !== renderController) {
+                    return;
+                }
+                if (validation.ok) {
+                    const result = await validation.json();
+                    // Syntax errors the server's text repair fixes still render
+                    if (!result.valid && !result.errors.every(e => e.repairable)) {
+                        displayErrors({
+                            error: "YAML validation failed.",
+                            details: result.errors.map(e =>
+                                `${e.line ? `Line ${e.line}, column ${e.column}: ` : ''}${e.path ? `'${e.path}': ` : ''}${e.message}`)
+                        }, 400);
+                        return;
+                    }
+                }
+
+                console.log("Attempting to fetch /render_live...");
+                const params = new URLSearchParams({ session_id: sessionId, revision: String(revision) });
+                const response = await fetch(`/render_live?${params}`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/yaml',
+                        ...encoded.headers
+                    },
+                    body: encoded.body,
+                    signal: controller.signal
+                });
+                console.log("Response Status:", response.status, response.ok);
+
+                if (response.status === 409 || controller !== renderController) {
+                    // Superseded by a newer edit; its render will update the preview
+                    return;
+                }
+
+                if (response.ok) {
+                    const contentType = response.headers.get("content-type");
+                    console.log("Response Content-Type:", contentType);
+
+                    // Check for icon warning header
+                    const iconWarning = response.headers.get("X-Icon-Warning");
+                    console.log("Server-Timing:", response.headers.get("Server-Timing"));
+                    
+                    if (contentType && contentType.includes("application/pdf")) {
+                        const pdfBlob = await response.blob();
+                        if (!pdfBlob || pdfBlob.size === 0) {
+                            console.error('Received empty blob for PDF.');
+                            displayErrors({ error: "Received empty PDF data from server.", details: ["Check server logs for Typst errors."] });
+                            return;
+                        }
+
+                        currentBlobUrl = URL.createObjectURL(pdfBlob);
+                        console.log("Created Blob URL:", currentBlobUrl);
+
+                        // Update the main download link
+                        pdfDownloadLink.href = currentBlobUrl;
+                        pdfDownloadLink.style.display = 'inline'; // Show the link
+
+                        // Update the fallback download link
+                        pdfDownloadLinkFallback.href = currentBlobUrl;
+                         pdfDownloadLinkFallback.style.display = 'inline';
+
+
+                        console.log("Setting object data attribute...");
+                        // Set the data attribute of the object element
+                        pdfPreviewObject.data = currentBlobUrl;
+                        console.log("object data set.");
+
+                        let statusMessage = 'Status: Preview updated successfully!';
+                        
+                        // If we have an icon warning, display it
+                        if (iconWarning === 'true') {
+                            statusMessage += ' Note: Icons may not display correctly. Run setup_fonts.py or install Font Awesome.';
+                            statusDiv.className = 'warning';
+                        } else {
+                            statusDiv.className = 'success';
+                        }
+                        
+                        statusDiv.textContent = statusMessage;
+                    } else if (contentType && contentType.includes("application/json")) {
+                         // Handle JSON response (likely validation errors)
+                        console.log("Received JSON response (likely errors).");
+                        const errorData = await response.json();
+                        displayErrors(errorData, response.status); // Pass status code too
+                    } else {
+                         // Handle unexpected content type
+                        console.error("Unexpected content type received:", contentType);
+                        const responseText = await response.text(); // Get text for debugging
+                        displayErrors({ error: "Received unexpected content type from server.", details: [`Content-Type: ${contentType}`, `Response Text (first 500 chars): ${responseText.substring(0, 500)}`] }, response.status);
+                    }
+                } else {
+                    // Handle non-OK HTTP responses (4xx, 5xx)
+                    console.error("Non-OK response status:", response.status);
+                    let errorData;
+                    try {
+                        // Try to parse as JSON first, as our error responses should be JSON
+                        errorData = await response.json();
+                    } catch (e) {
+                        // If not JSON, get text
+                        const errorText = await response.text();
+                        errorData = { error: `Server returned status ${response.status}`, details: [`Response Text (first 500 chars): ${errorText.substring(0, 500)}`] };
+                    }
+                    displayErrors(errorData, response.status);
+                }
+            } catch (error) {
+                if (error.name === 'AbortError') {
+                    console.log("Render aborted by a newer edit.");
+                    return;
+                }
+                console.error('Fetch error:', error);
+                displayErrors({ error: "Network or client-side error occurred.", details: [`Error: ${error.message}`] });
+            }
+        }
+
+        function displayErrors(errorData, statusCode = null) {
+            console.log("displayErrors called with:", errorData, "Status Code:", statusCode);
+            let errorMessage = `Error: ${errorData.error || 'Unknown error'}`;
+            if (statusCode) {
+                errorMessage += ` (Status: ${statusCode})`;
+            }
+            if (errorData.details && Array.isArray(errorData.details)) {
+                errorMessage += ": <br> - " + errorData.details.join("<br> - ");
+            }
+            statusDiv.innerHTML = errorMessage; // Use innerHTML to render <br>
+            statusDiv.className = 'error';
+
+             // Ensure object data is cleared on error
+             pdfPreviewObject.data = 'about:blank';
+             // Hide download links on error
+             pdfDownloadLink.style.display = 'none';
+             pdfDownloadLinkFallback.style.display = 'none';
+
+             if (currentBlobUrl) {
+                 console.log("Revoking Blob URL due to error:", currentBlobUrl);
+                 URL.revokeObjectURL(currentBlobUrl);
+                 currentBlobUrl = null;
+             }
+        }
+
+        const debouncedUpdate = debounce(updatePreview, 1500);
+        editor.on('change', () => {
+            console.log("CodeMirror 'change' event fired.");
+            statusDiv.textContent = 'Status: Change detected, waiting for pause...';
+            statusDiv.className = 'waiting';
+            debouncedUpdate();
+        });
+        // setTimeout(updatePreview, 500); // <-- Comment out this line
+
+    </script>
+</body>
+</html>
+"""
+
+
+def validation_reply(result, seconds):
+    """
+    Counts a /validate outcome and returns what its response is made of.
+
+    Args:
+        result (cv_validation.ValidationResult): The outcome
+        seconds (float): Time spent validating
+
+    Returns:
+        tuple: (JSON payload, response headers)
+    """
+    cache = 'hit' if result.cached else 'miss'
+    render_metrics.validations.inc(result='valid' if result.valid else 'invalid', cache=cache)
+    # Uncached validations run RenderCV on a generation worker; `desc` tells them apart
+    return result.to_payload(), {'Server-Timing': f'validate;desc="{cache}";dur={seconds * 1000:.1f}'}
@@ -0,0 +1,87 @@
+"""
+YAML parsing and serialization for the whole service.
+
+Uses libyaml's C `CSafeLoader`/`CSafeDumper` when PyYAML was built with it and
+falls back to the pure-Python safe loader and dumper otherwise. Both produce
+the same Python objects and the same text; only speed differs.
+"""
+
+import logging
+import os
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to use the pure-Python loader and dumper even when libyaml is available
+YAML_LIBYAML = os.environ.get('YAML_LIBYAML', '1') != '0'
+
+YAMLError = yaml.YAMLError
+
+if YAML_LIBYAML and getattr(yaml, '__with_libyaml__', False):
+    Loader = yaml.CSafeLoader
+    Dumper = yaml.CSafeDumper
+else:
+    Loader = yaml.SafeLoader
+    Dumper = yaml.SafeDumper
+    if YAML_LIBYAML:
+        logger.info("PyYAML was built without libyaml, using the pure-Python YAML codec.")
+
+LIBYAML = Loader is not yaml.SafeLoader
+
+
+def load(stream):
+    """
+    Parses a YAML document with the safe schema.
+
+    Args:
+        stream: YAML text, bytes or an open file
+
+    Returns:
+        The parsed document
+
+    Raises:
+        YAMLError: If the content is not valid YAML
+    """
+    return yaml.load(stream, Loader=Loader)
+
+
+def compose_and_load(stream):
+    """
+    Parses a YAML document once into both its node tree, which carries the
+    line and column of every key and value, and the Python objects.
+
+    Args:
+        stream: YAML text, bytes or an open file
+
+    Returns:
+        tuple: (root node, parsed document); (None, None) for an empty stream
+
+    Raises:
+        YAMLError: If the content is not valid YAML
+    """
+    loader = Loader(stream)
+    try:
+        node = loader.get_single_node()
+        if node is None:
+            return None, None
+        return node, loader.construct_document(node)
+    finally:
+        loader.dispose()
+
+
+def dump(data, stream=None, **kwargs):
+    """
+    Serializes data as YAML with the safe representers, in block style unless
+    `default_flow_style` is given.
+
+    Args:
+        data: Document to serialize
+        stream: Open file to write to; the text is returned if omitted
+        **kwargs: Options passed on to `yaml.dump` (sort_keys, allow_unicode, ...)
+
+    Returns:
+        str: The YAML text, or None if it was written to `stream`
+    """
+    kwargs.setdefault('default_flow_style', False)
+    return yaml.dump(data, stream, Dumper=Dumper, **kwargs)
@@ -0,0 +1,337 @@
+"""
+Declarative fix-up rules for CV documents.
+
+Rules are read from fix_rules.yaml (plus the optional file named by
+YAML_FIX_RULES_FILE) and compiled into a tree keyed by path segment. Fixing a
+document walks that tree alongside the document, so only the subtrees the
+rules name are visited and the cost does not grow with the number of CV
+entries.
+
+The same tree repairs YAML text that does not parse: `RuleSet.apply_text`
+tracks the block-mapping path of each line from its indentation in a single
+scan, with work per line bounded by its length.
+"""
+
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import yaml_codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fix_rules.yaml')
+
+# Optional file with rules applied after the default ones
+YAML_FIX_RULES_FILE = os.environ.get('YAML_FIX_RULES_FILE', '')
+
+WILDCARD = '*'
+
+_PLAIN_KEY = re.compile(r'[A-Za-z0-9_][A-Za-z0-9_.-]*')
+
+
+class FixRule:
+    """
+    One fix-up rule.
+
+    Attributes:
+        id (str): Name reported when the rule changes a document
+        path (tuple): Path segments from the document root to the field
+        action (str): "remove", "enum" or "rename"
+        options (dict): Action settings ("allowed" and "default", or "to")
+    """
+
+    ACTIONS = ('remove', 'enum', 'rename')
+
+    def __init__(self, id, path, action, **options):
+        self.id = id
+        self.path = tuple(path.split('.')) if isinstance(path, str) else tuple(path)
+        self.action = action
+        self.options = options
+        if not self.id or not all(self.path):
+            raise ValueError(f"Fix rule {id!r} needs an id and a path without empty segments")
+        if self.path[-1] == WILDCARD:
+            raise ValueError(f"Fix rule {id!r} must name a field, not end in '{WILDCARD}'")
+        if action not in self.ACTIONS:
+            raise ValueError(f"Fix rule {id!r} has unknown action {action!r}; expected one of {self.ACTIONS}")
+        if action == 'enum' and ('allowed' not in options or 'default' not in options):
+            raise ValueError(f"Fix rule {id!r} needs 'allowed' and 'default' for the enum action")
+        if action == 'rename' and not options.get('to'):
+            raise ValueError(f"Fix rule {id!r} needs 'to' for the rename action")
+
+    @property
+    def field(self) -> str:
+        return self.path[-1]
+
+    def apply(self, mapping: Dict[str, Any]) -> bool:
+        """
+        Applies the rule to the mapping holding its field.
+
+        Returns:
+            bool: True if the mapping was changed
+        """
+        if self.field not in mapping:
+            return False
+        if self.action == 'remove':
+            del mapping[self.field]
+            return True
+        if self.action == 'enum':
+            if mapping[self.field] in self.options['allowed']:
+                return False
+            mapping[self.field] = self.options['default']
+            return True
+        # rename
+        value = mapping.pop(self.field)
+        mapping.setdefault(self.options['to'], value)
+        return True
+
+    def apply_line(self, prefix: str, value: str) -> Optional[str]:
+        """
+        Applies the rule to a `field: value` line of YAML text.
+
+        Args:
+            prefix: The line up to the field (indentation and any "- ")
+            value: The text after the colon
+
+        Returns:
+            str: The replacement line ("" drops it together with its block),
+                or None if the line is left unchanged
+        """
+        if self.action == 'remove':
+            # A field opening a list item leaves the bare "-" so the item's
+            # other fields still belong to it
+            return prefix.rstrip()
+        if self.action == 'enum':
+            scalar = _scalar_text(value)
+            if scalar is None or scalar in self.options['allowed']:
+                return None
+            return f'{prefix}{self.field}: "{self.options["default"]}"'
+        return f'{prefix}{self.options["to"]}:{value}'
+
+
+class _Node:
+    __slots__ = ('children', 'rules')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.rules: List[FixRule] = []
+
+
+class RuleSet:
+    """
+    Fix-up rules compiled into a path tree.
+
+    Args:
+        rules: The rules, applied in order among those sharing a parent
+    """
+
+    def __init__(self, rules: Sequence[FixRule]):
+        self.rules = list(rules)
+        self._root = _Node()
+        for rule in self.rules:
+            node = self._root
+            for segment in rule.path[:-1]:
+                node = node.children.setdefault(segment, _Node())
+            node.rules.append(rule)
+
+    def apply(self, document: Any) -> Tuple[Any, List[str]]:
+        """
+        Applies the rules to a parsed document in place.
+
+        Args:
+            document: The parsed document
+
+        Returns:
+            tuple: (the document, ids of the rules that changed it, in order)
+        """
+        fired: List[str] = []
+        self._visit(self._root, document, fired)
+        return document, fired
+
+    def rules_for(self, path: Sequence[Any]) -> List[FixRule]:
+        """
+        Returns the rules for the field at a concrete path, such as
+        ('design', 'section_titles', 'type'); list indices match the wildcard.
+        """
+        nodes = [self._root]
+        for segment in path[:-1]:
+            nodes = [child for node in nodes for child in (node.children.get(str(segment)), node.children.get(WILDCARD))
+                     if child]
+        return [rule for node in nodes for rule in node.rules if rule.field == str(path[-1])]
+
+    def apply_text(self, yaml_content: str) -> Tuple[str, List[str]]:
+        """
+        Applies the rules to YAML text that may not parse.
+
+        Lines are matched to rule paths by their indentation and "- " list
+        markers, in one pass. Block scalars (`|`, `>`) are copied verbatim,
+        and flow collections are not looked into.
+
+        Args:
+            yaml_content: The YAML text
+
+        Returns:
+            tuple: (the repaired text, ids of the rules that changed it, in order)
+        """
+        fired: List[str] = []
+        out: List[str] = []
+        # Open block mappings and list items: (indent, is_item, trie nodes for their content)
+        stack: List[Tuple[int, bool, List[_Node]]] = [(-1, False, [self._root])]
+        # Lines indented deeper than this belong to a dropped field or a block scalar
+        skip_indent = None
+        skip_drop = False
+        # The dropped field's value may be a sequence written at its own indent
+        skip_items = False
+
+        for line in yaml_content.splitlines(keepends=True):
+            body = line.lstrip(' ')
+            indent = len(line) - len(body)
+            if not body.strip() or body[0] == '#':
+                # Blank lines are kept even inside a dropped block; comments only outside it
+                if not body.strip() or not skip_drop or skip_indent is None or indent <= skip_indent:
+                    out.append(line)
+                continue
+            if skip_indent is not None:
+                if indent > skip_indent or (skip_items and indent == skip_indent and _is_item(body)):
+                    if not skip_drop:
+                        out.append(line)
+                    continue
+                skip_indent = None
+
+            # Each "- " opens a list item matched by the wildcard
+            while _is_item(body):
+                while stack[-1][0] > indent or (stack[-1][0] == indent and stack[-1][1]):
+                    stack.pop()
+                nodes = [node.children[WILDCARD] for node in stack[-1][2] if WILDCARD in node.children]
+                stack.append((indent, True, nodes))
+                rest = body[1:].lstrip(' ')
+                indent += len(body) - len(rest)
+                body = rest
+            if not body.strip():
+                out.append(line)
+                continue
+
+            key, value = _split_key(body)
+            if key is None:
+                out.append(line)
+                continue
+            while stack[-1][0] >= indent:
+                stack.pop()
+            parents = stack[-1][2]
+            block = value.lstrip()[:1] in ('|', '>')
+            if block:
+                skip_indent, skip_drop, skip_items = indent, False, False
+
+            rule, new_line = self._match_line(parents, key, line[:len(line) - len(body)], value.rstrip('\r\n'))
+            if rule is not None:
+                fired.append(rule.id)
+                ending = line[len(line.rstrip('\r\n')):]
+                if rule.action == 'remove':
+                    own_line = value.strip()
+                    skip_indent, skip_drop = indent, True
+                    skip_items = not own_line or own_line[0] == '#'
+                    if new_line:
+                        out.append(new_line + ending)
+                    continue
+                line = new_line + ending
+            out.append(line)
+            children = [] if block else [
+                child for node in parents for child in (node.children.get(key), node.children.get(WILDCARD)) if child
+            ]
+            stack.append((indent, False, children))
+        return ''.join(out), fired
+
+    @staticmethod
+    def _match_line(parents: List[_Node], key: str, prefix: str, value: str) -> Tuple[Optional[FixRule], Optional[str]]:
+        for node in parents:
+            for rule in node.rules:
+                if rule.field == key:
+                    new_line = rule.apply_line(prefix, value)
+                    if new_line is not None:
+                        return rule, new_line
+        return None, None
+
+    def _visit(self, node: _Node, value: Any, fired: List[str]) -> None:
+        if isinstance(value, dict):
+            for rule in node.rules:
+                if rule.apply(value):
+                    fired.append(rule.id)
+            for segment, child in node.children.items():
+                if segment == WILDCARD:
+                    for item in list(value.values()):
+                        self._visit(child, item, fired)
+                elif segment in value:
+                    self._visit(child, value[segment], fired)
+        elif isinstance(value, list):
+            child = node.children.get(WILDCARD)
+            if child is not None:
+                for item in value:
+                    self._visit(child, item, fired)
+
+
+def _is_item(body: str) -> bool:
+    return body[:2] == '- ' or body.rstrip() == '-'
+
+
+def _split_key(body: str) -> Tuple[Optional[str], str]:
+    """Splits `key: value` into the unquoted key and the text after the colon."""
+    if body[0] in ('"', "'"):
+        end = body.find(body[0], 1)
+        if end < 0:
+            return None, ''
+        key, colon = body[1:end], end + 1
+    else:
+        colon = body.find(':')
+        if colon < 0:
+            return None, ''
+        key = body[:colon].rstrip(' ')
+        if not _PLAIN_KEY.fullmatch(key):
+            return None, ''
+    if body[colon:colon + 1] != ':' or body[colon + 1:colon + 2] not in ('', ' ', '\t', '\n', '\r'):
+        return None, ''
+    return key, body[colon + 1:]
+
+
+def _scalar_text(value: str) -> Optional[str]:
+    """Returns the scalar on a `key: value` line without quotes or comment, or None if there is none."""
+    value = value.strip()
+    if not value:
+        return None
+    if value[0] in ('"', "'"):
+        end = value.find(value[0], 1)
+        return value[1:end] if end > 0 else value[1:]
+    comment = value.find(' #')
+    return (value[:comment] if comment >= 0 else value).rstrip()
+
+
+def load_rules(path: str) -> List[FixRule]:
+    """
+    Reads fix-up rules from a YAML file with a top-level `rules` list.
+
+    Raises:
+        ValueError: If a rule is malformed
+        OSError: If the file cannot be read
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        content = yaml_codec.load(f) or {}
+    entries = (content.get('rules') or []) if isinstance(content, dict) else None
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        raise ValueError(f"{path}: expected a 'rules' list of mappings")
+    try:
+        return [FixRule(**entry) for entry in entries]
+    except TypeError as e:
+        raise ValueError(f"{path}: malformed fix rule: {e}")
+
+
+def load_default_rule_set(extra_file: Optional[str] = YAML_FIX_RULES_FILE) -> RuleSet:
+    """Returns the rules from fix_rules.yaml followed by those from `extra_file`."""
+    rules = load_rules(DEFAULT_RULES_FILE)
+    if extra_file:
+        extra = load_rules(extra_file)
+        logger.info(f"Loaded {len(extra)} extra fix rules from {extra_file}")
+        rules.extend(extra)
+    return RuleSet(rules)
+
+
+rule_set = load_default_rule_set()
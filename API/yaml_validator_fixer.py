@@ -1,6 +1,7 @@
-import yaml
-import re
-from typing import Dict, Any, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+import yaml_codec
+from yaml_fix_rules import rule_set
 
 def fix_yaml_validation_errors(yaml_content: str) -> str:
     """
@@ -14,83 +15,77 @@ def fix_yaml_validation_errors(yaml_content: str) -> str:
     """
     try:
         # Parse the YAML content to a dictionary
-        yaml_dict = yaml.safe_load(yaml_content)
+        yaml_dict = yaml_codec.load(yaml_content)
         
         # Apply the fixes
         fixed_yaml_dict = apply_fixes(yaml_dict)
         
         # Convert back to YAML string
-        fixed_yaml = yaml.dump(fixed_yaml_dict, default_flow_style=False)
+        fixed_yaml = yaml_codec.dump(fixed_yaml_dict)
         
         return fixed_yaml
     except Exception as e:
-        # In case of parsing errors, try to fix the content using regex
-        fixed_yaml = fix_yaml_with_regex(yaml_content)
+        # In case of parsing errors, fix the text line by line
+        fixed_yaml = fix_yaml_text(yaml_content)[0]
         return fixed_yaml
 
+def load_yaml_document(yaml_content: str) -> Optional[Dict[str, Any]]:
+    """
+    Parses YAML content into the in-memory document the render pipeline works on.
+    
+    Args:
+        yaml_content: YAML content as sent by the client
+        
+    Returns:
+        The parsed document, or None if the content is not valid YAML or not a
+        mapping; callers then fall back to fixing the text with `fix_yaml_text`
+    """
+    try:
+        document = yaml_codec.load(yaml_content)
+    except yaml_codec.YAMLError:
+        return None
+    return document if isinstance(document, dict) else None
+
 def apply_fixes(yaml_dict: Dict[str, Any]) -> Dict[str, Any]:
     """
     Apply fixes to the YAML dictionary representation.
-    Removes or corrects fields known to cause validation errors.
+    Removes or corrects fields known to cause validation errors, as listed in
+    fix_rules.yaml.
     """
-    if not isinstance(yaml_dict, dict):
-        return yaml_dict
+    return fix_document(yaml_dict)[0]
+
+def fix_document(yaml_dict: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Applies the fix rules to a parsed document in place.
     
-    # Fix design section if it exists
-    if 'design' in yaml_dict and isinstance(yaml_dict['design'], dict):
-        design = yaml_dict['design']
-        
-        # Fix header section
-        if 'header' in design and isinstance(design['header'], dict):
-            header = design['header']
-            # Remove problematic header fields
-            header.pop('small_caps_for_name', None)
-            header.pop('use_urls_as_placeholders_for_connections', None)
-            header.pop('make_connections_links', None)
-        
-        # Fix section_titles section
-        if 'section_titles' in design and isinstance(design['section_titles'], dict):
-            section_titles = design['section_titles']
-            
-            # Fix section_titles.type if it has an invalid value
-            if 'type' in section_titles:
-                valid_types = ['with-partial-line', 'with-full-line', 'without-line', 'moderncv']
-                if section_titles['type'] not in valid_types:
-                    # Default to a valid value
-                    section_titles['type'] = 'with-partial-line'
+    Args:
+        yaml_dict: The parsed document
         
-        # Fix highlights section
-        if 'highlights' in design and isinstance(design['highlights'], dict):
-            highlights = design['highlights']
-            # Remove problematic highlights fields
-            highlights.pop('nested_bullet', None)
+    Returns:
+        The document and the ids of the rules that changed it
+    """
+    if not isinstance(yaml_dict, dict):
+        return yaml_dict, []
+    return rule_set.apply(yaml_dict)
+
+def fix_yaml_text(yaml_content: str) -> Tuple[str, List[str]]:
+    """
+    Applies the fix rules to YAML text that could not be parsed.
     
-    # Process nested dictionaries recursively
-    for key, value in yaml_dict.items():
-        if isinstance(value, dict):
-            yaml_dict[key] = apply_fixes(value)
-        elif isinstance(value, list):
-            yaml_dict[key] = [apply_fixes(item) if isinstance(item, dict) else item for item in value]
+    Runs in one pass over the lines, so the cost stays linear in the size of
+    the text however it is indented.
     
-    return yaml_dict
+    Args:
+        yaml_content: YAML content as sent by the client
+        
+    Returns:
+        The repaired text and the ids of the rules that changed it
+    """
+    return rule_set.apply_text(yaml_content)
 
 def fix_yaml_with_regex(yaml_content: str) -> str:
     """
-    Fix YAML content using regex patterns when direct parsing fails.
+    Fix YAML content when direct parsing fails. Kept for existing callers;
+    see `fix_yaml_text`.
     """
-    # Remove problematic header fields
-    yaml_content = re.sub(r'(\s+)small_caps_for_name:\s*[^\n]+\n', r'\1', yaml_content)
-    yaml_content = re.sub(r'(\s+)use_urls_as_placeholders_for_connections:\s*[^\n]+\n', r'\1', yaml_content)
-    yaml_content = re.sub(r'(\s+)make_connections_links:\s*[^\n]+\n', r'\1', yaml_content)
-    
-    # Fix section_titles.type field
-    yaml_content = re.sub(
-        r'(\s+type:\s*)[\'"](?!with-partial-line|with-full-line|without-line|moderncv)[^\'"]+[\'"]', 
-        r'\1"with-partial-line"', 
-        yaml_content
-    )
-    
-    # Remove problematic highlights fields
-    yaml_content = re.sub(r'(\s+)nested_bullet:\s*[^\n]+\n', r'\1', yaml_content)
-    
-    return yaml_content 
\ No newline at end of file
+    return fix_yaml_text(yaml_content)[0]
@@ -1,29 +1,85 @@
 import { NextRequest, NextResponse } from 'next/server';
+import { gzipSync } from 'zlib';
 
 // The backend Flask API URL - adjust this to your deployment setup
 const FLASK_API_URL = 'http://localhost:8000/render_live';
+// Structured CVs ({ cv, design, locale, ... }) skip YAML and go to this endpoint
+const FLASK_DOCUMENT_API_URL = 'http://localhost:8000/render_document';
+
+// YAML bodies at least this large are gzipped on the way to the backend
+const GZIP_MIN_BYTES = 16384;
+
+// Backend response headers forwarded to the browser
+const PASSTHROUGH_HEADERS = ['Server-Timing', 'X-Render-Cache', 'X-Icon-Warning'];
+
+// The backend only orders renders by non-negative integer revisions; a
+// revision sent as a string (the query string, or loosely typed JSON) is parsed
+function parseRevision(revision: unknown): number | undefined {
+  if (revision === undefined || revision === null || revision === '' || typeof revision === 'boolean') {
+    return undefined;
+  }
+  const value = Number(revision);
+  return Number.isSafeInteger(value) && value >= 0 ? value : undefined;
+}
 
 export async function POST(request: NextRequest) {
   try {
-    // Get YAML content from request
-    const requestData = await request.json();
+    // The editor posts raw YAML with its session in the query string; other
+    // callers send JSON with yamlContent or a CV document built as an object
+    const isYaml = /^(application|text)\/(x-)?yaml\b/.test(request.headers.get('content-type') || '');
+    const requestData = isYaml
+      ? {
+          yamlContent: await request.text(),
+          sessionId: request.nextUrl.searchParams.get('sessionId') || undefined,
+          revision: request.nextUrl.searchParams.get('revision') || undefined,
+        }
+      : await request.json();
+    const isDocument = requestData.document !== null && typeof requestData.document === 'object';
+    const revision = parseRevision(requestData.revision);
     
-    if (!requestData.yamlContent) {
+    if (!isDocument && !requestData.yamlContent) {
       return NextResponse.json(
-        { error: 'YAML content is required' },
+        { error: 'YAML content or a CV document is required' },
         { status: 400 }
       );
     }
 
+    let backendUrl: string;
+    let body: string | Buffer;
+    const headers: Record<string, string> = {};
+    if (isDocument) {
+      backendUrl = FLASK_DOCUMENT_API_URL;
+      headers['Content-Type'] = 'application/json';
+      body = JSON.stringify({
+        document: requestData.document,
+        session_id: requestData.sessionId,
+        revision,
+      });
+    } else {
+      // Send the YAML as the body and the render options as query parameters
+      const params = new URLSearchParams();
+      if (requestData.sessionId) {
+        params.set('session_id', String(requestData.sessionId));
+      }
+      if (revision !== undefined) {
+        params.set('revision', String(revision));
+      }
+      backendUrl = `${FLASK_API_URL}?${params}`;
+      headers['Content-Type'] = 'application/yaml';
+      body = requestData.yamlContent;
+      if (Buffer.byteLength(requestData.yamlContent) >= GZIP_MIN_BYTES) {
+        body = gzipSync(requestData.yamlContent);
+        headers['Content-Encoding'] = 'gzip';
+      }
+    }
+
     // Forward the request to Flask backend
-    const response = await fetch(FLASK_API_URL, {
+    const response = await fetch(backendUrl, {
       method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({
-        yaml_content: requestData.yamlContent,
-      }),
+      headers,
+      body,
+      // Abort the backend render when the browser aborts this request
+      signal: request.signal,
     });
 
     // If response is not OK, handle the error
@@ -49,12 +105,21 @@ export async function POST(request: NextRequest) {
     
     if (contentType && contentType.includes('application/pdf')) {
       const pdfBuffer = await response.arrayBuffer();
+      const headers: Record<string, string> = {
+        'Content-Type': 'application/pdf',
+      };
+
+      // Pass the render diagnostics through, so devtools can attribute slow previews
+      for (const name of PASSTHROUGH_HEADERS) {
+        const value = response.headers.get(name);
+        if (value) {
+          headers[name] = value;
+        }
+      }
       
       return new NextResponse(pdfBuffer, {
         status: 200,
-        headers: {
-          'Content-Type': 'application/pdf',
-        },
+        headers,
       });
     }
 
@@ -63,6 +128,9 @@ export async function POST(request: NextRequest) {
     return NextResponse.json(data);
     
   } catch (error) {
+    if ((error as Error).name === 'AbortError') {
+      return new NextResponse(null, { status: 499 });
+    }
     console.error('Error in render-cv API route:', error);
     return NextResponse.json(
       { error: 'Internal server error', details: [(error as Error).message] },
@@ -76,6 +76,15 @@ skills:
   const [error, setError] = useState<string | null>(null);
   const pdfPreviewRef = useRef<HTMLIFrameElement>(null);
   const renderTimeoutRef = useRef<NodeJS.Timeout | null>(null);
+  // Identifies this editor so the backend can keep a warm Typst instance for it
+  const sessionIdRef = useRef<string>(
+    typeof crypto !== "undefined" && crypto.randomUUID
+      ? crypto.randomUUID()
+      : Math.random().toString(36).slice(2)
+  );
+  // Each render gets a higher revision; the in-flight render of an older one is aborted
+  const revisionRef = useRef<number>(0);
+  const renderControllerRef = useRef<AbortController | null>(null);
   const [selectedTemplate, setSelectedTemplate] = useState<string>("classic");
   const [availableThemes, setAvailableThemes] = useState<string[]>([]);
   const [isLoadingThemes, setIsLoadingThemes] = useState<boolean>(false);
@@ -134,17 +143,31 @@ skills:
     
     setIsLoading(true);
     setError(null);
+
+    renderControllerRef.current?.abort();
+    const controller = new AbortController();
+    renderControllerRef.current = controller;
+    revisionRef.current += 1;
     
     try {
-      const response = await fetch('/api/render-cv', {
+      // The YAML goes out as is, without a JSON envelope to escape it in
+      const params = new URLSearchParams({
+        sessionId: sessionIdRef.current,
+        revision: String(revisionRef.current),
+      });
+      const response = await fetch(`/api/render-cv?${params}`, {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json',
+          'Content-Type': 'application/yaml',
         },
-        body: JSON.stringify({
-          yamlContent: content,
-        }),
+        body: content,
+        signal: controller.signal,
       });
+
+      // Superseded by a newer edit; its render will update the preview
+      if (response.status === 409 || controller !== renderControllerRef.current) {
+        return;
+      }
       
       // Check for error responses
       if (!response.ok) {
@@ -169,6 +192,10 @@ skills:
       const contentType = response.headers.get('content-type');
       
       if (contentType && contentType.includes('application/pdf')) {
+        const serverTiming = response.headers.get('Server-Timing');
+        if (serverTiming) {
+          console.debug('Render Server-Timing:', serverTiming);
+        }
         const pdfBlob = await response.blob();
         const newPdfUrl = URL.createObjectURL(pdfBlob);
         setPdfUrl(newPdfUrl);
@@ -176,9 +203,14 @@ skills:
         setError('Unexpected response format from server');
       }
     } catch (error) {
+      if ((error as Error).name === 'AbortError') {
+        return;
+      }
       setError(`Failed to render CV: ${(error as Error).message}`);
     } finally {
-      setIsLoading(false);
+      if (controller === renderControllerRef.current) {
+        setIsLoading(false);
+      }
     }
   };
 